@@ -5,54 +5,265 @@ File: agent.py
 Description: Defines individual agent state, including position, velocity, and update logic.
 """
 
-import random
 import numpy as np
 from config import *
 
+
+class SwarmState:
+    """
+    Structure-of-arrays store holding the state of every agent in the swarm.
+
+    Positions and directions live in persistent (N, 3) arrays and speeds in an
+    (N,) array, so the movement model can advance the whole swarm in batched
+    NumPy operations. Rows past `count` are spare capacity.
+    """
+
+    def __init__(self, capacity=100):
+        """
+        Initialize an empty swarm store.
+
+        :param capacity: Number of agent rows to preallocate.
+        """
+        self.count = 0
+        self.positions = np.zeros((capacity, 3))
+        self.directions = np.zeros((capacity, 3))
+        self.speeds = np.zeros(capacity)
+
+    @property
+    def capacity(self):
+        """
+        Number of agent rows currently allocated.
+        """
+        return self.positions.shape[0]
+
+    def reserve(self, capacity):
+        """
+        Grow the store so that it can hold at least `capacity` agents.
+        Existing agent data is preserved.
+
+        :param capacity: Minimum number of rows required.
+        """
+        if capacity <= self.capacity:
+            return
+
+        new_capacity = max(capacity, 2 * self.capacity)
+        n = self.count
+
+        positions = np.zeros((new_capacity, 3))
+        directions = np.zeros((new_capacity, 3))
+        speeds = np.zeros(new_capacity)
+        positions[:n] = self.positions[:n]
+        directions[:n] = self.directions[:n]
+        speeds[:n] = self.speeds[:n]
+
+        self.positions, self.directions, self.speeds = positions, directions, speeds
+
+    def add(self, position, direction, speed):
+        """
+        Append a single agent to the store.
+
+        :return: Row index of the new agent.
+        """
+        self.reserve(self.count + 1)
+        index = self.count
+        self.positions[index] = position
+        self.directions[index] = direction
+        self.speeds[index] = speed
+        self.count += 1
+        return index
+
+    def extend(self, positions, directions, speeds):
+        """
+        Append a batch of agents to the store in one copy.
+
+        :param positions: A numpy array (K, 3) of positions.
+        :param directions: A numpy array (K, 3) of directions.
+        :param speeds: A numpy array (K,) of speeds.
+        :return: Row index of the first new agent.
+        """
+        start, k = self.count, len(positions)
+        self.reserve(start + k)
+        self.positions[start:start + k] = positions
+        self.directions[start:start + k] = directions
+        self.speeds[start:start + k] = speeds
+        self.count += k
+        return start
+
+    def clear(self):
+        """
+        Remove all agents. Allocated capacity is kept for reuse.
+        """
+        self.count = 0
+
+    def truncate(self, count):
+        """
+        Drop every agent past the first `count`. Allocated capacity is kept for reuse.
+
+        :param count: Number of agents to keep.
+        """
+        self.count = min(self.count, count)
+
+    def live(self):
+        """
+        Return views of the positions, directions and speeds of live agents.
+        """
+        n = self.count
+        return self.positions[:n], self.directions[:n], self.speeds[:n]
+
+
 class Agent:
     """
     Represents an individual agent in the swarm simulation.
 
-    Each agent has position, direction, and speed, and contributes
-    to the collective swarm behavior via a shared class-level list.
+    Each agent is a lightweight view into a row of the shared `SwarmState`
+    store, and contributes to the collective swarm behavior via a shared
+    class-level list.
     """
 
     # Shared list for tracking all agents
     all_agents = []
 
+    # Shared structure-of-arrays store backing every agent
+    state = SwarmState()
+
     # Speed bounds pulled from config
     max_speed = simulation_config["max_speed"]
     min_speed = simulation_config["min_speed"]
 
-    def __init__(self, position, direction):
+    def __init__(self, position, direction, speed=None):
         """
         Initialize an Agent with position and normalized direction.
 
         :param position: Initial 3D position as a list or numpy array.
         :param direction: Initial 3D direction (will be normalized).
+        :param speed: Initial speed; drawn from the spawn random stream if omitted.
         """
-        # Store position as NumPy array for vector math
-        self.position = np.array(position, dtype=float)
-
         # Normalize direction vector to unit length
-        self.direction = np.array(direction, dtype=float)
-        norm = np.linalg.norm(self.direction)
+        direction = np.array(direction, dtype=float)
+        norm = np.linalg.norm(direction)
         if norm == 0:
             raise ValueError("Direction vector cannot be zero.")
-        self.direction /= norm
+        direction /= norm
 
         # Random initial speed within bounds
-        self.speed = random.uniform(
-            simulation_config["init_speed_bounds"][0],
-            simulation_config["init_speed_bounds"][1]
-        )
+        if speed is None:
+            speed = get_rng("spawn").uniform(*simulation_config["init_speed_bounds"])
 
-        # Register this agent in the global list
+        # Claim a row in the shared store and register this agent in the global list
+        self.index = Agent.state.add(position, direction, speed)
         Agent.all_agents.append(self)
 
+    @classmethod
+    def from_row(cls, index):
+        """
+        Register an agent for a row already added to the shared store.
+
+        :param index: Row index in Agent.state.
+        :return: The new Agent.
+        """
+        agent = cls.__new__(cls)
+        agent.index = index
+        cls.all_agents.append(agent)
+        return agent
+
+    @classmethod
+    def clear_all(cls):
+        """
+        Remove every agent from the global list and the shared store.
+        """
+        cls.all_agents.clear()
+        cls.state.clear()
+
+    @property
+    def position(self):
+        """Position view into the shared store."""
+        return Agent.state.positions[self.index]
+
+    @position.setter
+    def position(self, value):
+        Agent.state.positions[self.index] = value
+
+    @property
+    def direction(self):
+        """Direction view into the shared store."""
+        return Agent.state.directions[self.index]
+
+    @direction.setter
+    def direction(self, value):
+        Agent.state.directions[self.index] = value
+
+    @property
+    def speed(self):
+        """Scalar speed read from the shared store."""
+        return float(Agent.state.speeds[self.index])
+
+    @speed.setter
+    def speed(self, value):
+        Agent.state.speeds[self.index] = value
+
     def update_position(self):
         """
         Update this agent's position using the configured movement model.
         """
-        model = get_movement_model_by_name(simulation_config["movement_model"])
-        model.update_position(self, self.all_agents)
+        get_active_movement_model().update_position(self, self.all_agents)
+
+
+def spawn_agents(rng=None):
+    """
+    Spawn agent objects within the 3D world with randomized positions and directions.
+
+    :param rng: Optional numpy Generator; defaults to the shared spawn stream.
+    :return: A list of all Agent instances created.
+    """
+    Agent.clear_all()
+    return resize_swarm(simulation_config["num_agents"], rng)
+
+
+def random_agent_state(count, rng=None):
+    """
+    Draw initial positions, directions and speeds for `count` agents in one
+    vectorized draw per quantity.
+
+    :param count: Number of agents.
+    :param rng: Optional numpy Generator; defaults to the shared spawn stream.
+    :return: Tuple (positions (K, 3), unit directions (K, 3), speeds (K,)).
+    """
+    if rng is None:
+        rng = get_rng("spawn")
+    cfg = simulation_config
+    mins = [cfg["x_min"], cfg["y_min"], cfg["z_min"]]
+    maxs = [cfg["x_max"], cfg["y_max"], cfg["z_max"]]
+
+    positions = rng.uniform(mins, maxs, (count, 3))
+    directions = rng.uniform(*cfg["init_direction_bounds"], (count, 3))
+    speeds = rng.uniform(*cfg["init_speed_bounds"], count)
+
+    # A zero direction has no heading; give it a default one
+    norm = np.linalg.norm(directions, axis=1, keepdims=True)
+    directions = np.where(norm > 0, directions / np.maximum(norm, 1e-12), [0.0, 0.0, 1.0])
+    return positions, directions, speeds
+
+
+def resize_swarm(count, rng=None):
+    """
+    Grow or shrink the swarm to `count` agents. Existing agents are kept
+    untouched; new agents get randomized positions and directions, and
+    removed agents are dropped from the end of the swarm.
+
+    :param count: New number of agents.
+    :param rng: Optional numpy Generator; defaults to the shared spawn stream.
+    :return: A list of all Agent instances.
+    """
+    count = max(0, int(count))
+
+    if count < len(Agent.all_agents):
+        del Agent.all_agents[count:]
+        Agent.state.truncate(count)
+
+    added = count - len(Agent.all_agents)
+    if added > 0:
+        start = Agent.state.extend(*random_agent_state(added, rng))
+        for index in range(start, start + added):
+            Agent.from_row(index)
+
+    return Agent.all_agents
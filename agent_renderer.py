@@ -0,0 +1,282 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: agent_renderer.py
+Description: Draws the whole swarm as a single hardware-instanced model. Per-agent positions,
+directions and colours are packed into one buffer texture and uploaded in a single call per frame,
+so rendering cost no longer grows with one scene-graph node per agent.
+"""
+
+import numpy as np
+from panda3d.core import Texture, GeomEnums, OmniBoundingVolume
+from ursina import Entity, Shader, Vec3, Quat, destroy
+
+
+# Texels (RGBA32F) stored per agent: position, direction, colour
+TEXELS_PER_AGENT = 3
+
+
+instanced_agent_shader = Shader(name='instanced_agent_shader', language=Shader.GLSL, vertex='''
+#version 140
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instances;
+uniform float agent_scale;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec2 p3d_MultiTexCoord0;
+
+out vec2 texcoords;
+out vec3 world_normal;
+flat out vec4 instance_color;
+
+void main() {
+    int base = gl_InstanceID * 3;
+    vec3 position = texelFetch(instances, base).xyz;
+    vec3 forward = texelFetch(instances, base + 1).xyz;
+    instance_color = texelFetch(instances, base + 2);
+
+    // Same basis as orientation_bases(): the model faces local +z with its
+    // back along local +x, which is kept as close to world up as possible
+    vec3 dorsal = vec3(0., 1., 0.) - forward.y * forward;
+    dorsal = dot(dorsal, dorsal) > 1e-12 ? normalize(dorsal) : vec3(1., 0., 0.);
+    vec3 lateral = cross(forward, dorsal);
+    mat3 basis = mat3(dorsal, lateral, forward);
+
+    vec3 world_vertex = basis * (p3d_Vertex.xyz * agent_scale) + position;
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(world_vertex, 1.);
+    world_normal = basis * p3d_Normal;
+    texcoords = p3d_MultiTexCoord0;
+}
+''',
+fragment='''
+#version 140
+
+uniform sampler2D p3d_Texture0;
+uniform vec3 light_direction;
+uniform float ambient;
+
+in vec2 texcoords;
+in vec3 world_normal;
+flat in vec4 instance_color;
+out vec4 fragColor;
+
+void main() {
+    float diffuse = max(dot(normalize(world_normal), -light_direction), 0.);
+    vec4 color = texture(p3d_Texture0, texcoords) * instance_color;
+    fragColor = vec4(color.rgb * (ambient + (1. - ambient) * diffuse), color.a);
+}
+''',
+default_input={
+    'agent_scale': 1.0,
+    'light_direction': Vec3(0, -1, 0),
+    'ambient': 0.4,
+})
+
+
+# === ORIENTATION ===
+
+def orientation_bases(directions):
+    """
+    Rotation matrices turning the fish model to face each direction.
+
+    The fish model lies on its side: it faces local +z with its back along
+    local +x, so local +x is kept as close to world up as the heading allows.
+    This is the same basis the instanced shader builds on the GPU.
+
+    :param directions: A numpy array (N, 3) of agent directions.
+    :return: A numpy array (N, 3, 3) whose rows are the world-space images of
+             the local x, y and z axes (Panda3D row-vector convention).
+    """
+    forward = directions / np.maximum(np.linalg.norm(directions, axis=1, keepdims=True), 1e-12)
+
+    dorsal = -forward[:, 1:2] * forward
+    dorsal[:, 1] += 1.0
+    length = np.linalg.norm(dorsal, axis=1, keepdims=True)
+    vertical = length[:, 0] < 1e-6
+    dorsal = np.divide(dorsal, length, out=np.zeros_like(dorsal), where=length > 1e-6)
+    dorsal[vertical] = (1.0, 0.0, 0.0)
+
+    lateral = np.cross(forward, dorsal)
+    return np.stack((dorsal, lateral, forward), axis=1)
+
+
+def orientation_quaternions(directions):
+    """
+    Quaternions (w, x, y, z) turning the fish model to face each direction,
+    computed for the whole swarm at once.
+
+    :param directions: A numpy array (N, 3) of agent directions.
+    :return: A numpy array (N, 4) of unit quaternions in Panda3D component order.
+    """
+    m = orientation_bases(directions)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+
+    # Build from the largest of w, x, y, z so the division is always well conditioned
+    q = np.empty((m.shape[0], 4))
+    diagonal = np.stack((m00 + m11 + m22, m00, m11, m22), axis=1)
+    case = np.argmax(diagonal, axis=1)
+
+    c = case == 0
+    s = 2.0 * np.sqrt(1.0 + diagonal[c, 0])
+    q[c] = np.stack((0.25 * s, (m12[c] - m21[c]) / s, (m20[c] - m02[c]) / s, (m01[c] - m10[c]) / s), axis=1)
+
+    c = case == 1
+    s = 2.0 * np.sqrt(1.0 + m00[c] - m11[c] - m22[c])
+    q[c] = np.stack(((m12[c] - m21[c]) / s, 0.25 * s, (m01[c] + m10[c]) / s, (m20[c] + m02[c]) / s), axis=1)
+
+    c = case == 2
+    s = 2.0 * np.sqrt(1.0 + m11[c] - m00[c] - m22[c])
+    q[c] = np.stack(((m20[c] - m02[c]) / s, (m01[c] + m10[c]) / s, 0.25 * s, (m12[c] + m21[c]) / s), axis=1)
+
+    c = case == 3
+    s = 2.0 * np.sqrt(1.0 + m22[c] - m00[c] - m11[c])
+    q[c] = np.stack(((m01[c] - m10[c]) / s, (m20[c] + m02[c]) / s, (m12[c] + m21[c]) / s, 0.25 * s), axis=1)
+
+    return q
+
+
+def apply_entity_transforms(entities, positions, directions):
+    """
+    Place and orient one entity per agent, with every orientation computed in a single batch.
+
+    :param entities: Agent entities, one per row of the arrays.
+    :param positions: A numpy array (N, 3) of agent positions.
+    :param directions: A numpy array (N, 3) of agent directions.
+    """
+    quaternions = orientation_quaternions(directions)
+    for entity, position, quaternion in zip(entities, positions.tolist(), quaternions.tolist()):
+        entity.setPosQuat(Vec3(*position), Quat(*quaternion))
+
+
+# === INSTANCED RENDERING ===
+
+def pack_instances(positions, directions, out):
+    """
+    Write agent positions and directions into the per-agent texel rows of an instance buffer.
+    Colours in the third texel are left untouched.
+
+    :param positions: A numpy array (N, 3) of agent positions.
+    :param directions: A numpy array (N, 3) of agent directions.
+    :param out: Instance array (capacity, TEXELS_PER_AGENT, 4) of float32.
+    :return: View of the packed rows for the N agents.
+    """
+    n = positions.shape[0]
+    out[:n, 0, :3] = positions
+    out[:n, 1, :3] = directions
+    return out[:n]
+
+
+class InstancedAgents:
+    """
+    Single instanced entity drawing every agent with one shared model.
+
+    Instance data lives in a persistent (capacity, 3, 4) float32 array; `update`
+    refreshes it from the swarm state arrays and uploads the live agents' rows
+    to a buffer texture sized for them in one call.
+    """
+
+    def __init__(self, model, texture=None, scale=1.0, capacity=100):
+        """
+        Create the instanced entity.
+
+        :param model: Model path or node path shared by every agent.
+        :param texture: Optional texture path applied to every agent.
+        :param scale: Uniform agent scale.
+        :param capacity: Number of agents to preallocate instance data for.
+        """
+        self.entity = Entity(model=model, texture=texture, shader=instanced_agent_shader)
+        self.entity.set_shader_input('agent_scale', float(scale))
+
+        # Instances are placed in the shader, so the node's own bounds mean nothing
+        self.entity.node().setBounds(OmniBoundingVolume())
+        self.entity.node().setFinal(True)
+
+        self.buffer_texture = Texture('agent_instances')
+        self.buffer_rows = 0
+        self.instances = None
+        self.count = 0
+        self.reserve(capacity)
+        self._resize_buffer(1)
+
+    @property
+    def capacity(self):
+        """
+        Number of agents instance data is allocated for.
+        """
+        return self.instances.shape[0]
+
+    def reserve(self, capacity):
+        """
+        Grow the instance buffer so that it can hold at least `capacity` agents.
+        Existing instance data is preserved.
+        """
+        if self.instances is not None and capacity <= self.capacity:
+            return
+
+        old = self.instances
+        new_capacity = max(capacity, 1) if old is None else max(capacity, 2 * self.capacity)
+        self.instances = np.zeros((new_capacity, TEXELS_PER_AGENT, 4), dtype=np.float32)
+        self.instances[:, 2] = 1.0  # default white
+        if old is not None:
+            self.instances[:old.shape[0]] = old
+
+    def _resize_buffer(self, rows):
+        """
+        Size the buffer texture for `rows` agents. Only done when the live count changes.
+        """
+        self.buffer_texture.setup_buffer_texture(
+            rows * TEXELS_PER_AGENT, Texture.T_float, Texture.F_rgba32, GeomEnums.UH_dynamic
+        )
+        self.buffer_rows = rows
+        self.entity.set_shader_input('instances', self.buffer_texture)
+
+    def set_colors(self, colors, start=0):
+        """
+        Set per-agent RGBA colours.
+
+        :param colors: Sequence of colours (Ursina colours or RGBA tuples).
+        :param start: Index of the agent the first colour belongs to.
+        """
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 4)
+        end = start + colors.shape[0]
+        self.reserve(end)
+        self.instances[start:end, 2] = colors
+
+    def set_scale(self, scale):
+        """
+        Set the uniform scale applied to every agent.
+        """
+        self.entity.set_shader_input('agent_scale', float(scale))
+
+    def update(self, positions, directions):
+        """
+        Upload the current agent transforms and draw one instance per agent.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param directions: A numpy array (N, 3) of agent directions.
+        """
+        n = positions.shape[0]
+        self.reserve(n)
+        pack_instances(positions, directions, self.instances)
+
+        # One bulk upload of the live agents' instance data
+        if n > 0:
+            if n != self.buffer_rows:
+                self._resize_buffer(n)
+            self.buffer_texture.set_ram_image(self.instances[:n])
+
+        if n != self.count:
+            self.count = n
+            self.entity.enabled = n > 0
+            if n > 0:
+                self.entity.setInstanceCount(n)
+
+    def destroy(self):
+        """
+        Remove the instanced entity from the scene.
+        """
+        destroy(self.entity)
@@ -0,0 +1,150 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: asset_pool.py
+Description: Loads each model and texture once and recycles scene entities, so environment and
+agent visuals can be rebuilt by repositioning pooled entities instead of creating new ones.
+"""
+
+from panda3d.core import NodePath
+from ursina import Entity, application, load_model, load_texture
+
+
+# Every asset used by the scene, loaded up front by preload_assets()
+scene_models = [
+    'quad',
+    'cube',
+    'models/tailor2.obj',
+    'models/rock1.obj',
+    'models/rock2.obj',
+    'models/rock3.obj',
+    'models/lilypad.obj',
+]
+scene_textures = [
+    'textures/rock_08_diff_1k.jpg',
+    'textures/Tailor_low_DefaultMaterial_BaseColor.png',
+]
+
+
+class AssetCache:
+    """
+    Process-wide cache of loaded models and textures.
+
+    Models are kept as template node paths; each request returns a copy that
+    shares the template's vertex data, so no file is parsed or mesh rebuilt
+    more than once. Missing textures are cached too, so they are only looked
+    up once.
+    """
+
+    models = {}
+    textures = {}
+
+    @staticmethod
+    def model(path):
+        """
+        Return a new node path sharing the cached geometry of a model.
+
+        :param path: Model path relative to the asset folder, or a built-in model name.
+        :return: NodePath ready to be assigned to an Entity's model.
+        """
+        template = AssetCache.models.get(path)
+        if template is None:
+            template = load_model(path) or load_model(path, application.internal_models_compressed_folder)
+            if template is None:
+                return path  # Let Ursina report the missing model
+            AssetCache.models[path] = template
+        model = template.copyTo(NodePath())
+        model.setPos(0, 0, 0)  # Match Ursina, which centres models loaded by name
+        return model
+
+    @staticmethod
+    def texture(path):
+        """
+        Return the cached texture for a path, loading it on first use.
+
+        :param path: Texture path relative to the asset folder, or None.
+        :return: Ursina Texture, or None if the path is None or the file is missing.
+        """
+        if path is None:
+            return None
+        if path not in AssetCache.textures:
+            AssetCache.textures[path] = load_texture(path)
+            if AssetCache.textures[path] is None:
+                print(f"[Assets] Missing texture: {path}")
+        return AssetCache.textures[path]
+
+
+def preload_assets():
+    """
+    Load every scene model and texture into the cache.
+    """
+    for path in scene_models:
+        AssetCache.model(path)
+    for path in scene_textures:
+        AssetCache.texture(path)
+    print(f"[Assets] Preloaded {len(AssetCache.models)} models and {len(AssetCache.textures)} textures")
+
+
+class EntityPool:
+    """
+    Recycles disabled entities that share one model.
+    """
+
+    def __init__(self, model):
+        """
+        :param model: Model path every entity in this pool uses.
+        """
+        self.model = model
+        self.free = []
+
+    def acquire(self, **attributes):
+        """
+        Take an entity from the pool, or create one if the pool is empty.
+
+        :param attributes: Entity attributes to apply (position, scale, color, ...).
+        :return: An enabled Entity.
+        """
+        if self.free:
+            entity = self.free.pop()
+            entity.enabled = True
+        else:
+            entity = Entity(model=AssetCache.model(self.model))
+            entity.pool = self
+        for name, value in attributes.items():
+            setattr(entity, name, value)
+        return entity
+
+    def release(self, entity):
+        """
+        Disable an entity and return it to the pool.
+        """
+        entity.enabled = False
+        self.free.append(entity)
+
+
+# Entity pools keyed by model path
+entity_pools = {}
+
+
+def acquire_entity(model, **attributes):
+    """
+    Take a pooled entity using the given model.
+
+    :param model: Model path.
+    :param attributes: Entity attributes to apply.
+    :return: An enabled Entity.
+    """
+    if model not in entity_pools:
+        entity_pools[model] = EntityPool(model)
+    return entity_pools[model].acquire(**attributes)
+
+
+def release_entities(entities):
+    """
+    Return pooled entities to their pools and empty the given list.
+
+    :param entities: List of entities created by acquire_entity.
+    """
+    for entity in entities:
+        entity.pool.release(entity)
+    entities.clear()
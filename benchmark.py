@@ -0,0 +1,273 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: benchmark.py
+Description: Headless scaling benchmark. Sweeps agent counts on a log scale together with neighbour
+backends, obstacle on/off and world sizes, reports steps/sec, nanoseconds per agent-step and peak
+memory for each case, and checks the results against a stored baseline.
+
+Usage:
+    python benchmark.py --out benchmark_results.csv
+    python benchmark.py --agents 100 1000 10000 --backends grid kdtree --world-scales 1 4
+    python benchmark.py --save-baseline benchmarks/baseline.csv
+    python benchmark.py --baseline benchmarks/baseline.csv --threshold 0.15
+"""
+
+import argparse
+import csv
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+
+import numpy as np
+import psutil
+
+from agent import Agent, spawn_agents
+from config import simulation_config, default_simulation_config, get_active_movement_model, seed_rng
+from headless import apply_overrides
+from sweep import grid_points, save_results, parse_value
+
+# Values identifying a benchmark case
+CASE_KEYS = ["num_agents", "neighbour_backend", "obstacle_enabled", "world_scale"]
+RESULT_COLUMNS = ["steps", "seconds", "steps_per_sec", "ns_per_agent_step", "peak_rss_mb"]
+
+# Largest swarm benchmarked per backend; brute force is quadratic
+BACKEND_AGENT_LIMITS = {"brute": 10_000}
+
+
+# === CASES ===
+
+def log_agent_counts(low=10, high=100_000, per_decade=1):
+    """
+    Agent counts spaced evenly on a log scale.
+
+    :param low: Smallest agent count.
+    :param high: Largest agent count.
+    :param per_decade: Number of counts per factor of ten.
+    :return: Sorted list of distinct integer counts, including both ends.
+    """
+    num = int(round(np.log10(high / low) * per_decade)) + 1
+    return np.unique(np.round(np.geomspace(low, high, num)).astype(int)).tolist()
+
+
+def benchmark_cases(agent_counts, backends=("grid", "kdtree", "brute"), obstacles=(False, True), world_scales=(1,)):
+    """
+    Every combination of the benchmarked settings, skipping swarms too large
+    for a backend (see BACKEND_AGENT_LIMITS).
+
+    :return: List of case dictionaries keyed by CASE_KEYS.
+    """
+    cases = grid_points({
+        "num_agents": list(agent_counts),
+        "neighbour_backend": list(backends),
+        "obstacle_enabled": list(obstacles),
+        "world_scale": list(world_scales),
+    })
+    return [c for c in cases if c["num_agents"] <= BACKEND_AGENT_LIMITS.get(c["neighbour_backend"], np.inf)]
+
+
+def case_overrides(case, base_config):
+    """
+    Config overrides for a case. The world scale multiplies every boundary of
+    the base configuration, so the tank keeps its proportions.
+
+    :param case: Case dictionary.
+    :param base_config: Configuration the case starts from.
+    :return: Dictionary of config overrides.
+    """
+    scale = case["world_scale"]
+    return {
+        "neighbour_backend": case["neighbour_backend"],
+        "obstacle_enabled": case["obstacle_enabled"],
+        "x_max": base_config["x_max"] * scale,
+        "y_max": base_config["y_max"] * scale,
+        "z_max": base_config["z_max"] * scale,
+    }
+
+
+# === MEASUREMENT ===
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in megabytes.
+    """
+    info = psutil.Process().memory_info()
+    peak = getattr(info, "peak_wset", None)  # Windows
+    if peak is None:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak *= 1024  # Reported in kilobytes on Linux
+    return peak / 2**20
+
+
+def run_case(base_config, case, min_steps=5, max_steps=300, min_seconds=1.0, warmup_steps=2, seed=0, dt=0.1):
+    """
+    Time one benchmark case.
+
+    Steps run until at least `min_steps` steps and `min_seconds` seconds have
+    passed, or `max_steps` steps, so small swarms are timed over many steps
+    and very large ones over a few. Warm-up steps (JIT compilation, first
+    allocations) are not timed.
+
+    :param base_config: Configuration the case starts from.
+    :param case: Case dictionary keyed by CASE_KEYS.
+    :return: Case dictionary extended with the RESULT_COLUMNS.
+    """
+    simulation_config.clear()
+    simulation_config.update(deepcopy(base_config))
+    # Also copies the base config's speed limits onto the Agent class
+    apply_overrides(case_overrides(case, base_config))
+    simulation_config["num_agents"] = case["num_agents"]
+
+    seed_rng(seed)
+    spawn_agents()
+    model = get_active_movement_model()
+
+    for _ in range(warmup_steps):
+        model.step(Agent.state, dt)
+
+    steps = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while steps < max_steps and (steps < min_steps or elapsed < min_seconds):
+        model.step(Agent.state, dt)
+        steps += 1
+        elapsed = time.perf_counter() - start
+
+    result = dict(case)
+    result.update({
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+        "ns_per_agent_step": elapsed / (steps * case["num_agents"]) * 1e9,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    return result
+
+
+def run_suite(cases, workers=1, base_config=None, out=None, **case_options):
+    """
+    Run every case in a fresh process, so each peak memory reading belongs to
+    that case alone.
+
+    :param cases: List of case dictionaries.
+    :param workers: Concurrent cases; keep at 1 for stable timings.
+    :param base_config: Configuration each case starts from (defaults to the defaults).
+    :param out: Optional .csv or .npz path for the results.
+    :param case_options: Step limits and seed passed to run_case().
+    :return: List of result dictionaries, in case order.
+    """
+    base_config = deepcopy(base_config or default_simulation_config)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_case, base_config, case, **case_options) for case in cases]
+        results = []
+        for i, future in enumerate(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[Benchmark] {i + 1}/{len(cases)} {_case_label(result)}: "
+                  f"{result['steps_per_sec']:.1f} steps/s, {result['ns_per_agent_step']:.0f} ns/agent, "
+                  f"{result['peak_rss_mb']:.0f} MB")
+
+    if out:
+        save_results({key: np.array([r[key] for r in results]) for key in CASE_KEYS + RESULT_COLUMNS}, out)
+    return results
+
+
+def _case_label(case):
+    """
+    Short description of a case for log lines.
+    """
+    obstacle = "obstacle" if case["obstacle_enabled"] else "open"
+    return f"{case['num_agents']} agents, {case['neighbour_backend']}, {obstacle}, world x{case['world_scale']}"
+
+
+# === BASELINE COMPARISON ===
+
+def load_results(filepath):
+    """
+    Read benchmark results saved as .csv.
+
+    :param filepath: Results file written by run_suite().
+    :return: List of result dictionaries with values parsed as Python literals.
+    """
+    with open(filepath, newline="") as f:
+        return [{key: parse_value(value) for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+def compare_to_baseline(results, baseline, threshold=0.10, metric="steps_per_sec"):
+    """
+    Find cases that got slower than the baseline by more than a threshold.
+    Cases missing from the baseline are not compared.
+
+    :param results: List of result dictionaries.
+    :param baseline: List of baseline result dictionaries.
+    :param threshold: Allowed fractional slowdown, e.g. 0.10 for 10%.
+    :param metric: Higher-is-better result column to compare.
+    :return: List of (case, baseline value, current value, fractional change) for each regression.
+    """
+    reference = {tuple(row[k] for k in CASE_KEYS): row[metric] for row in baseline}
+    regressions = []
+    for result in results:
+        expected = reference.get(tuple(result[k] for k in CASE_KEYS))
+        if expected is None or expected <= 0:
+            continue
+        change = result[metric] / expected - 1
+        if change < -threshold:
+            regressions.append(({k: result[k] for k in CASE_KEYS}, expected, result[metric], change))
+    return regressions
+
+
+# === COMMAND LINE ===
+
+def main(argv=None):
+    """
+    Command-line entry point for the scaling benchmark.
+    Exits with status 1 when a case regresses against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Headless scaling benchmark for the swarm simulation.")
+    parser.add_argument("--agents", type=int, nargs="+", default=None,
+                        help="Agent counts (default: log scale from 10 to --max-agents).")
+    parser.add_argument("--max-agents", type=int, default=100_000, help="Largest agent count on the log scale.")
+    parser.add_argument("--per-decade", type=int, default=1, help="Agent counts per factor of ten.")
+    parser.add_argument("--backends", nargs="+", default=["grid", "kdtree", "brute"], help="Neighbour backends.")
+    parser.add_argument("--obstacle", nargs="+", choices=["off", "on"], default=["off", "on"],
+                        help="Run with the obstacle off, on, or both.")
+    parser.add_argument("--world-scales", type=float, nargs="+", default=[1], help="Boundary size multipliers.")
+    parser.add_argument("--min-steps", type=int, default=5, help="Fewest timed steps per case.")
+    parser.add_argument("--max-steps", type=int, default=300, help="Most timed steps per case.")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Shortest timed duration per case.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for spawning.")
+    parser.add_argument("--out", default="benchmark_results.csv", help="Results file (.csv or .npz).")
+    parser.add_argument("--baseline", default=None, help="Baseline .csv to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown against the baseline.")
+    parser.add_argument("--save-baseline", default=None, help="Also save the results as a new baseline .csv.")
+    args = parser.parse_args(argv)
+
+    counts = args.agents or log_agent_counts(10, args.max_agents, args.per_decade)
+    world_scales = [int(s) if float(s).is_integer() else s for s in args.world_scales]
+    cases = benchmark_cases(counts, args.backends, [o == "on" for o in args.obstacle], world_scales)
+
+    print(f"[Benchmark] Running {len(cases)} cases")
+    results = run_suite(cases, out=args.out, min_steps=args.min_steps, max_steps=args.max_steps,
+                        min_seconds=args.min_seconds, seed=args.seed)
+    if args.save_baseline:
+        save_results({key: np.array([r[key] for r in results]) for key in CASE_KEYS + RESULT_COLUMNS},
+                     args.save_baseline)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), args.threshold)
+        for case, expected, actual, change in regressions:
+            print(f"[Benchmark] Regression: {_case_label(case)}: {actual:.1f} steps/s "
+                  f"vs {expected:.1f} baseline ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"[Benchmark] No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,52 @@ Description: Houses the global configuration dictionary used across the simulati
 """
 
 from copy import deepcopy
-from ursina import color, Entity
 import numpy as np
 
+# Ursina is only needed for rendering; headless runs work without it
+try:
+    from ursina import color
+except ImportError:
+    color = None
+
+def _create_boids():
+    from movement_model import Boids
+    return Boids()
+
+# Registered movement model factories, keyed by the name used in simulation_config
+movement_model_registry = {
+    "Boids": _create_boids,
+}
+
+# Cached (name, instance) of the movement model currently in use
+_active_movement_model = (None, None)
+
 def get_movement_model_by_name(name):
     """
-    Factory function to return a movement model instance based on its string name.
+    Factory function to return a new movement model instance based on its string name.
     Currently only supports 'Boids'.
 
     :param name: Name of the movement model.
     :return: Instance of the selected movement model class.
     """
-    if name == "Boids":
-        from movement_model import Boids
-        return Boids()
+    if name in movement_model_registry:
+        return movement_model_registry[name]()
     raise ValueError(f"Unknown movement model: {name}")
 
-def update_config(key, slider):
+def get_active_movement_model():
+    """
+    Return the cached instance of the configured movement model.
+    A new instance is only created when simulation_config["movement_model"] changes.
+
+    :return: Instance of the active movement model class.
+    """
+    global _active_movement_model
+    name = simulation_config["movement_model"]
+    if _active_movement_model[0] != name:
+        _active_movement_model = (name, get_movement_model_by_name(name))
+    return _active_movement_model[1]
+
+def update_config(key, slider, config=None):
     """
     Update the simulation configuration dictionary using a slider's value.
     Handles both single-value keys and indexed values (e.g., camera_position[0]).
@@ -30,15 +59,17 @@ def update_config(key, slider):
 
     :param key: Configuration key string, may include indexing.
     :param slider: Ursina Slider object with a `.value` field.
+    :param config: Configuration dictionary to update, defaults to simulation_config.
     """
+    config = simulation_config if config is None else config
     val = slider.value
 
     if '[' in key and ']' in key:
         base_key, index = key.split('[')
         index = int(index.rstrip(']'))
-        simulation_config[base_key][index] = val
+        config[base_key][index] = val
     else:
-        simulation_config[key] = val
+        config[key] = val
 
     # Round to integer if needed
     if key == "num_agents":
@@ -46,13 +77,13 @@ def update_config(key, slider):
 
     # Maintain symmetry for simulation bounds
     if key == "x_max":
-        simulation_config["x_min"] = -val
+        config["x_min"] = -val
     elif key == "y_max":
-        simulation_config["y_min"] = -val
+        config["y_min"] = -val
     elif key == "z_max":
-        simulation_config["z_min"] = -val
+        config["z_min"] = -val
 
-    simulation_config[key] = val
+    config[key] = val
 
 def pack_boundaries(config):
     """
@@ -106,16 +137,25 @@ simulation_config = {
 
     # --- Simulation Control ---
     "movement_model": "Boids",
+    "neighbour_backend": "grid",    # "brute", "grid" or "kdtree"
+    "use_jit": True,                # Use the Numba kernel when installed
     "camera_position": [25, 20, -75],
     "camera_look_at": [0, 0, 0],
     "camera_orbit_speed": 1,
-    "frame_duration": 1/60,
+    "frame_duration": 1/60,         # Wall-clock seconds per simulation tick
+    "simulation_speed": 1.0,        # Simulated seconds per real second
+    "max_ticks_per_frame": 8,       # Hidden (drops backlog after slow frames)
+    "threaded_simulation": False,   # Run physics on a background thread
+    "random_seed": None,            # Seed for spawning, physics fallbacks and decorations (None = unseeded)
+    "profiler_overlay": False,      # Show per-phase p50/p95/p99 frame times on screen
+    "profile_output": None,         # Stream per-frame phase times to this .csv/.parquet file (None = off)
     "num_agents": 30,
     "init_direction_bounds": (-1.0, 1.0),
     "init_speed_bounds": (0.01, 0.1),
     "agent_scale": 2,
     "agent_colour_mode": "white",
     "fish_texture_enabled": True,
+    "instanced_rendering": True,    # Draw all agents as one instanced model
 
     # --- World Boundaries ---
     "x_max": 10,
@@ -132,8 +172,154 @@ simulation_config = {
     "obstacle_enabled": False,
     "obstacle_corner_min": [-10, 0, -10],
     "obstacle_corner_max": [10, 1, 10],
-    "obstacle_colour": color.white,
+    "obstacles": [],                # Extra boxes as [corner_min, corner_max] pairs, always active
+    "obstacle_colour": color.white if color else None,
 }
 
 # A clean copy used for resets or reloads
 default_simulation_config = deepcopy(simulation_config)
+
+
+# === CONFIG CHANGE SETS ===
+
+# Subsystem refreshed when each key changes. Keys not listed (camera, hidden
+# tuning values) are read directly every frame and need no refresh.
+config_subsystems = {
+    **dict.fromkeys([
+        "perception_radius", "min_speed", "max_speed", "acceleration", "deceleration",
+        "momentum_weight", "direction_alpha", "turn_sensitivity",
+        "cohesion_radius", "cohesion_weight", "alignment_radius", "alignment_weight",
+        "separation_radius", "separation_weight",
+        "wall_repulsion_weight", "boundary_threshold", "boundary_max_force",
+    ], "physics"),
+    **dict.fromkeys([
+        "obstacle_enabled", "obstacle_corner_min", "obstacle_corner_max", "obstacle_colour", "obstacles",
+    ], "obstacle"),
+    **dict.fromkeys(["x_min", "x_max", "y_min", "y_max", "z_min", "z_max"], "boundaries"),
+    "num_agents": "agent_count",
+    **dict.fromkeys([
+        "agent_scale", "agent_colour_mode", "fish_texture_enabled", "instanced_rendering",
+    ], "agent_visuals"),
+}
+
+
+class ConfigChangeSet:
+    """
+    Coalesces configuration edits made during a frame.
+
+    Edits are queued and only written to the config by `flush`, which runs
+    while no background batch is reading it. `flush` then diffs each edited
+    key against its value before the frame, so a key dragged back and forth
+    within a frame only counts as changed if it ends up different.
+    """
+
+    def __init__(self, config):
+        """
+        :param config: Configuration dictionary the edits are applied to.
+        """
+        self.config = config
+        self.previous = {}
+        self.pending = {}  # key -> (slider, value), latest edit per key
+
+    def _record(self, key):
+        """
+        Remember the pre-edit value of a key, once per frame.
+
+        :param key: Configuration key, may include indexing.
+        """
+        base_key = key.split('[')[0]
+        if base_key not in self.previous:
+            self.previous[base_key] = deepcopy(self.config[base_key])
+
+    def update(self, key, slider):
+        """
+        Queue a slider edit; the slider's value at the next flush is applied through update_config.
+
+        :param key: Configuration key string, may include indexing.
+        :param slider: Ursina Slider object with a `.value` field.
+        """
+        self.pending[key] = (slider, None)
+
+    def set(self, key, value):
+        """
+        Queue a direct edit of a configuration key.
+
+        :param key: Configuration key.
+        :param value: New value.
+        """
+        self.pending[key] = (None, value)
+
+    def get(self, key):
+        """
+        Value a key will have after the next flush.
+
+        :param key: Configuration key without indexing.
+        """
+        if key not in self.pending:
+            return self.config[key]
+        slider, value = self.pending[key]
+        return value if slider is None else slider.value
+
+    def discard(self):
+        """
+        Drop the edits queued since the last flush without applying them.
+        """
+        self.pending = {}
+
+    def flush(self):
+        """
+        Write the queued edits to the config and return the keys whose values
+        changed since the last flush, grouped by the subsystem that has to be
+        refreshed, and start a new change set.
+
+        :return: Dictionary mapping subsystem name to a list of changed keys.
+        """
+        for key, (slider, value) in self.pending.items():
+            self._record(key)
+            if slider is None:
+                self.config[key] = value
+            else:
+                update_config(key, slider, self.config)
+        self.pending = {}
+
+        changes = {}
+        for key, old in self.previous.items():
+            if not np.array_equal(np.asarray(old, dtype=object), np.asarray(self.config[key], dtype=object)):
+                subsystem = config_subsystems.get(key)
+                if subsystem:
+                    changes.setdefault(subsystem, []).append(key)
+        self.previous = {}
+        return changes
+
+
+# Change set shared by the settings UI and playback
+config_changes = ConfigChangeSet(simulation_config)
+
+
+# === RANDOM NUMBER GENERATION ===
+
+# Independent random streams, so that e.g. regenerating decorations never
+# changes which swarm is spawned or how the physics fallbacks resolve
+rng_streams = ("spawn", "physics", "decoration")
+
+_rngs = {}
+
+def seed_rng(seed=None):
+    """
+    Re-create every random stream from one seed.
+
+    :param seed: Integer seed, or None for fresh OS entropy.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(rng_streams))
+    _rngs.update({name: np.random.default_rng(child) for name, child in zip(rng_streams, children)})
+
+def get_rng(stream="spawn"):
+    """
+    Return the shared numpy Generator for a random stream.
+
+    :param stream: One of rng_streams.
+    :return: numpy.random.Generator.
+    """
+    return _rngs[stream]
+
+seed_rng(simulation_config["random_seed"])
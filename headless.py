@@ -0,0 +1,158 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: headless.py
+Description: Runs the swarm simulation without rendering for batch studies on render-less machines.
+
+Usage:
+    python headless.py --agents 5000 --steps 10000 --out recordings/run
+    python headless.py --agents 500 --steps 2000 --set cohesion_weight=2.0 --set x_max=20
+    python headless.py --agents 100000 --steps 200 --processes 8 --set x_max=200 --set z_max=200
+"""
+
+import argparse
+import ast
+import time
+
+from agent import Agent, spawn_agents
+from config import simulation_config, get_active_movement_model, pack_boundaries, seed_rng
+from record_playback import SimulationRecorder
+from slab_parallel import SlabDecomposition
+
+
+def parse_overrides(pairs):
+    """
+    Parse "key=value" strings into a dictionary of config overrides.
+    Values are read as Python literals where possible, otherwise kept as strings.
+
+    :param pairs: Iterable of "key=value" strings.
+    :return: Dictionary of overrides.
+    """
+    overrides = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        if key not in simulation_config:
+            raise ValueError(f"Unknown config key: {key}")
+        try:
+            overrides[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            overrides[key] = value
+    return overrides
+
+
+def apply_overrides(overrides):
+    """
+    Apply config overrides in place, keeping the world boundaries symmetric
+    in the same way as the settings sliders, and refresh the speed limits
+    cached on the Agent class.
+
+    :param overrides: Dictionary of config keys to values.
+    """
+    for key, value in overrides.items():
+        simulation_config[key] = value
+        if key in ("x_max", "y_max", "z_max"):
+            simulation_config[key[0] + "_min"] = -value
+
+    Agent.max_speed = simulation_config["max_speed"]
+    Agent.min_speed = simulation_config["min_speed"]
+
+
+def run_headless(num_agents, steps, out=None, record_every=1, seed=None, overrides=None, dt=0.1, progress=True,
+                 processes=0):
+    """
+    Run the simulation without rendering or frame throttling.
+
+    :param num_agents: Number of agents to spawn.
+    :param steps: Number of simulation steps to run.
+    :param out: Optional recording directory to stream sampled frames to.
+    :param record_every: Record every n-th step when writing output.
+    :param seed: Optional seed for reproducible spawning and physics fallbacks.
+    :param overrides: Optional dictionary of config overrides.
+    :param dt: Movement step passed to the movement model.
+    :param progress: Print progress lines while running.
+    :param processes: Split the world into this many slabs stepped by separate
+                      processes over shared memory; 0 or 1 runs in this process.
+    :return: Dictionary summary with steps, seconds and steps_per_sec.
+    """
+    apply_overrides(overrides or {})
+    simulation_config["num_agents"] = num_agents
+
+    if seed is not None:
+        seed_rng(seed)
+
+    spawn_agents()
+    if processes > 1:
+        model = SlabDecomposition(processes)
+        model.start()
+    else:
+        model = get_active_movement_model()
+
+    recorder = None
+    if out:
+        recorder = SimulationRecorder()
+        recorder.start(filepath=out)
+
+    start = time.perf_counter()
+    report_every = max(1, steps // 10)
+
+    for step in range(steps):
+        model.step(Agent.state, dt)
+
+        if recorder and (step + 1) % record_every == 0:
+            positions, directions, _ = Agent.state.live()
+            recorder.record_frame(
+                positions,
+                directions,
+                num_agents,
+                pack_boundaries(simulation_config),
+                simulation_config["obstacle_corner_min"],
+                simulation_config["obstacle_corner_max"],
+                simulation_config["obstacle_enabled"]
+            )
+
+        if progress and (step + 1) % report_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"[Headless] Step {step + 1}/{steps} ({(step + 1) / elapsed:.1f} steps/s)")
+
+    elapsed = time.perf_counter() - start
+
+    if isinstance(model, SlabDecomposition):
+        model.close()
+    if recorder:
+        recorder.stop_and_save()
+
+    return {
+        "steps": steps,
+        "num_agents": num_agents,
+        "seconds": elapsed,
+        "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    """
+    Command-line entry point for headless runs.
+    """
+    parser = argparse.ArgumentParser(description="Run the swarm simulation without rendering.")
+    parser.add_argument("--agents", type=int, default=simulation_config["num_agents"], help="Number of agents.")
+    parser.add_argument("--steps", type=int, default=1000, help="Number of simulation steps.")
+    parser.add_argument("--out", default=None, help="Output recording directory for sampled frames.")
+    parser.add_argument("--record-every", type=int, default=1, help="Record every n-th step.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for spawning.")
+    parser.add_argument("--dt", type=float, default=0.1, help="Movement step per simulation step.")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Step the swarm across this many slab worker processes.")
+    parser.add_argument("--set", dest="overrides", action="append", metavar="KEY=VALUE",
+                        help="Override a simulation_config value (repeatable).")
+    args = parser.parse_args(argv)
+
+    summary = run_headless(
+        args.agents, args.steps, out=args.out, record_every=args.record_every,
+        seed=args.seed, overrides=parse_overrides(args.overrides), dt=args.dt, processes=args.processes
+    )
+    print(f"[Headless] {summary['steps']} steps with {summary['num_agents']} agents in "
+          f"{summary['seconds']:.2f}s ({summary['steps_per_sec']:.1f} steps/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: jit_kernels.py
+Description: Optional Numba-compiled whole-swarm Boids step, loaded lazily with a NumPy fallback.
+"""
+
+import numpy as np
+
+from physics import WallPhysics
+
+# Replaced by numba.prange when the kernel is compiled; plain range otherwise
+prange = range
+
+_compiled_step = None
+_compiled_grid_query = None
+_jit_unavailable = False
+
+# Layout of the packed parameter array passed to the kernel
+(P_COH_R, P_COH_W, P_ALI_R, P_ALI_W, P_SEP_R, P_SEP_W,
+ P_WALL_W, P_THRESHOLD, P_MAX_FORCE, P_ALPHA, P_TURN, P_MAX_SPEED, P_MIN_SPEED,
+ P_ACC_RATE, P_DEC_RATE, P_MOMENTUM, P_DT) = range(17)
+
+
+def pack_step_params(cfg, min_speed, dt):
+    """
+    Pack the configuration values used by the kernel into a float array.
+
+    :param cfg: The simulation configuration dictionary.
+    :param min_speed: Lower speed clamp applied to agents.
+    :param dt: Movement step applied to the velocity.
+    :return: Tuple (params, bounds) of float64 arrays.
+    """
+    params = np.array([
+        cfg["cohesion_radius"], cfg["cohesion_weight"],
+        cfg["alignment_radius"], cfg["alignment_weight"],
+        cfg["separation_radius"], cfg["separation_weight"],
+        cfg["wall_repulsion_weight"], cfg["boundary_threshold"], cfg["boundary_max_force"],
+        cfg["direction_alpha"] / cfg["momentum_weight"],
+        np.radians(cfg["turn_sensitivity"]),
+        cfg["max_speed"], min_speed,
+        1 - np.exp(-cfg["acceleration"]), 1 - np.exp(-cfg["deceleration"]),
+        cfg["momentum_weight"],
+        dt,
+    ], dtype=np.float64)
+
+    bounds = np.stack(WallPhysics.wall_bounds(cfg))
+    return params, bounds
+
+
+def step_kernel(positions, directions, speeds, indptr, indices, params, bounds, obstacle_forces,
+                new_directions, new_speeds):
+    """
+    Advance every agent by one step using a CSR neighbour list.
+
+    Mirrors Boids.step_all: all agents read the start-of-step state, then
+    directions, speeds and positions are written back in place. Runs as
+    plain Python when Numba is unavailable (slow, useful for testing).
+
+    :param obstacle_forces: (N, 3) obstacle repulsion per agent, from
+                            ObstaclePhysics.calculate_obstacle_repulsion_all.
+
+    :param new_directions: Scratch (N, 3) array for the updated headings.
+    :param new_speeds: Scratch (N,) array for the updated speeds.
+    """
+    n = positions.shape[0]
+    threshold = params[P_THRESHOLD]
+    max_force = params[P_MAX_FORCE]
+
+    for i in prange(n):
+        px = positions[i, 0]
+        py = positions[i, 1]
+        pz = positions[i, 2]
+
+        # Single pass over the neighbours accumulating all three rules
+        cx = cy = cz = 0.0
+        ax = ay = az = 0.0
+        sx = sy = sz = 0.0
+        n_coh = 0
+        n_ali = 0
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            dx = positions[j, 0] - px
+            dy = positions[j, 1] - py
+            dz = positions[j, 2] - pz
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 <= 0.0:
+                continue
+            d = np.sqrt(d2)
+            if d <= params[P_COH_R]:
+                cx += dx
+                cy += dy
+                cz += dz
+                n_coh += 1
+            if d <= params[P_ALI_R]:
+                ax += directions[j, 0]
+                ay += directions[j, 1]
+                az += directions[j, 2]
+                n_ali += 1
+            if d <= params[P_SEP_R]:
+                sx -= dx / d2
+                sy -= dy / d2
+                sz -= dz / d2
+
+        # Normalize each rule vector
+        tx = ty = tz = 0.0
+        if n_coh > 0:
+            norm = np.sqrt(cx * cx + cy * cy + cz * cz)
+            if norm > 0.0:
+                w = params[P_COH_W] / norm
+                tx += w * cx
+                ty += w * cy
+                tz += w * cz
+        if n_ali > 0:
+            norm = np.sqrt(ax * ax + ay * ay + az * az)
+            if norm > 0.0:
+                w = params[P_ALI_W] / norm
+                tx += w * ax
+                ty += w * ay
+                tz += w * az
+        norm = np.sqrt(sx * sx + sy * sy + sz * sz)
+        if norm > 0.0:
+            w = params[P_SEP_W] / norm
+            tx += w * sx
+            ty += w * sy
+            tz += w * sz
+
+        # Wall repulsion per axis
+        wx = _wall_push(px, bounds[0, 0], bounds[1, 0], threshold, max_force)
+        wy = _wall_push(py, bounds[0, 1], bounds[1, 1], threshold, max_force)
+        wz = _wall_push(pz, bounds[0, 2], bounds[1, 2], threshold, max_force)
+
+        tx += params[P_WALL_W] * (wx + obstacle_forces[i, 0])
+        ty += params[P_WALL_W] * (wy + obstacle_forces[i, 1])
+        tz += params[P_WALL_W] * (wz + obstacle_forces[i, 2])
+
+        # Target heading, falling back to the current direction
+        ox = directions[i, 0]
+        oy = directions[i, 1]
+        oz = directions[i, 2]
+        norm = np.sqrt(tx * tx + ty * ty + tz * tz)
+        if norm > 1e-6:
+            tx /= norm
+            ty /= norm
+            tz /= norm
+        else:
+            tx = ox
+            ty = oy
+            tz = oz
+
+        # Momentum blending
+        alpha = params[P_ALPHA]
+        onorm = np.sqrt(ox * ox + oy * oy + oz * oz)
+        nx = (1 - alpha) * ox / onorm + alpha * tx
+        ny = (1 - alpha) * oy / onorm + alpha * ty
+        nz = (1 - alpha) * oz / onorm + alpha * tz
+        norm = np.sqrt(nx * nx + ny * ny + nz * nz)
+        nx /= norm
+        ny /= norm
+        nz /= norm
+
+        # Target speed from the turning angle, then exponential smoothing
+        align = min(1.0, max(-1.0, nx * ox + ny * oy + nz * oz))
+        max_speed = params[P_MAX_SPEED]
+        target = max_speed if np.arccos(align) <= params[P_TURN] else -abs(max_speed)
+        speed = speeds[i]
+        rate = params[P_DEC_RATE] if target < speed else params[P_ACC_RATE]
+        speed += (target - speed) * rate * params[P_MOMENTUM]
+        speed = max(params[P_MIN_SPEED], min(max_speed, speed))
+
+        new_directions[i, 0] = nx
+        new_directions[i, 1] = ny
+        new_directions[i, 2] = nz
+        new_speeds[i] = speed
+
+    # Write back once every agent has read the old state
+    dt = params[P_DT]
+    for i in prange(n):
+        speeds[i] = new_speeds[i]
+        for axis in range(3):
+            directions[i, axis] = new_directions[i, axis]
+            positions[i, axis] += new_directions[i, axis] * new_speeds[i] * dt
+
+
+def _wall_push(p, low, high, threshold, max_force):
+    """
+    Wall repulsion along one axis for a coordinate `p` between walls at `low` and `high`.
+    """
+    if p < low + threshold:
+        return max_force * (threshold - (p - low)) / threshold
+    if p > high - threshold:
+        return -max_force * (threshold - (high - p)) / threshold
+    return 0.0
+
+
+def grid_query_kernel(positions, coords, dims, order, cell_start, cell_end, radius):
+    """
+    Build a CSR neighbour list from a SpatialGrid without materializing candidates.
+
+    Counts the neighbours of each agent across its 27 surrounding cells, then
+    fills indices, deltas and distances in a second pass.
+
+    :return: Tuple (indptr, indices, deltas, distances).
+    """
+    n = positions.shape[0]
+    counts = np.zeros(n, dtype=np.int64)
+
+    for i in prange(n):
+        counts[i] = _scan_cells(i, positions, coords, dims, order, cell_start, cell_end, radius,
+                                np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty(0), 0)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(counts)
+    indices = np.empty(indptr[n], dtype=np.int64)
+    deltas = np.empty((indptr[n], 3))
+    distances = np.empty(indptr[n])
+
+    for i in prange(n):
+        _scan_cells(i, positions, coords, dims, order, cell_start, cell_end, radius,
+                    indices, deltas, distances, indptr[i])
+
+    return indptr, indices, deltas, distances
+
+
+def _scan_cells(i, positions, coords, dims, order, cell_start, cell_end, radius,
+                indices, deltas, distances, start):
+    """
+    Visit the agents in the 27 cells around agent `i`, counting those within
+    `radius` and, when `indices` is non-empty, writing them from `start`.
+    """
+    fill = indices.size > 0
+    count = 0
+    for ox in range(-1, 2):
+        x = coords[i, 0] + ox
+        if x < 0 or x >= dims[0]:
+            continue
+        for oy in range(-1, 2):
+            y = coords[i, 1] + oy
+            if y < 0 or y >= dims[1]:
+                continue
+            for oz in range(-1, 2):
+                z = coords[i, 2] + oz
+                if z < 0 or z >= dims[2]:
+                    continue
+                key = (x * dims[1] + y) * dims[2] + z
+                for s in range(cell_start[key], cell_end[key]):
+                    j = order[s]
+                    dx = positions[j, 0] - positions[i, 0]
+                    dy = positions[j, 1] - positions[i, 1]
+                    dz = positions[j, 2] - positions[i, 2]
+                    d = np.sqrt(dx * dx + dy * dy + dz * dz)
+                    if d > 0.0 and d <= radius:
+                        if fill:
+                            k = start + count
+                            indices[k] = j
+                            deltas[k, 0] = dx
+                            deltas[k, 1] = dy
+                            deltas[k, 2] = dz
+                            distances[k] = d
+                        count += 1
+    return count
+
+
+def _compile():
+    """
+    Compile every kernel in this module with Numba, helpers first.
+
+    :return: True if compilation succeeded, False if Numba is not installed.
+    """
+    global _compiled_step, _compiled_grid_query, _scan_cells, _wall_push, prange
+
+    try:
+        import numba
+    except ImportError:
+        print("[JIT] Numba not available, using NumPy kernels.")
+        return False
+
+    prange = numba.prange
+    _scan_cells = numba.njit(cache=True)(_scan_cells)
+    _wall_push = numba.njit(cache=True)(_wall_push)
+    _compiled_grid_query = numba.njit(parallel=True, nogil=True, cache=True)(grid_query_kernel)
+    _compiled_step = numba.njit(parallel=True, nogil=True, cache=True)(step_kernel)
+    return True
+
+
+def get_step_kernel():
+    """
+    Return the compiled step kernel, compiling it on first use.
+
+    :return: The Numba-compiled kernel, or None if Numba is not installed.
+    """
+    global _jit_unavailable
+    if _compiled_step is None and not _jit_unavailable:
+        _jit_unavailable = not _compile()
+    return _compiled_step
+
+
+def get_grid_query_kernel():
+    """
+    Return the compiled grid neighbour query, compiling it on first use.
+
+    :return: The Numba-compiled kernel, or None if Numba is not installed.
+    """
+    global _jit_unavailable
+    if _compiled_grid_query is None and not _jit_unavailable:
+        _jit_unavailable = not _compile()
+    return _compiled_grid_query
@@ -20,13 +20,19 @@ import simulation
 from simulation import *
 from config import *
 from settings_ui import *
-from config import default_simulation_config, simulation_config, pack_boundaries, unpack_boundaries
+from config import default_simulation_config, simulation_config, pack_boundaries, unpack_boundaries, config_changes
 import time
 import psutil
 import csv
 import datetime
 from movement_model import Boids
 from record_playback import SimulationRecorder, SimulationPlayback
+from agent_renderer import apply_entity_transforms
+from asset_pool import preload_assets
+from timestep import FixedTimestep, StateInterpolator
+from simulation_worker import SimulationWorker
+from profiler import profiler
+import atexit
 import tkinter as tk
 from tkinter import filedialog
 import math
@@ -39,63 +45,140 @@ tk_root.withdraw()
 DirectionalLight(shadows=True, rotation=(90, 20, 0))
 AmbientLight(color=Color(255/255, 245/255, 220/255, 100/255))  # Soft warm ambient light
 
+# --- Asset Preloading ---
+preload_assets()
+
 # --- Runtime State ---
-last_time = time.time()
 recorder = SimulationRecorder()
 playback = SimulationPlayback()
 agent_entities = simulation.reset_simulation()
 
+# Fixed simulation ticks, drawn interpolated between the last two ticks
+timestep = FixedTimestep(simulation_config["frame_duration"], simulation_config["max_ticks_per_frame"])
+interpolator = StateInterpolator()
+
+# Background physics thread, used when simulation_config["threaded_simulation"] is on
+simulation_worker = SimulationWorker(Agent.state, lambda state: get_active_movement_model().step(state))
+
+# Per-phase frame profiling, optionally streamed to a file
+profiler_overlay = build_profiler_overlay()
+if simulation_config["profile_output"]:
+    profiler.start_writing(simulation_config["profile_output"], extra_columns=("num_agents", "neighbour_backend"))
+    atexit.register(profiler.stop_writing)
+
 # Orbit camera state
 auto_rotate_enabled = False
 orbit_angle = 0
 
+# Scrubber position at the last seek, so a held knob does not seek every frame
+last_scrub_value = None
+
 # Register callback to mark reset points in the recorder
-simulation.register_reset_callback(lambda: setattr(recorder, 'last_reset_frame_index', len(recorder.frames)))
+simulation.register_reset_callback(recorder.mark_reset)
 
 
 # === UPDATE LOOP ===
 def update():
     """
-    Core update loop for the simulation.
-    Handles camera rotation, simulation step, frame recording, and playback.
+    Core update loop for the simulation, called once per rendered frame.
+    Handles camera rotation, then runs as many fixed simulation or playback
+    ticks as the elapsed time allows, and draws agents interpolated between ticks.
     """
-    global last_time, orbit_angle, current_count, agent_entities
-    current_time = time.time()
-    elapsed_time = current_time - last_time
+    # --- Profiler Frame ---
+    # Everything since the last update returned was the engine rendering the previous frame
+    profiler.end("render")
+    profiler.end_frame(num_agents=Agent.state.count, neighbour_backend=simulation_config["neighbour_backend"])
 
     # --- Camera Position Update ---
     update_camera_position()
 
-    # --- Frame Throttling ---
-    if elapsed_time < frame_duration:
-        time.sleep(frame_duration - elapsed_time)
+    # --- Scrubbing seeks directly ---
+    global last_scrub_value
+    if playback.is_playing() and playback_scrubber.knob.dragging and playback_scrubber.value != last_scrub_value:
+        last_scrub_value = playback_scrubber.value
+        playback.seek(round(playback_scrubber.value * (playback.total_frames - 1)))
+
+    # --- Wait for Background Ticks ---
+    # The swarm state may only be touched once the previous batch is complete
+    simulation_worker.wait()
+    profiler.add(simulation_worker.collect_phase_times())
+
+    # --- Config Changes ---
+    # Refresh subsystems affected by slider and playback edits since the last frame
+    apply_config_changes()
+
+    # --- Fixed Simulation Ticks ---
+    ticks = timestep.advance(time.dt, simulation_config["simulation_speed"])
+    if threaded_simulation_active():
+        # Physics runs on the worker while this frame renders the last completed batch
+        simulation_worker.submit(ticks, before_tick=record_tick)
+    else:
+        for _ in range(ticks):
+            simulation_tick()
+        simulation_worker.mark_stale()
 
-    # --- Frame Recording ---
-    if recorder.is_recording():
-        packed_boundaries = pack_boundaries(simulation_config)
-        recorder.record_frame(
-            Boids.positions,
-            Boids.directions,
-            simulation_config["num_agents"],
-            packed_boundaries,
-            simulation_config["obstacle_corner_min"],
-            simulation_config["obstacle_corner_max"],
-            simulation_config["obstacle_enabled"]
-        )
+    # --- Interpolated Agent Visuals ---
+    with profiler.span("entity_sync"):
+        update_agent_visuals(timestep.alpha)
+
+    # The scrub bar follows playback
+    if playback.is_playing() and not playback_scrubber.knob.dragging:
+        playback_scrubber.value = playback.progress()
+        last_scrub_value = playback_scrubber.value
+
+    # --- Profiler Overlay ---
+    # Percentiles are refreshed a few times a second rather than every frame
+    profiler_overlay.enabled = simulation_config["profiler_overlay"]
+    if profiler_overlay.enabled and profiler.frame_count % 30 == 0:
+        profiler_overlay.text = profiler.summary_text()
+
+    profiler.begin("render")
+
+
+def threaded_simulation_active():
+    """
+    Whether live physics runs on the background worker this frame.
+    Playback always runs on the main thread.
+    """
+    return simulation_config["threaded_simulation"] and not playback.is_playing()
+
+
+def simulation_tick():
+    """
+    Advance the simulation, or the playback, by one fixed tick and record it.
+    """
+    positions, directions, _ = Agent.state.live()
+    interpolator.snapshot(positions, directions)
+    record_tick()
 
     # --- Simulation or Playback Step ---
     if not playback.is_playing():
-        # Normal simulation update step
-        for agent, agent_entity in zip(Agent.all_agents, agent_entities):
-            agent.update_position()
-            update_agent_entities(agent, agent_entity)
+        # Advance the whole swarm in one batched pass
+        get_active_movement_model().step(Agent.state)
     else:
         # Apply a saved frame from recording
-        frame = playback.update()
-        if frame:
-            apply_playback_frame(frame)
+        with profiler.span("playback"):
+            frame = playback.update()
+            if frame:
+                apply_playback_frame(frame)
+
 
-    last_time = time.time()
+def record_tick():
+    """
+    Record the current swarm state as one frame if recording is active.
+    """
+    if recorder.is_recording():
+        with profiler.span("recording"):
+            packed_boundaries = pack_boundaries(simulation_config)
+            recorder.record_frame(
+                Agent.state.positions,
+                Agent.state.directions,
+                Agent.state.count,
+                packed_boundaries,
+                simulation_config["obstacle_corner_min"],
+                simulation_config["obstacle_corner_max"],
+                simulation_config["obstacle_enabled"]
+            )
 
 
 # === CAMERA LOGIC ===
@@ -138,53 +221,85 @@ def update_camera_position():
 # === RESET LOGIC ===
 def reset_helper(to_default=False):
     """Reset the simulation. Optionally resets all config to default values."""
+    simulation_worker.wait()
     if to_default:
         reset_simulation_to_default(settings_containers)
 
     global agent_entities
     agent_entities = simulation.reset_simulation()
+    interpolator.invalidate()
+    simulation_worker.mark_stale()
 
 
 # === PLAYBACK FRAME HANDLING ===
 def apply_playback_frame(frame):
     """
-    Apply a playback frame to update simulation visuals and parameters.
+    Apply a playback frame to the swarm state and simulation parameters.
+    Agent visuals are drawn from the state by the next update.
     """
     global current_count, agent_entities
 
     pos_frame = frame['positions']
     dir_frame = frame['directions']
 
-    if frame['reset'] or playback.current_frame == 1:
+    if frame['reset']:
         # Reset and respawn agents from the frame's state
-        current_count = frame['num_agents']
+        current_count = int(frame['num_agents'])
         simulation_config['num_agents'] = current_count
         unpack_boundaries(frame['boundary_size'], simulation_config)
         agent_entities = reset_simulation()
+        interpolator.invalidate()
+    elif frame['seek']:
+        # Jumps restore the frame's world and swarm size without rebuilding the scene
+        current_count = int(frame['num_agents'])
+        simulation_config['num_agents'] = current_count
+        agent_entities = set_agent_count(current_count)
+        boundaries = pack_boundaries(simulation_config)
+        unpack_boundaries(frame['boundary_size'], simulation_config)
+        if boundaries.tolist() != pack_boundaries(simulation_config).tolist():
+            reset_boundaries(relayout=False)
+        interpolator.invalidate()
+    elif int(frame['num_agents']) != current_count:
+        # Agent count changed mid-segment: grow or shrink the swarm in place
+        current_count = int(frame['num_agents'])
+        simulation_config['num_agents'] = current_count
+        agent_entities = set_agent_count(current_count)
 
-    # Apply obstacle parameters
-    simulation_config['obstacle_enabled'] = frame['obstacle_toggle']
-    simulation_config['obstacle_corner_min'] = frame['obstacle_corner_min']
-    simulation_config['obstacle_corner_max'] = frame['obstacle_corner_max']
-    refresh_obstacle()
+    # Apply obstacle parameters; the obstacle is only refreshed when they change
+    config_changes.set('obstacle_enabled', bool(frame['obstacle_toggle']))
+    config_changes.set('obstacle_corner_min', list(frame['obstacle_corner_min']))
+    config_changes.set('obstacle_corner_max', list(frame['obstacle_corner_max']))
 
-    # Update visual position and orientation
-    for i in range(current_count):
-        agent = Agent.all_agents[i]
-        agent.position = pos_frame[i]
-        agent.direction = dir_frame[i]
-        update_agent_entities(agent, agent_entities[i])
+    # Update agent positions and orientations
+    Agent.state.positions[:current_count] = pos_frame[:current_count]
+    Agent.state.directions[:current_count] = dir_frame[:current_count]
 
 
-def update_agent_entities(agent, entity):
-    """Apply agent state to the corresponding entity in the scene."""
-    entity.position = agent.position
-    entity.look_at(agent.direction + agent.position)
+def update_agent_visuals(alpha=1.0):
+    """
+    Push the agent state to the scene: one bulk upload when instanced,
+    otherwise per-entity transforms from a single batched orientation pass.
+
+    With threaded simulation the most recently completed worker buffer is
+    drawn, since the live state is being advanced in the background.
+
+    :param alpha: Fraction of the way from the previous tick's state to the current one.
+    """
+    if threaded_simulation_active():
+        positions, directions = simulation_worker.latest().blend(alpha)
+    else:
+        positions, directions, _ = Agent.state.live()
+        positions, directions = interpolator.blend(positions, directions, alpha)
+    if simulation.agent_renderer is not None:
+        simulation.agent_renderer.update(positions, directions)
+    else:
+        apply_entity_transforms(agent_entities, positions, directions)
 
 
 # === TOGGLE CONTROLS ===
 def toggle_recording():
     """Start or stop the recorder depending on its state."""
+    simulation_worker.wait()
     if playback.is_playing():
         print("⚠️ Cannot start recording while playback is active.")
         return
@@ -198,30 +313,30 @@ def toggle_recording():
 
 def toggle_playback():
     """Start or stop playback from a file."""
+    simulation_worker.wait()
     if recorder.is_recording():
         print("⚠️ Cannot start playback while recording is active.")
         return
     if not playback.is_playing():
         filepath = filedialog.askopenfilename(
             title="Select a recording file",
-            filetypes=[("NumPy compressed", "*.npz")]
+            filetypes=[("Swarm recording", "index.json"), ("NumPy compressed", "*.npz")]
         )
         if filepath:
             playback.load(filepath)
             playback.start()
             playback_toggle.text = 'Stop Playback'
+            set_playback_controls_enabled(playback.is_playing())
     else:
         playback.stop()
         playback_toggle.text = 'Play Recording'
+        set_playback_controls_enabled(False)
 
 
-# === CALLBACK HOOK ===
-def handle_agent_redraw():
-    """Trigger full visual redraw of all agents."""
-    global agent_entities
-    agent_entities = redraw_agents()
-
-register_redraw_callback(handle_agent_redraw)
+def set_playback_controls_enabled(enabled):
+    """Show or hide the scrub bar and reverse button."""
+    playback_scrubber.enabled = enabled
+    reverse_toggle.enabled = enabled
 
 
 # === UI INITIALIZATION ===
@@ -249,6 +364,9 @@ record_toggle, playback_toggle = build_control_buttons(
     toggle_playback
 )
 
+# Playback scrub bar and reverse button
+playback_scrubber, reverse_toggle = build_playback_controls(playback.reverse)
+
 # Camera orbit toggle
 build_orbit_toggle(camera_ui, toggle_auto_rotate)
 
@@ -0,0 +1,323 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: microbench.py
+Description: Micro-benchmarks for the individual Boids rules and physics functions. Each benchmark
+times one function in isolation on synthetic swarms at several densities, and every run is appended
+to a JSON history so changes to a single kernel can be compared against earlier runs.
+
+Usage:
+    python microbench.py
+    python microbench.py --only cohesion separation --densities dense --label "vectorised separation"
+    python microbench.py --agents 2000 --history benchmarks/microbench_history.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import timeit
+from contextlib import contextmanager
+from copy import deepcopy
+
+import numpy as np
+
+from agent import Agent, spawn_agents
+from config import simulation_config
+from movement_model import Boids
+from physics import WallPhysics, ObstaclePhysics
+
+# Agents per unit volume; with the default radii a dense swarm gives each agent ~100 neighbours
+DENSITIES = {"sparse": 0.01, "medium": 0.1, "dense": 1.0}
+
+DEFAULT_HISTORY = os.path.join("benchmarks", "microbench_history.json")
+
+
+# === SYNTHETIC SWARMS ===
+
+@contextmanager
+def synthetic_swarm(num_agents, density, seed=0):
+    """
+    Spawn a swarm of uniformly placed agents in a cube sized for the given
+    density, with the obstacle enabled around the middle of the cube.
+    The configuration and swarm are restored afterwards.
+
+    :param num_agents: Number of agents.
+    :param density: Agents per unit volume.
+    :param seed: Seed for the agents' positions and directions.
+    :return: Context manager yielding the list of agents.
+    """
+    saved = deepcopy(simulation_config)
+    half = 0.5 * (num_agents / density) ** (1 / 3)
+    try:
+        for axis in "xyz":
+            simulation_config[f"{axis}_min"] = -half
+            simulation_config[f"{axis}_max"] = half
+        simulation_config["num_agents"] = num_agents
+        simulation_config["obstacle_enabled"] = True
+        simulation_config["obstacle_corner_min"] = [-half / 4] * 3
+        simulation_config["obstacle_corner_max"] = [half / 4] * 3
+        yield spawn_agents(np.random.default_rng(seed))
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+        Agent.clear_all()
+
+
+def sample_agents(agents, count):
+    """
+    Evenly spaced subset of the swarm that per-agent benchmarks cycle through.
+    """
+    return agents[::max(1, len(agents) // count)][:count]
+
+
+def _neighbour_data(agents, sample):
+    """
+    Copies of precompute_agent_data's output for each sampled agent, since
+    the function returns views of buffers reused by the next call.
+    """
+    return [tuple(a.copy() for a in Boids.precompute_agent_data(agent, agents)) for agent in sample]
+
+
+# === BENCHMARKS ===
+# Each takes the swarm and sampled agents and returns (function, calls made by one function call)
+
+def bench_precompute(agents, sample):
+    def run():
+        for agent in sample:
+            Boids.precompute_agent_data(agent, agents)
+    return run, len(sample)
+
+
+def bench_cohesion(agents, sample):
+    data = _neighbour_data(agents, sample)
+
+    def run():
+        for agent, (positions, _, _, distances) in zip(sample, data):
+            Boids.calc_cohesion(agent, positions, distances)
+    return run, len(sample)
+
+
+def bench_alignment(agents, sample):
+    data = _neighbour_data(agents, sample)
+
+    def run():
+        for agent, (_, directions, _, distances) in zip(sample, data):
+            Boids.calc_alignment(agent, directions, distances)
+    return run, len(sample)
+
+
+def bench_separation(agents, sample):
+    data = _neighbour_data(agents, sample)
+
+    def run():
+        for _, _, deltas, distances in data:
+            Boids.calc_separation(deltas, distances)
+    return run, len(sample)
+
+
+def bench_adjust_speed(agents, sample):
+    # Runs the whole per-agent steering pipeline, so the state drifts between rounds
+    def run():
+        for agent in sample:
+            Boids.adjust_speed(agent)
+    return run, len(sample)
+
+
+def bench_wall_repulsion(agents, sample):
+    def run():
+        for agent in sample:
+            WallPhysics.calc_wall_repulsion(agent)
+    return run, len(sample)
+
+
+def bench_obstacle_repulsion(agents, sample):
+    threshold, max_force = simulation_config["boundary_threshold"], simulation_config["boundary_max_force"]
+
+    def run():
+        for agent in sample:
+            ObstaclePhysics.calculate_obstacle_repulsion(agent.position, threshold, max_force)
+    return run, len(sample)
+
+
+def bench_wall_repulsion_all(agents, sample):
+    positions = Agent.state.live()[0]
+    return lambda: WallPhysics.calc_wall_repulsion_all(positions), len(agents)
+
+
+def bench_obstacle_repulsion_all(agents, sample):
+    positions = Agent.state.live()[0]
+    threshold, max_force = simulation_config["boundary_threshold"], simulation_config["boundary_max_force"]
+    return lambda: ObstaclePhysics.calculate_obstacle_repulsion_all(positions, threshold, max_force), len(agents)
+
+
+# Benchmarks by name; "_all" entries time the whole-swarm versions, reported per agent
+benchmarks = {
+    "precompute_agent_data": bench_precompute,
+    "cohesion": bench_cohesion,
+    "alignment": bench_alignment,
+    "separation": bench_separation,
+    "adjust_speed": bench_adjust_speed,
+    "wall_repulsion": bench_wall_repulsion,
+    "obstacle_repulsion": bench_obstacle_repulsion,
+    "wall_repulsion_all": bench_wall_repulsion_all,
+    "obstacle_repulsion_all": bench_obstacle_repulsion_all,
+}
+
+
+# === TIMING ===
+
+def measure(function, calls=1, rounds=7, min_round_time=0.02):
+    """
+    Time a function over several rounds, each repeating it enough times to
+    last at least `min_round_time` seconds.
+
+    :param function: Zero-argument callable to time.
+    :param calls: Calls to the benchmarked function made by one call of `function`.
+    :param rounds: Number of timed rounds.
+    :param min_round_time: Shortest duration of one round in seconds.
+    :return: Dictionary of per-call nanoseconds (min, median, mean, stddev) and the repetitions used.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_round_time:
+        number *= 2
+    per_call = np.array(timer.repeat(rounds, number)) / (number * calls) * 1e9
+    return {
+        "min_ns": float(per_call.min()),
+        "median_ns": float(np.median(per_call)),
+        "mean_ns": float(per_call.mean()),
+        "stddev_ns": float(per_call.std()),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def run_benchmarks(names=None, densities=None, num_agents=500, sample_size=32, seed=0, **timing):
+    """
+    Run the selected benchmarks at each density.
+
+    :param names: Benchmark names (defaults to all).
+    :param densities: Density names from DENSITIES (defaults to all).
+    :param num_agents: Agents in each synthetic swarm.
+    :param sample_size: Agents cycled through by per-agent benchmarks.
+    :param seed: Seed for the synthetic swarms.
+    :param timing: Options passed to measure().
+    :return: Nested dictionary {benchmark: {density: timing}}.
+    """
+    names = names or list(benchmarks)
+    densities = densities or list(DENSITIES)
+    results = {name: {} for name in names}
+
+    for density in densities:
+        for name in names:
+            # A fresh swarm per benchmark, as some benchmarks move the agents
+            with synthetic_swarm(num_agents, DENSITIES[density], seed) as agents:
+                function, calls = benchmarks[name](agents, sample_agents(agents, sample_size))
+                results[name][density] = measure(function, calls, **timing)
+            print(f"[Microbench] {name:<24}{density:<8}{results[name][density]['median_ns']:>12.0f} ns/call")
+    return results
+
+
+# === HISTORY ===
+
+def run_metadata(label=None, num_agents=None):
+    """
+    Describe the machine and code version a run was made on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "label": label,
+        "commit": commit,
+        "num_agents": num_agents,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def load_history(filepath):
+    """
+    Read the list of recorded runs, or an empty list if there is no history yet.
+    """
+    if not os.path.exists(filepath):
+        return []
+    with open(filepath) as f:
+        return json.load(f)
+
+
+def append_history(filepath, run):
+    """
+    Add a run to the JSON history file, creating it if needed.
+
+    :param filepath: History file path.
+    :param run: Dictionary with "meta" and "results".
+    :return: The updated history.
+    """
+    history = load_history(filepath)
+    history.append(run)
+    if os.path.dirname(filepath):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump(history, f, indent=2)
+    return history
+
+
+def compare_runs(previous, current):
+    """
+    Relative change in median time per benchmark and density.
+
+    :param previous: Earlier run's results.
+    :param current: Latest run's results.
+    :return: Dictionary {(benchmark, density): fractional change}, negative when faster.
+    """
+    changes = {}
+    for name, by_density in current.items():
+        for density, timing in by_density.items():
+            before = previous.get(name, {}).get(density)
+            if before:
+                changes[(name, density)] = timing["median_ns"] / before["median_ns"] - 1
+    return changes
+
+
+# === COMMAND LINE ===
+
+def main(argv=None):
+    """
+    Command-line entry point for the micro-benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Time individual Boids rules and physics functions.")
+    parser.add_argument("--only", nargs="+", choices=list(benchmarks), default=None, help="Benchmarks to run.")
+    parser.add_argument("--densities", nargs="+", choices=list(DENSITIES), default=None, help="Swarm densities.")
+    parser.add_argument("--agents", type=int, default=500, help="Agents in each synthetic swarm.")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic swarms.")
+    parser.add_argument("--label", default=None, help="Note stored with the run, e.g. the change being tested.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history file.")
+    parser.add_argument("--no-save", action="store_true", help="Do not add this run to the history.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.densities, num_agents=args.agents, seed=args.seed, rounds=args.rounds)
+
+    history = load_history(args.history)
+    if history:
+        previous = history[-1]
+        print(f"[Microbench] Change against {previous['meta']['timestamp']} ({previous['meta']['label'] or 'unlabelled'}):")
+        for (name, density), change in compare_runs(previous["results"], results).items():
+            print(f"    {name:<24}{density:<8}{change:+.1%}")
+
+    if not args.no_save:
+        append_history(args.history, {"meta": run_metadata(args.label, args.agents), "results": results})
+        print(f"[Microbench] Run saved to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,286 @@ File: movement_model.py
 Description: Contains the core Boids-based movement logic: cohesion, separation, and alignment.
 """
 
-from config import simulation_config
+from config import simulation_config, pack_boundaries
 from agent import Agent
 from physics import *
+from jit_kernels import get_step_kernel, get_grid_query_kernel, pack_step_params
+from profiler import profiler
 import numpy as np
 
+
+class SpatialGrid:
+    """
+    Uniform-grid spatial hash (cell list) over the world bounds.
+
+    Agents are bucketed into cubic cells whose edge equals the largest active
+    interaction radius, so every neighbour within that radius lies in one of
+    the 27 cells around an agent's own cell. Refilled once per frame.
+    """
+    # Offsets to the 27 cells surrounding (and including) a cell
+    cell_offsets = np.array(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij')).reshape(3, -1).T
+
+    # Upper bound on cell count so tiny radii in huge worlds stay cheap
+    max_cells = 1 << 21
+
+    def __init__(self, cell_size, boundaries):
+        """
+        Initialize the grid geometry.
+
+        :param cell_size: Edge length of each cell (largest active radius).
+        :param boundaries: Array [x_min, x_max, y_min, y_max, z_min, z_max].
+        """
+        self.mins = np.asarray(boundaries[0::2], dtype=float)
+        extent = np.maximum(np.asarray(boundaries[1::2], dtype=float) - self.mins, 1e-9)
+
+        # Coarsen the grid if the requested cell size would create too many cells
+        cells_needed = np.prod(np.ceil(extent / cell_size))
+        if cells_needed > SpatialGrid.max_cells:
+            cell_size *= (cells_needed / SpatialGrid.max_cells) ** (1 / 3)
+
+        self.cell_size = cell_size
+        self.dims = np.maximum(np.ceil(extent / cell_size).astype(np.int64), 1)
+        self.coords = None
+        self.order = None
+        self.cell_start = np.zeros(int(np.prod(self.dims)), dtype=np.int64)
+        self.cell_end = np.zeros_like(self.cell_start)
+        self.occupied = np.zeros(0, dtype=np.int64)
+
+    def build(self, positions):
+        """
+        Bucket agents into cells, sorting agent indices by cell key.
+        Agents outside the bounds are clamped into the edge cells.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        """
+        coords = np.floor((positions - self.mins) / self.cell_size).astype(np.int64)
+        self.coords = np.clip(coords, 0, self.dims - 1)
+        keys = np.ravel_multi_index(self.coords.T, self.dims)
+
+        self.order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[self.order]
+
+        # Only occupied cells are written; cells filled by the previous build are cleared first
+        self.cell_start[self.occupied] = 0
+        self.cell_end[self.occupied] = 0
+        run_starts = np.flatnonzero(np.diff(sorted_keys, prepend=-1))
+        self.occupied = sorted_keys[run_starts]
+        self.cell_start[self.occupied] = run_starts
+        self.cell_end[self.occupied] = np.append(run_starts[1:], sorted_keys.size)
+
+    def query_pairs(self, positions, radius):
+        """
+        Find all ordered pairs (i, j) of distinct agents within `radius`.
+        Pairs are grouped by `i` in ascending order.
+
+        :param positions: The (N, 3) positions the grid was built from.
+        :param radius: Maximum neighbour distance (should not exceed the cell size).
+        :return: Tuple (rows, cols, deltas, distances) with deltas = positions[cols] - positions[rows].
+        """
+        n = positions.shape[0]
+
+        # Adjacent cell coordinates for every agent, dropping those outside the grid
+        neighbour_coords = self.coords[:, np.newaxis, :] + SpatialGrid.cell_offsets[np.newaxis, :, :]
+        valid = np.all((neighbour_coords >= 0) & (neighbour_coords < self.dims), axis=2)
+        agent_idx = np.broadcast_to(np.arange(n)[:, np.newaxis], valid.shape)[valid]
+        neighbour_keys = np.ravel_multi_index(neighbour_coords[valid].T, self.dims)
+
+        # Expand each (agent, cell) into the agents stored in that cell
+        starts = self.cell_start[neighbour_keys]
+        counts = self.cell_end[neighbour_keys] - starts
+        rows = np.repeat(agent_idx, counts)
+        run_offsets = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cols = self.order[np.repeat(starts, counts) + run_offsets]
+
+        # Exact distance test on the candidates
+        deltas = positions[cols] - positions[rows]
+        distances = np.linalg.norm(deltas, axis=1)
+        keep = (distances > 0) & (distances <= radius)
+        return rows[keep], cols[keep], deltas[keep], distances[keep]
+
+class NeighbourList:
+    """
+    CSR-style neighbour list shared by all Boids rules for one frame.
+
+    The neighbours of agent `i` are `indices[indptr[i]:indptr[i + 1]]`, with
+    matching `deltas` (neighbour position minus agent position) and `distances`.
+    """
+
+    def __init__(self, indptr, indices, deltas, distances):
+        self.indptr = indptr
+        self.indices = indices
+        self.deltas = deltas
+        self.distances = distances
+
+    @classmethod
+    def from_pairs(cls, n, rows, cols, deltas, distances):
+        """
+        Build a neighbour list from pair arrays already grouped by `rows`.
+
+        :param n: Number of agents.
+        """
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(indptr, cols, deltas, distances)
+
+    @classmethod
+    def empty(cls, n):
+        """
+        Neighbour list in which no agent has any neighbours.
+        """
+        return cls(np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3)), np.zeros(0))
+
+    @property
+    def num_agents(self):
+        return self.indptr.size - 1
+
+    def rows(self):
+        """
+        Agent index owning each neighbour entry.
+        """
+        return np.repeat(np.arange(self.num_agents), np.diff(self.indptr))
+
+
+class NeighbourBackend:
+    """
+    Abstract base class for neighbour-search backends.
+
+    Subclasses must implement:
+        - find(positions, radius): return a NeighbourList of distinct agents within radius.
+    """
+    def find(self, positions, radius):
+        """
+        Find neighbours of every agent. Must be implemented by subclasses.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param radius: Maximum neighbour distance.
+        """
+        raise NotImplementedError("Subclasses must implement find")
+
+    @staticmethod
+    def _pairs_to_list(positions, rows, cols, radius):
+        """
+        Filter candidate pairs by exact distance and pack them into a NeighbourList.
+        """
+        deltas = positions[cols] - positions[rows]
+        distances = np.linalg.norm(deltas, axis=1)
+        keep = (distances > 0) & (distances <= radius)
+        return NeighbourList.from_pairs(positions.shape[0], rows[keep], cols[keep], deltas[keep], distances[keep])
+
+
+class BruteForceNeighbours(NeighbourBackend):
+    """
+    Tests every agent against every other agent, in row blocks to bound memory.
+    Best for small swarms where index construction costs more than it saves.
+    """
+    block_size = 1024
+
+    def find(self, positions, radius):
+        n = positions.shape[0]
+        row_blocks, col_blocks = [], []
+        for start in range(0, n, self.block_size):
+            block = positions[start:start + self.block_size]
+            distances = np.linalg.norm(positions[np.newaxis, :, :] - block[:, np.newaxis, :], axis=2)
+            rows, cols = np.nonzero((distances > 0) & (distances <= radius))
+            row_blocks.append(rows + start)
+            col_blocks.append(cols)
+        if not row_blocks:
+            return NeighbourList.empty(n)
+        return self._pairs_to_list(positions, np.concatenate(row_blocks), np.concatenate(col_blocks), radius)
+
+
+class GridNeighbours(NeighbourBackend):
+    """
+    Uniform-grid spatial hash refilled every frame. The grid and its cell
+    buffers are kept until the radius or world bounds change.
+    Best for dense swarms filling a bounded tank.
+    """
+    def __init__(self):
+        self.grid = None
+        self._grid_key = None
+
+    def find(self, positions, radius):
+        boundaries = pack_boundaries(simulation_config)
+        key = (float(radius), *boundaries.tolist())
+        if key != self._grid_key:
+            self.grid = SpatialGrid(radius, boundaries)
+            self._grid_key = key
+        grid = self.grid
+        grid.build(positions)
+
+        # Compiled cell scan avoids materializing every candidate pair
+        kernel = get_grid_query_kernel() if simulation_config.get("use_jit", False) else None
+        if kernel is not None:
+            return NeighbourList(*kernel(positions, grid.coords, grid.dims, grid.order,
+                                         grid.cell_start, grid.cell_end, float(radius)))
+
+        rows, cols, deltas, distances = grid.query_pairs(positions, radius)
+        return NeighbourList.from_pairs(positions.shape[0], rows, cols, deltas, distances)
+
+
+class KDTreeNeighbours(NeighbourBackend):
+    """
+    KD-tree neighbour search using SciPy's cKDTree.
+    Best for sparse or clustered swarms in large volumes, where most grid cells are empty.
+    Falls back to the grid backend if SciPy is not installed.
+    """
+    def find(self, positions, radius):
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            print("[Boids] SciPy not available, using grid neighbour backend.")
+            neighbour_backends["kdtree"] = GridNeighbours()
+            return neighbour_backends["kdtree"].find(positions, radius)
+
+        pairs = cKDTree(positions).query_pairs(radius, output_type='ndarray')
+
+        # query_pairs yields each unordered pair once; expand to both directions grouped by row
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        order = np.argsort(rows, kind='stable')
+        return self._pairs_to_list(positions, rows[order], cols[order], radius)
+
+
+# Available neighbour-search backends, selected by simulation_config["neighbour_backend"]
+neighbour_backends = {
+    "brute": BruteForceNeighbours(),
+    "grid": GridNeighbours(),
+    "kdtree": KDTreeNeighbours(),
+}
+
+
+def get_neighbour_backend(name):
+    """
+    Return the neighbour-search backend registered under the given name.
+
+    :param name: One of the keys of `neighbour_backends`.
+    :return: NeighbourBackend instance.
+    """
+    if name in neighbour_backends:
+        return neighbour_backends[name]
+    raise ValueError(f"Unknown neighbour backend: {name}")
+
+
 class MovementModel:
     """
     Abstract base class for movement models.
 
     Subclasses must implement:
         - update_position(current_agent, all_agents): defines how an agent updates its position.
+
+    Subclasses may override:
+        - step(swarm, dt): advance the whole swarm at once, called once per frame.
     """
+    def step(self, swarm, dt=0.1):
+        """
+        Advance every agent by one frame. The default updates agents one at a time.
+
+        :param swarm: SwarmState backing all agents.
+        :param dt: Movement step applied to the velocity.
+        """
+        for agent in Agent.all_agents:
+            self.update_position(agent, Agent.all_agents)
+
     def update_position(self, current_agent, all_agents):
         """
         Update the position of an agent. Must be implemented by subclasses.
@@ -40,6 +308,9 @@ class Boids(MovementModel):
     distances = np.zeros(buffer_size)
     speeds = np.zeros(buffer_size)
 
+    # Shared per-neighbour buffer for the fused rule reduction
+    reduction_buffer = np.zeros((buffer_size, 11))
+
     @staticmethod
     def precompute_agent_data(current_agent, all_agents):
         """
@@ -69,6 +340,7 @@ class Boids(MovementModel):
         Boids.directions = np.zeros((new_size, 3))
         Boids.deltas = np.zeros((new_size, 3))
         Boids.distances = np.zeros(new_size)
+        Boids.speeds = np.zeros(new_size)
 
     @staticmethod
     def sync_buffers_from_agents(agent_list):
@@ -100,6 +372,201 @@ class Boids(MovementModel):
         velocity = current_agent.direction * current_agent.speed
         current_agent.position += velocity * 0.1  # Movement step
 
+    @staticmethod
+    def interaction_radius(cfg=None):
+        """
+        Largest radius among the rules that currently have a non-zero weight.
+        """
+        cfg = cfg or simulation_config
+        radii = [
+            cfg[f"{rule}_radius"]
+            for rule in ("cohesion", "alignment", "separation")
+            if cfg[f"{rule}_weight"] != 0
+        ]
+        return max(radii, default=0.0)
+
+    @staticmethod
+    def find_neighbours(positions):
+        """
+        Build the frame's neighbour list within the largest active radius using
+        the backend selected by simulation_config["neighbour_backend"].
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :return: NeighbourList shared by all three rules.
+        """
+        radius = Boids.interaction_radius()
+        if radius <= 0:
+            return NeighbourList.empty(positions.shape[0])
+
+        backend = get_neighbour_backend(simulation_config.get("neighbour_backend", "grid"))
+        return backend.find(positions, radius)
+
+    def step(self, swarm, dt=0.1):
+        """
+        Advance the whole swarm by one frame using the batched engine.
+        """
+        Boids.step_all(swarm, dt)
+
+    @staticmethod
+    def step_all(state, dt=0.1):
+        """
+        Advance the entire swarm by one step in a single batched pass.
+
+        Applies the same cohesion, alignment, separation, wall and obstacle
+        steering, momentum blending and speed smoothing as the per-agent
+        path, but every agent reads the state from the start of the step.
+
+        :param state: SwarmState holding (N, 3) positions/directions and (N,) speeds.
+        :param dt: Movement step applied to the velocity.
+        """
+        n = state.count
+        if n == 0:
+            return
+        positions, directions, speeds = state.live()
+        cfg = simulation_config
+
+        # Neighbour pairs within the largest active radius
+        with profiler.span("neighbours"):
+            neighbours = Boids.find_neighbours(positions)
+
+        # Compiled kernel path when enabled and Numba is installed
+        kernel = get_step_kernel() if cfg.get("use_jit", False) else None
+        if kernel is not None:
+            # Obstacle forces come from the BVH; the fused kernel does the rest of the step
+            with profiler.span("physics"):
+                obstacle = ObstaclePhysics.calculate_obstacle_repulsion_all(positions, cfg["boundary_threshold"], cfg["boundary_max_force"])
+            with profiler.span("forces"):
+                params, bounds = pack_step_params(cfg, Agent.min_speed, dt)
+                kernel(positions, directions, speeds, neighbours.indptr, neighbours.indices,
+                       params, bounds, obstacle, np.empty((n, 3)), np.empty(n))
+            return
+
+        with profiler.span("forces"):
+            cohesion, alignment, separation = Boids.reduce_rules(neighbours, directions)
+            combined = (
+                cfg["cohesion_weight"] * cohesion +
+                cfg["alignment_weight"] * alignment +
+                cfg["separation_weight"] * separation
+            )
+
+        with profiler.span("physics"):
+            combined += cfg["wall_repulsion_weight"] * WallPhysics.calc_wall_repulsion_all(positions)
+            combined += cfg["wall_repulsion_weight"] * ObstaclePhysics.calculate_obstacle_repulsion_all(positions, cfg["boundary_threshold"], cfg["boundary_max_force"])
+
+        with profiler.span("speed"):
+            # Normalized target heading, falling back to the current direction
+            norm = np.linalg.norm(combined, axis=1, keepdims=True)
+            target = np.where(norm > 1e-6, combined / np.maximum(norm, 1e-12), directions)
+
+            # Momentum blending of current and target headings
+            alpha = cfg["direction_alpha"] / cfg["momentum_weight"]
+            current = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+            new = (1 - alpha) * current + alpha * target
+            new /= np.linalg.norm(new, axis=1, keepdims=True)
+
+            # Target speed depends on how sharply each agent turned
+            align = np.clip(np.einsum('ij,ij->i', new, directions), -1, 1)
+            angle = np.arccos(align)
+            threshold = np.radians(cfg["turn_sensitivity"])
+            max_spd = cfg["max_speed"]
+            target_speed = np.where(angle <= threshold, max_spd, -abs(max_spd))
+
+            # Exponential smoothing towards the target speed
+            weight = cfg["momentum_weight"]
+            decelerating = target_speed < speeds
+            rate = np.where(decelerating, 1 - np.exp(-cfg["deceleration"]), 1 - np.exp(-cfg["acceleration"]))
+            new_speeds = speeds + (target_speed - speeds) * rate * weight
+            new_speeds = np.maximum(Agent.min_speed, np.minimum(max_spd, new_speeds))
+
+            # Write back into the persistent store
+            directions[:] = new
+            speeds[:] = new_speeds
+            positions += directions * speeds[:, np.newaxis] * dt
+
+    @staticmethod
+    def reduce_rules(neighbours, directions):
+        """
+        Fused single-pass reduction of cohesion, alignment and separation.
+
+        Every neighbour entry is written once into a shared (M, 11) buffer holding
+        [cohesion delta (3), cohesion count, neighbour heading (3), alignment count,
+        inverse-square repulsion (3)], which is then summed per agent in one
+        segmented reduction over the CSR neighbour list. A rule whose radius is at
+        least the list's radius (the outermost of the nested radii) needs no mask,
+        and rules with zero weight are skipped entirely.
+
+        :param neighbours: NeighbourList for the frame.
+        :param directions: A numpy array (N, 3) of agent directions.
+        :return: Tuple of (N, 3) unit cohesion, alignment and separation vectors.
+        """
+        cfg = simulation_config
+        n = neighbours.num_agents
+        m = neighbours.indices.size
+        cohesion, alignment, separation = np.zeros((n, 3)), np.zeros((n, 3)), np.zeros((n, 3))
+        if m == 0:
+            return cohesion, alignment, separation
+
+        if m + 1 > Boids.reduction_buffer.shape[0]:
+            Boids.reduction_buffer = np.zeros((max(m + 1, 2 * Boids.reduction_buffer.shape[0]), 11))
+        values = Boids.reduction_buffer[:m + 1]
+        values[m] = 0  # Trailing zero row so empty segments at the end stay in range
+
+        deltas, distances = neighbours.deltas, neighbours.distances
+        outer = distances.max()
+
+        # Cohesion: the centroid offset is the mean neighbour delta
+        if cfg["cohesion_weight"] != 0:
+            if cfg["cohesion_radius"] >= outer:
+                values[:m, 0:3] = deltas
+                values[:m, 3] = 1
+            else:
+                inside = distances <= cfg["cohesion_radius"]
+                np.multiply(deltas, inside[:, np.newaxis], out=values[:m, 0:3])
+                values[:m, 3] = inside
+        else:
+            values[:m, 0:4] = 0
+
+        # Alignment: mean neighbour heading
+        if cfg["alignment_weight"] != 0:
+            np.take(directions, neighbours.indices, axis=0, out=values[:m, 4:7])
+            if cfg["alignment_radius"] >= outer:
+                values[:m, 7] = 1
+            else:
+                inside = distances <= cfg["alignment_radius"]
+                values[:m, 4:7] *= inside[:, np.newaxis]
+                values[:m, 7] = inside
+        else:
+            values[:m, 4:8] = 0
+
+        # Separation: inverse-square repulsion, zero outside the separation radius
+        if cfg["separation_weight"] != 0:
+            scale = -1.0 / distances ** 2
+            if cfg["separation_radius"] < outer:
+                scale[distances > cfg["separation_radius"]] = 0
+            np.multiply(deltas, scale[:, np.newaxis], out=values[:m, 8:11])
+        else:
+            values[:m, 8:11] = 0
+
+        # One segmented sum over the whole buffer; empty segments are zeroed afterwards
+        sums = np.add.reduceat(values, neighbours.indptr[:-1], axis=0)
+        sums[np.diff(neighbours.indptr) == 0] = 0
+
+        has_coh = sums[:, 3] > 0
+        cohesion[has_coh] = sums[has_coh, 0:3] / sums[has_coh, 3:4]
+        has_ali = sums[:, 7] > 0
+        alignment[has_ali] = sums[has_ali, 4:7] / sums[has_ali, 7:8]
+        separation[:] = sums[:, 8:11]
+
+        return Boids._normalize_rows(cohesion), Boids._normalize_rows(alignment), Boids._normalize_rows(separation)
+
+    @staticmethod
+    def _normalize_rows(vec):
+        """
+        Normalize each row to unit length, leaving zero rows as zero.
+        """
+        norm = np.linalg.norm(vec, axis=1, keepdims=True)
+        return np.divide(vec, norm, out=np.zeros(vec.shape), where=norm > 0)
+
     @staticmethod
     # Cohesion pulls agents toward the average position of neighbors within a radius
     # This encourages the group to stay together
@@ -196,7 +663,7 @@ class Boids(MovementModel):
         target = Boids.calc_direction(current_agent)
         new = (1 - alpha) * current + alpha * target
         new /= np.linalg.norm(new)
-        old = current_agent.direction
+        old = np.array(current_agent.direction, dtype=float)
         current_agent.direction = new
         return old
 
@@ -211,11 +678,16 @@ class Boids(MovementModel):
         pos, dir, delta, dist = Boids.precompute_agent_data(current_agent, Agent.all_agents)
         cfg = simulation_config
 
+        # Single-row neighbour list within the largest active radius
+        near = np.flatnonzero((dist > 0) & (dist <= Boids.interaction_radius()))
+        neighbours = NeighbourList(np.array([0, near.size]), near, delta[near], dist[near])
+        cohesion, alignment, separation = Boids.reduce_rules(neighbours, dir)
+
         # Weighted sum of all steering behaviours
         combined = (
-            cfg["cohesion_weight"] * Boids.calc_cohesion(current_agent, pos, dist) +
-            cfg["alignment_weight"] * Boids.calc_alignment(current_agent, dir, dist) +
-            cfg["separation_weight"] * Boids.calc_separation(delta, dist) +
+            cfg["cohesion_weight"] * cohesion[0] +
+            cfg["alignment_weight"] * alignment[0] +
+            cfg["separation_weight"] * separation[0] +
             cfg["wall_repulsion_weight"] * WallPhysics.calc_wall_repulsion(current_agent) +
             cfg["wall_repulsion_weight"] * ObstaclePhysics.calculate_obstacle_repulsion(current_agent.position, cfg["boundary_threshold"], cfg["boundary_max_force"])
         )
@@ -0,0 +1,160 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: obstacle_bvh.py
+Description: Bounding volume hierarchy over axis-aligned obstacle boxes. Finds, for a whole swarm at
+once, the nearest obstacle surface within a distance of each agent, visiting O(log K) tree levels
+instead of testing every agent against all K boxes.
+
+Usage:
+    tree = ObstacleBVH(boxes)  # (K, 2, 3) array of [min corner, max corner] rows
+    agents, box_ids, offsets, distances = tree.nearest_surface(positions, threshold)
+"""
+
+import numpy as np
+
+
+class ObstacleBVH:
+    """
+    Binary tree of bounding boxes, built by splitting the obstacles at the
+    median of their centers along the longest axis until each leaf holds at
+    most `leaf_size` boxes. Nodes are stored as flat arrays so the whole
+    swarm can be pushed through one tree level per NumPy pass.
+    """
+
+    def __init__(self, boxes, leaf_size=4):
+        """
+        :param boxes: A numpy array (K, 2, 3) of [min corner, max corner] per obstacle.
+        :param leaf_size: Most boxes held by a leaf node.
+        """
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        self.leaf_size = leaf_size
+        self.order = np.arange(self.num_boxes)
+
+        node_min, node_max, children, spans = [], [], [], []
+        if self.num_boxes:
+            self._build(0, self.num_boxes, node_min, node_max, children, spans)
+
+        self.node_min = np.array(node_min).reshape(-1, 3)
+        self.node_max = np.array(node_max).reshape(-1, 3)
+        self.children = np.array(children, dtype=np.int64).reshape(-1, 2)  # -1 for leaves
+        self.spans = np.array(spans, dtype=np.int64).reshape(-1, 2)  # (start, count) into order for leaves
+
+    @property
+    def num_boxes(self):
+        """
+        Number of obstacles in the tree.
+        """
+        return self.boxes.shape[0]
+
+    @property
+    def depth(self):
+        """
+        Number of levels from the root to the deepest leaf.
+        """
+        depth, level = 0, np.array([0] if len(self.children) else [], dtype=np.int64)
+        while level.size:
+            depth += 1
+            level = self.children[level].ravel()
+            level = level[level >= 0]
+        return depth
+
+    def _build(self, start, end, node_min, node_max, children, spans):
+        """
+        Add the node covering order[start:end] and its subtree, returning its index.
+        """
+        node = len(node_min)
+        members = self.boxes[self.order[start:end]]
+        node_min.append(members[:, 0].min(axis=0))
+        node_max.append(members[:, 1].max(axis=0))
+        children.append([-1, -1])
+        spans.append([start, end - start])
+
+        if end - start > self.leaf_size:
+            # Median split of the box centers along their widest axis
+            centers = members.mean(axis=1)
+            axis = int(np.argmax(centers.max(axis=0) - centers.min(axis=0)))
+            mid = (end - start) // 2
+            split = np.argpartition(centers[:, axis], mid)
+            self.order[start:end] = self.order[start:end][split]
+
+            left = self._build(start, start + mid, node_min, node_max, children, spans)
+            right = self._build(start + mid, end, node_min, node_max, children, spans)
+            children[node] = [left, right]
+        return node
+
+    def candidates(self, positions, margin):
+        """
+        Pairs of agents and obstacles whose box, expanded by `margin`, contains the agent.
+
+        Every agent starts at the root and the (agent, node) pairs that pass
+        the expanded-box test move down one level per pass.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param margin: Distance the boxes are expanded by.
+        :return: Tuple (agents, box_ids) of matching index arrays.
+        """
+        found_agents, found_boxes = [], []
+        if self.num_boxes == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # A tree that is a single leaf is cheaper to test box by box
+        if self.children[0, 0] < 0:
+            inside = np.all((positions[:, None] >= self.boxes[None, :, 0] - margin) &
+                            (positions[:, None] <= self.boxes[None, :, 1] + margin), axis=2)
+            return np.nonzero(inside)
+
+        agents = np.arange(positions.shape[0])
+        nodes = np.zeros(positions.shape[0], dtype=np.int64)
+        while agents.size:
+            p = positions[agents]
+            hit = np.all((p >= self.node_min[nodes] - margin) & (p <= self.node_max[nodes] + margin), axis=1)
+            agents, nodes = agents[hit], nodes[hit]
+
+            # Leaves yield one candidate per box they hold
+            leaf = self.children[nodes, 0] < 0
+            starts, counts = self.spans[nodes[leaf], 0], self.spans[nodes[leaf], 1]
+            if counts.size:
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                found_agents.append(np.repeat(agents[leaf], counts))
+                found_boxes.append(self.order[np.repeat(starts, counts) + offsets])
+
+            # Internal nodes pass their agents on to both children
+            inner = ~leaf
+            agents = np.concatenate([agents[inner], agents[inner]])
+            nodes = self.children[nodes[inner]].T.ravel()
+
+        if not found_agents:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        agents, boxes = np.concatenate(found_agents), np.concatenate(found_boxes)
+
+        # Exact test against each candidate's own expanded box
+        p = positions[agents]
+        inside = np.all((p >= self.boxes[boxes, 0] - margin) & (p <= self.boxes[boxes, 1] + margin), axis=1)
+        return agents[inside], boxes[inside]
+
+    def nearest_surface(self, positions, margin):
+        """
+        Closest obstacle surface for every agent within `margin` of an obstacle's box.
+
+        Ties (e.g. an agent inside two overlapping boxes) go to the lowest box index.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param margin: Distance the boxes are expanded by when looking for obstacles.
+        :return: Tuple (agents, box_ids, offsets, distances): agent indices with a
+                 nearby obstacle, the nearest box for each, the offset from its
+                 closest surface point to the agent (zero inside the box), and its length.
+        """
+        agents, boxes = self.candidates(positions, margin)
+        p = positions[agents]
+        offsets = p - np.clip(p, self.boxes[boxes, 0], self.boxes[boxes, 1])
+        distances = np.linalg.norm(offsets, axis=1)
+
+        # Agents near a single obstacle need no sorting
+        if np.all(np.diff(agents) > 0):
+            return agents, boxes, offsets, distances
+
+        # Sort by agent, then distance, then box index, and keep each agent's first pair
+        nearest = np.lexsort((boxes, distances, agents))
+        first = nearest[np.flatnonzero(np.diff(agents[nearest], prepend=-1))]
+        return agents[first], boxes[first], offsets[first], distances[first]
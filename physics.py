@@ -6,7 +6,8 @@ Description: Implements boundary and obstacle repulsion forces applied to agents
 """
 
 import numpy as np
-from config import simulation_config
+from config import simulation_config, get_rng
+from obstacle_bvh import ObstacleBVH
 
 class WallPhysics:
     """
@@ -57,57 +58,178 @@ class WallPhysics:
             WallPhysics.calculate_boundary_repulsion(pos[2], simulation_config["z_min"], simulation_config["z_max"])
         ])
 
+    # (config values, (mins, maxs)) for the last boundaries seen
+    _bounds_cache = (None, None)
+
+    @staticmethod
+    def wall_bounds(config=None):
+        """
+        Boundary minimum and maximum corners as arrays, cached until the
+        configured boundaries change.
+
+        :param config: Configuration holding the boundaries, defaults to simulation_config.
+        :return: Tuple (mins, maxs) of read-only (3,) arrays.
+        """
+        cfg = simulation_config if config is None else config
+        key = (cfg["x_min"], cfg["y_min"], cfg["z_min"], cfg["x_max"], cfg["y_max"], cfg["z_max"])
+        cached_key, bounds = WallPhysics._bounds_cache
+        if key != cached_key:
+            corners = np.array(key, dtype=float).reshape(2, 3)
+            corners.flags.writeable = False
+            bounds = (corners[0], corners[1])
+            WallPhysics._bounds_cache = (key, bounds)
+        return bounds
+
+    @staticmethod
+    def calc_wall_repulsion_all(positions):
+        """
+        Calculate wall repulsion for a whole swarm at once.
+        Matches `calc_wall_repulsion` applied to every row.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :return: A numpy array (N, 3) of repulsion forces.
+        """
+        threshold = simulation_config["boundary_threshold"]
+        max_force = simulation_config["boundary_max_force"]
+        mins, maxs = WallPhysics.wall_bounds()
+
+        # Same linear ramp as the scalar version, per axis; the minimum wall wins when both are near
+        near_min = np.maximum(threshold - (positions - mins), 0.0)
+        near_max = np.maximum(threshold - (maxs - positions), 0.0)
+        return (max_force / threshold) * np.where(near_min > 0, near_min, -near_max)
+
 
 class ObstaclePhysics:
     """
     Handles repulsion force calculations between agents and static rectangular obstacles.
+
+    The active obstacles are the slider-controlled box (while obstacle_enabled
+    is set) followed by every box in simulation_config["obstacles"]. Each agent
+    is repelled by the closest surface of the obstacles around it.
     """
 
+    # (config values, (boxes, centers, tree)) for the last obstacles seen
+    _obstacle_cache = (None, None)
+
+    @staticmethod
+    def _obstacle_key(cfg):
+        """
+        Hashable snapshot of the obstacle settings, used to detect changes,
+        including slider edits made in place to the corner lists.
+        """
+        main = (*cfg["obstacle_corner_min"], *cfg["obstacle_corner_max"]) if cfg.get("obstacle_enabled", False) else ()
+        extra = tuple(value for box in cfg.get("obstacles", ()) for corner in box for value in corner)
+        return main, extra
+
     @staticmethod
-    def calculate_obstacle_repulsion(agent_position, threshold, max_force):
+    def obstacle_data(config=None):
         """
-        Calculate a repulsion force based on distance from a box-shaped obstacle.
+        Ordered obstacle boxes, their centers and a BVH over them, cached
+        until the obstacle settings change.
+
+        :param config: Configuration holding the obstacles, defaults to simulation_config.
+        :return: Tuple (boxes (K, 2, 3), centers (K, 3), ObstacleBVH).
+        """
+        cfg = simulation_config if config is None else config
+        key = ObstaclePhysics._obstacle_key(cfg)
+        cached_key, data = ObstaclePhysics._obstacle_cache
+        if key != cached_key:
+            main, extra = key
+            corners = np.array(main + extra, dtype=float).reshape(-1, 2, 3)
+            # Consistent bounding boxes regardless of min/max order
+            boxes = np.stack([corners.min(axis=1), corners.max(axis=1)], axis=1)
+            centers = boxes.mean(axis=1)
+            for array in (boxes, centers):
+                array.flags.writeable = False
+            data = (boxes, centers, ObstacleBVH(boxes))
+            ObstaclePhysics._obstacle_cache = (key, data)
+        return data
+
+    @staticmethod
+    def calculate_obstacle_repulsion(agent_position, threshold, max_force, rng=None):
+        """
+        Calculate a repulsion force based on distance from the nearest box-shaped obstacle.
+        Tests every obstacle in turn; used as the per-agent reference for the batched version.
 
         :param agent_position: The agent's current position (3D vector).
-        :param threshold: Distance around the obstacle in which repulsion is active.
+        :param threshold: Distance around each obstacle in which repulsion is active.
         :param max_force: Maximum repulsion force applied at zero distance.
+        :param rng: Optional numpy Generator for the centered fallback; defaults to the physics stream.
         :return: A 3D numpy array representing the repulsion vector.
         """
-        if not simulation_config.get("obstacle_enabled", False):
+        boxes, centers, _ = ObstaclePhysics.obstacle_data()
+        if len(boxes) == 0:
             return np.zeros(3)
 
-        # Get obstacle corners from config
-        obstacle_min = np.array(simulation_config["obstacle_corner_min"], dtype=float)
-        obstacle_max = np.array(simulation_config["obstacle_corner_max"], dtype=float)
-
-        # Ensure consistent bounding box regardless of min/max order
-        min_corner = np.minimum(obstacle_min, obstacle_max)
-        max_corner = np.maximum(obstacle_min, obstacle_max)
-
-        pos = np.array(agent_position)
+        pos = np.asarray(agent_position, dtype=float)
 
-        # Define the outer threshold region around the obstacle
-        expanded_min = min_corner - threshold
-        expanded_max = max_corner + threshold
-
-        # If agent is outside the threshold zone, no force is applied
-        if np.any(pos < expanded_min) or np.any(pos > expanded_max):
+        # Only obstacles whose threshold zone holds the agent apply a force
+        in_zone = np.all((pos >= boxes[:, 0] - threshold) & (pos <= boxes[:, 1] + threshold), axis=1)
+        if not np.any(in_zone):
             return np.zeros(3)
 
-        # Clamp position to obstacle bounds to find closest surface point
-        closest = np.maximum(min_corner, np.minimum(pos, max_corner))
-        offset = pos - closest
-        distance = np.linalg.norm(offset)
+        # Clamp position to each obstacle's bounds to find the closest surface point
+        offsets = pos - np.clip(pos, boxes[:, 0], boxes[:, 1])
+        distances = np.where(in_zone, np.linalg.norm(offsets, axis=1), np.inf)
+        nearest = int(np.argmin(distances))
+        offset, distance = offsets[nearest], distances[nearest]
 
         if distance == 0:
             # Agent is inside the obstacle - push outwards from center
-            center = (min_corner + max_corner) / 2
-            fallback = pos - center
+            fallback = pos - centers[nearest]
             if np.linalg.norm(fallback) == 0:
                 # Fallback to a random direction if perfectly centered
-                fallback = np.random.uniform(-1, 1, 3)
+                fallback = (get_rng("physics") if rng is None else rng).uniform(-1, 1, 3)
             return max_force * fallback / np.linalg.norm(fallback)
 
         # Scale force based on proximity to obstacle surface
         force_strength = max_force * (threshold - distance) / threshold
         return force_strength * (offset / distance)
+
+    @staticmethod
+    def calculate_obstacle_repulsion_all(positions, threshold, max_force, rng=None):
+        """
+        Calculate obstacle repulsion for a whole swarm at once, finding each
+        agent's nearest obstacle through the BVH.
+        Matches `calculate_obstacle_repulsion` applied to every row.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param threshold: Distance around each obstacle in which repulsion is active.
+        :param max_force: Maximum repulsion force applied at zero distance.
+        :param rng: Optional numpy Generator for the centered fallback; defaults to the physics stream.
+        :return: A numpy array (N, 3) of repulsion forces.
+        """
+        forces = np.zeros_like(positions, dtype=float)
+        _, centers, tree = ObstaclePhysics.obstacle_data()
+        if tree.num_boxes == 0:
+            return forces
+
+        # Only agents inside some obstacle's threshold zone feel any force
+        agents, nearest, offset, distance = tree.nearest_surface(positions, threshold)
+        if agents.size == 0:
+            return forces
+
+        zone_forces = np.zeros_like(offset)
+
+        # Outside the box: scale by proximity to the closest surface point
+        outside = distance > 0
+        if np.any(outside):
+            d = distance[outside]
+            strength = max_force * (threshold - d) / threshold
+            zone_forces[outside] = (strength / d)[:, None] * offset[outside]
+
+        # Inside the box: push outwards from the center
+        inside = ~outside
+        if np.any(inside):
+            fallback = positions[agents[inside]] - centers[nearest[inside]]
+            fallback_norm = np.linalg.norm(fallback, axis=1)
+            centered = fallback_norm == 0
+            if np.any(centered):
+                # Fallback to a random direction if perfectly centered
+                rng = get_rng("physics") if rng is None else rng
+                fallback[centered] = rng.uniform(-1, 1, (np.count_nonzero(centered), 3))
+                fallback_norm[centered] = np.linalg.norm(fallback[centered], axis=1)
+            zone_forces[inside] = max_force * fallback / fallback_norm[:, None]
+
+        forces[agents] = zone_forces
+        return forces
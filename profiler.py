@@ -0,0 +1,318 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: profiler.py
+Description: Low-overhead per-phase frame profiler. Named spans are timed with perf_counter_ns into a
+preallocated ring buffer, summarized as p50/p95/p99 per phase, and optionally streamed to CSV or
+Parquet while the simulation runs.
+
+Usage:
+    with profiler.span("neighbours"):
+        neighbours = Boids.find_neighbours(positions)
+    profiler.end_frame()
+"""
+
+import csv
+import threading
+from time import perf_counter_ns
+
+import numpy as np
+
+# Phases timed each frame, in column order
+PROFILE_PHASES = (
+    "neighbours",    # Neighbour list build
+    "forces",        # Boids rule forces (the rest of the fused step on the JIT path)
+    "physics",       # Wall and obstacle repulsion (obstacles only on the JIT path)
+    "speed",         # Heading blend, speed update and integration
+    "entity_sync",   # Pushing agent state to the scene
+    "recording",     # Recording frames
+    "playback",      # Applying playback frames
+    "render",        # Engine time between updates (culling, drawing, input)
+)
+
+
+class Span:
+    """
+    Reusable timer for one phase on one thread. Time spent between enter and
+    exit is added to the phase's total in that thread's row, so a span may
+    run several times per frame (e.g. once per simulation tick).
+    """
+
+    __slots__ = ("row", "column", "start")
+
+    def __init__(self, row, column):
+        self.row = row
+        self.column = column
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.row[self.column] += perf_counter_ns() - self.start
+
+
+class _DisabledSpan:
+    """
+    Span used while profiling is off.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_disabled_span = _DisabledSpan()
+
+
+class FrameProfiler:
+    """
+    Collects per-phase times for every frame in a ring buffer of the most
+    recent `capacity` frames.
+
+    Spans on the thread that created the profiler add straight into the
+    current frame. Other threads (e.g. the simulation worker) accumulate
+    into rows of their own, which they hand over with collect() for the
+    frame loop to merge with add().
+    """
+
+    def __init__(self, phases=PROFILE_PHASES, capacity=1024, enabled=True):
+        """
+        :param phases: Names of the timed phases.
+        :param capacity: Number of recent frames kept for percentiles.
+        :param enabled: Whether spans record anything.
+        """
+        self.phases = tuple(phases)
+        self.enabled = enabled
+
+        # Columns: one per phase, then the whole frame
+        self.frames = np.zeros((capacity, len(self.phases) + 1), dtype=np.int64)
+        self.current = np.zeros(len(self.phases) + 1, dtype=np.int64)
+
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self.frame_count = 0
+        self._frame_start = None
+
+        self.writer = None
+
+    @property
+    def capacity(self):
+        """
+        Number of frames the ring buffer holds.
+        """
+        return self.frames.shape[0]
+
+    @property
+    def spans(self):
+        """
+        The calling thread's span per phase, created on first use.
+        """
+        spans = getattr(self._local, "spans", None)
+        if spans is None:
+            if threading.get_ident() == self._owner:
+                self._local.row = self.current
+            else:
+                self._local.row = np.zeros_like(self.current)
+            spans = self._local.spans = {name: Span(self._local.row, i) for i, name in enumerate(self.phases)}
+        return spans
+
+    def span(self, name):
+        """
+        Timer for a named phase, for use in a `with` block.
+
+        :param name: One of the profiler's phases.
+        :return: Context manager timing the enclosed code.
+        """
+        return self.spans[name] if self.enabled else _disabled_span
+
+    def begin(self, name):
+        """
+        Start timing a phase that ends in a later call, e.g. across engine callbacks.
+        """
+        if self.enabled:
+            self.spans[name].start = perf_counter_ns()
+
+    def end(self, name):
+        """
+        Stop timing a phase started with begin().
+        """
+        span = self.spans[name]
+        if self.enabled and span.start:
+            span.row[span.column] += perf_counter_ns() - span.start
+            span.start = 0
+
+    def collect(self):
+        """
+        Take the phase times a thread other than the profiler's accumulated since its last collect.
+
+        :return: A numpy array of nanoseconds per column, or None when profiling is off.
+        """
+        if not self.enabled:
+            return None
+        self.spans  # creates the calling thread's row on first use
+        row = self._local.row
+        times = row.copy()
+        row[:] = 0
+        return times
+
+    def add(self, times):
+        """
+        Merge phase times collected on another thread into the current frame.
+
+        :param times: Array from collect(), or None.
+        """
+        if self.enabled and times is not None:
+            self.current[:-1] += times[:-1]
+
+    def end_frame(self, **extra):
+        """
+        Close the current frame: store its phase times in the ring buffer,
+        stream them to the open writer, and start a new frame.
+
+        :param extra: Extra values for the writer's extra columns (e.g. num_agents).
+        """
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        if self._frame_start is not None:
+            self.current[-1] = now - self._frame_start
+            self.frames[self.frame_count % self.capacity] = self.current
+            if self.writer is not None:
+                self.writer.write(self.frame_count, self.current, extra)
+            self.frame_count += 1
+        self.current[:] = 0
+        self._frame_start = now
+
+    def recent(self):
+        """
+        Phase times of the frames currently in the ring buffer, oldest first.
+
+        :return: A numpy array (frames, phases + 1) of nanoseconds.
+        """
+        n = min(self.frame_count, self.capacity)
+        if self.frame_count <= self.capacity:
+            return self.frames[:n]
+        split = self.frame_count % self.capacity
+        return np.concatenate([self.frames[split:], self.frames[:split]])
+
+    def percentiles(self, q=(50, 95, 99)):
+        """
+        Percentiles of each phase over the recent frames.
+
+        :param q: Percentiles to compute.
+        :return: Dictionary mapping each phase (and "frame") to a list of milliseconds.
+        """
+        recent = self.recent()
+        names = self.phases + ("frame",)
+        if len(recent) == 0:
+            return {name: [0.0] * len(q) for name in names}
+        values = np.percentile(recent, q, axis=0) / 1e6
+        return {name: values[:, i].tolist() for i, name in enumerate(names)}
+
+    def summary_text(self):
+        """
+        Multi-line p50/p95/p99 table for on-screen display.
+        """
+        lines = [f"{'phase':<12}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<12}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}")
+        return "\n".join(lines)
+
+    def start_writing(self, filepath, extra_columns=()):
+        """
+        Stream every following frame to a .csv or .parquet file.
+
+        :param filepath: Output path; a .parquet suffix needs pyarrow, otherwise CSV is written.
+        :param extra_columns: Names of extra per-frame values passed to end_frame().
+        """
+        self.stop_writing()
+        if str(filepath).endswith(".parquet"):
+            try:
+                self.writer = ParquetProfileWriter(filepath, self.phases, extra_columns)
+                return
+            except ImportError:
+                filepath = str(filepath)[:-len(".parquet")] + ".csv"
+                print(f"[Profiler] pyarrow not available, writing {filepath} instead.")
+        self.writer = CsvProfileWriter(filepath, self.phases, extra_columns)
+
+    def stop_writing(self):
+        """
+        Flush and close the open writer, if any.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            print(f"[Profiler] Saved {self.writer.rows} frames to {self.writer.filepath}")
+            self.writer = None
+
+
+# === OUTPUT ===
+
+class CsvProfileWriter:
+    """
+    Appends one row per frame to a CSV file, with times in milliseconds.
+    """
+
+    def __init__(self, filepath, phases, extra_columns=()):
+        self.filepath = filepath
+        self.extra_columns = tuple(extra_columns)
+        self.rows = 0
+        self.file = open(filepath, "w", newline="")
+        self.csv = csv.writer(self.file)
+        self.csv.writerow(["frame", *(f"{name}_ms" for name in phases), "frame_ms", *self.extra_columns])
+
+    def write(self, frame, times, extra):
+        self.csv.writerow([frame, *np.round(times / 1e6, 4).tolist(), *(extra.get(c) for c in self.extra_columns)])
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetProfileWriter:
+    """
+    Writes frames to a Parquet file in row groups of `batch_size` frames.
+    Requires pyarrow.
+    """
+
+    def __init__(self, filepath, phases, extra_columns=(), batch_size=1024):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.filepath = filepath
+        self.columns = ["frame", *(f"{name}_ms" for name in phases), "frame_ms"]
+        self.extra_columns = tuple(extra_columns)
+        self.batch_size = batch_size
+        self.batch = []
+        self.rows = 0
+        self.parquet = None
+        self._open = lambda schema: pyarrow.parquet.ParquetWriter(filepath, schema)
+
+    def write(self, frame, times, extra):
+        self.batch.append([frame, *(times / 1e6).tolist(), *(extra.get(c) for c in self.extra_columns)])
+        self.rows += 1
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.batch:
+            return
+        names = self.columns + list(self.extra_columns)
+        table = self.pyarrow.table({name: [row[i] for row in self.batch] for i, name in enumerate(names)})
+        if self.parquet is None:
+            self.parquet = self._open(table.schema)
+        self.parquet.write_table(table)
+        self.batch = []
+
+    def close(self):
+        self._flush()
+        if self.parquet is not None:
+            self.parquet.close()
+
+
+# Profiler shared by the simulation, movement model and UI
+profiler = FrameProfiler()
@@ -2,38 +2,196 @@
 Author: Adam Zelenak
 Part of the 3D Swarm Simulation Project
 File: record_playback.py
-Description: Handles simulation recording and playback using per-frame position/direction data.
+Description: Handles simulation recording and playback using per-frame position/direction data,
+quantized and delta-encoded, streamed to disk in fixed-size chunks and memory-mapped for seekable playback.
 """
 
-import numpy as np
+import bisect
+import json
 import os
+import queue
+import threading
+import numpy as np
 from datetime import datetime
 
+# Per-frame fields returned by playback, in write order
+FRAME_FIELDS = ('positions', 'directions', 'num_agents', 'boundary_size',
+                'obstacle_corner_min', 'obstacle_corner_max', 'obstacle_toggle', 'reset')
+
+# Largest residual an int16 position delta or direction component can hold
+QUANT_MAX = np.iinfo(np.int16).max
+
+
+class ChunkBuffer:
+    """
+    Preallocated storage for a fixed number of frames with a fixed agent count.
+
+    Positions are held as int16 deltas between consecutive frames, measured in
+    units of the recorder's position scale from a float64 keyframe taken at the
+    first frame of the chunk. Unit directions are held as int16 components.
+    """
+    def __init__(self, chunk_size, rows):
+        self.rows = rows
+        self.count = 0
+        self.start_frame = 0
+        self.segment = 0
+        self.keyframe = np.zeros((rows, 3))
+        self.offsets = np.zeros((rows, 3), dtype=np.int64)  # quantized offsets of the last frame from the keyframe
+        self.arrays = {
+            'position_deltas': np.zeros((chunk_size, rows, 3), dtype=np.int16),
+            'directions': np.zeros((chunk_size, rows, 3), dtype=np.int16),
+            'num_agents': np.zeros(chunk_size, dtype=np.int64),
+            'boundary_size': np.zeros((chunk_size, 6), dtype=np.float32),
+            'obstacle_corner_min': np.zeros((chunk_size, 3)),
+            'obstacle_corner_max': np.zeros((chunk_size, 3)),
+            'obstacle_toggle': np.zeros(chunk_size, dtype=bool),
+            'reset': np.zeros(chunk_size, dtype=bool),
+        }
+
+    def fits(self, rows):
+        return self.rows == rows
+
+
+class ChunkWriter:
+    """
+    Appendable chunked recording container.
+
+    A recording is a directory holding `data.bin`, to which the arrays of each
+    chunk are appended back to back, and `index.json`, which lists every chunk's
+    frame range, segment and the byte offset, dtype and shape of its arrays.
+    While recording, each chunk's entry is appended as one line to
+    `chunks.jsonl`, so a recording stays readable even if the app stops
+    mid-recording; close() consolidates the entries into the index.
+    """
+    alignment = 64
+    version = 2
+
+    def __init__(self, directory, metadata=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.data_path = os.path.join(directory, 'data.bin')
+        self.index_path = os.path.join(directory, 'index.json')
+        self.journal_path = os.path.join(directory, 'chunks.jsonl')
+        self.index = {'version': ChunkWriter.version, 'frames': 0, 'chunks': []}
+        self.index.update(metadata or {})
+        self.data_file = open(self.data_path, 'wb')
+        self.journal_file = open(self.journal_path, 'w')
+        self._write_index()
+
+    def append(self, start_frame, frames, arrays, constants=None, segment=0):
+        """
+        Append the first `frames` frames of each per-frame array as one chunk.
+
+        :param constants: Optional arrays stored whole, once per chunk.
+        :param segment: Segment the chunk belongs to (agent count and resets split segments).
+        """
+        entry = {'start': start_frame, 'frames': frames, 'segment': segment, 'arrays': {}}
+        blocks = [(name, array[:frames]) for name, array in arrays.items()]
+        blocks += list((constants or {}).items())
+        for name, array in blocks:
+            data = np.ascontiguousarray(array)
+
+            # Keep every array aligned so memory-mapped views need no copies
+            padding = -self.data_file.tell() % ChunkWriter.alignment
+            self.data_file.write(b'\0' * padding)
+
+            entry['arrays'][name] = {
+                'offset': self.data_file.tell(),
+                'dtype': data.dtype.str,
+                'shape': list(data.shape),
+            }
+            self.data_file.write(data.tobytes())
+        self.data_file.flush()
+
+        self.index['chunks'].append(entry)
+        self.index['frames'] = start_frame + frames
+        self.journal_file.write(json.dumps(entry) + '\n')
+        self.journal_file.flush()
+
+    def close(self):
+        self.data_file.close()
+        self.journal_file.close()
+        self._write_index()
+        os.remove(self.journal_path)
+
+    def _write_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
 
 class SimulationRecorder:
-    def __init__(self):
+    def __init__(self, chunk_size=256, ring_size=3, position_scale=1e-3):
         """
         Initialize the recorder.
+
+        Frames are copied into a ring of preallocated chunk buffers. Full chunks
+        are handed to a background thread that appends them to disk, so memory
+        stays bounded at `ring_size` chunks however long the recording runs.
+
+        Only live agents are stored. Positions are quantized to `position_scale`
+        and stored as int16 frame-to-frame deltas, so every replayed position is
+        within half a quantization step of the recorded one.
+
+        :param chunk_size: Number of frames per chunk.
+        :param ring_size: Number of chunk buffers in the ring.
+        :param position_scale: Position quantization step in world units.
         """
         self.recording = False
-        self.frames = []
+        self.chunk_size = chunk_size
+        self.ring_size = ring_size
+        self.position_scale = position_scale
+        self.frame_count = 0
         self.last_reset_frame_index = -1
+        self.segment = 0
+        self.filepath = None
 
-    def start(self):
+        self._buffers = []
+        self._free = None
+        self._pending = None
+        self._current = None
+        self._writer = None
+        self._thread = None
+
+    def start(self, directory="recordings", filepath=None):
         """
         Begin recording simulation frames.
+
+        :param directory: Folder where recordings should be stored.
+        :param filepath: Optional explicit recording directory; a timestamped one is used otherwise.
         """
+        if filepath is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(directory, f"swarm_recording_{timestamp}")
+
+        self.filepath = filepath
+        self.frame_count = 0
+        self.segment = 0
+        self._buffers = []
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._current = None
+        self._writer = ChunkWriter(filepath, {'position_scale': self.position_scale})
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
         self.recording = True
-        self.frames.clear()
-        print("[Recorder] Recording started.")
+        print(f"[Recorder] Recording started: {filepath}")
+
+    def mark_reset(self):
+        """
+        Flag the next recorded frame as following a simulation reset.
+        """
+        self.last_reset_frame_index = self.frame_count
 
     def record_frame(self, positions, directions, num_agents, boundary_size,
                      obstacle_corner_min, obstacle_corner_max, obstacle_toggle):
         """
         Capture and store a snapshot of the current simulation frame.
 
-        :param positions: List of agent position vectors.
-        :param directions: List of agent direction vectors.
+        :param positions: Agent positions; rows past `num_agents` are ignored.
+        :param directions: Unit agent directions; rows past `num_agents` are ignored.
         :param num_agents: Number of agents in the frame.
         :param boundary_size: 3D size of the simulation boundary.
         :param obstacle_corner_min: Min corner of the obstacle.
@@ -41,60 +199,75 @@ class SimulationRecorder:
         :param obstacle_toggle: Boolean whether obstacle is enabled.
         :return: None
         """
-        if self.recording:
-            self.frames.append({
-                'positions': positions.copy(),
-                'directions': directions.copy(),
-                'num_agents': num_agents,
-                'boundary_size': boundary_size,
-                'obstacle_corner_min': obstacle_corner_min.copy(),
-                'obstacle_corner_max': obstacle_corner_max.copy(),
-                'obstacle_toggle': obstacle_toggle,
-                'reset': len(self.frames) == self.last_reset_frame_index  # track if this was a reset frame
-            })
+        if not self.recording:
+            return
+
+        rows = int(num_agents)
+        positions = np.asarray(positions, dtype=float)[:rows]
+        directions = np.asarray(directions, dtype=float)[:rows]
+        is_reset = self.frame_count == self.last_reset_frame_index
 
-    def stop_and_save(self, directory="recordings"):
+        # A reset or a change in agent count starts a new segment, and every
+        # segment starts a new chunk with a fresh keyframe
+        buf = self._current
+        if buf is not None and (is_reset or not buf.fits(rows)):
+            self._submit_current()
+            self.segment += 1
+            buf = None
+
+        if buf is not None:
+            offsets = np.rint((positions - buf.keyframe) / self.position_scale).astype(np.int64)
+            deltas = offsets - buf.offsets
+            # A jump too large for int16 deltas restarts from a new keyframe
+            if rows and np.abs(deltas).max() > QUANT_MAX:
+                self._submit_current()
+                buf = None
+
+        if buf is None:
+            buf = self._current = self._acquire_buffer(rows)
+            buf.segment = self.segment
+            buf.keyframe[:] = positions
+            offsets = np.zeros((rows, 3), dtype=np.int64)
+            deltas = offsets
+
+        i = buf.count
+        arrays = buf.arrays
+        arrays['position_deltas'][i] = deltas
+        arrays['directions'][i] = np.rint(np.clip(directions, -1.0, 1.0) * QUANT_MAX)
+        arrays['num_agents'][i] = rows
+        arrays['boundary_size'][i] = boundary_size
+        arrays['obstacle_corner_min'][i] = obstacle_corner_min
+        arrays['obstacle_corner_max'][i] = obstacle_corner_max
+        arrays['obstacle_toggle'][i] = obstacle_toggle
+        arrays['reset'][i] = is_reset  # track if this was a reset frame
+        buf.offsets[:] = offsets
+
+        buf.count += 1
+        self.frame_count += 1
+        if buf.count == self.chunk_size:
+            self._submit_current()
+
+    def stop_and_save(self):
         """
-        Stop recording and save the data to a compressed .npz file.
+        Stop recording, flush the remaining frames and wait for the writer to finish.
 
-        :param directory: Folder where recordings should be stored.
         :return: None
         """
-        if not self.recording or not self.frames:
+        if not self.recording:
             print("[Recorder] No recording to save.")
             return
 
         self.recording = False
-        os.makedirs(directory, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(directory, f"swarm_recording_{timestamp}.npz")
-
-        # Convert lists of per-frame data into arrays
-        pos_frames = [frame['positions'] for frame in self.frames]
-        dir_frames = [frame['directions'] for frame in self.frames]
-        num_agents_array = np.array([f['num_agents'] for f in self.frames])
-        boundary_array = np.stack([f['boundary_size'] for f in self.frames])
-        obstacle_min_array = np.stack([f['obstacle_corner_min'] for f in self.frames])
-        obstacle_max_array = np.stack([f['obstacle_corner_max'] for f in self.frames])
-        obstacle_toggle = np.array([f['obstacle_toggle'] for f in self.frames])
-        reset_flags = np.array([f['reset'] for f in self.frames])
-
-        # Create 3D numpy arrays: (num_frames, num_agents, 3)
-        pos_array = np.stack(pos_frames)
-        dir_array = np.stack(dir_frames)
-
-        # Save all data to compressed file
-        np.savez_compressed(filename,
-                            positions=pos_array,
-                            directions=dir_array,
-                            num_agents=num_agents_array,
-                            boundaries=boundary_array,
-                            obstacle_min=obstacle_min_array,
-                            obstacle_max=obstacle_max_array,
-                            obstacle_toggle=obstacle_toggle,
-                            reset_flags=reset_flags)
-
-        print(f"[Recorder] Recording saved to: {filename}")
+        if self._current is not None and self._current.count > 0:
+            self._submit_current()
+        self._pending.put(None)
+        self._thread.join()
+        self._writer.close()
+
+        if self.frame_count == 0:
+            print("[Recorder] No frames were recorded.")
+        else:
+            print(f"[Recorder] Recording saved to: {self.filepath}")
 
     def is_recording(self):
         """
@@ -104,46 +277,146 @@ class SimulationRecorder:
         """
         return self.recording
 
+    def _acquire_buffer(self, rows):
+        """
+        Take a free ring buffer matching the row count, allocating one only while
+        the ring is not yet full. Blocks if the writer has fallen behind.
+        """
+        while True:
+            try:
+                buf = self._free.get_nowait()
+            except queue.Empty:
+                if len(self._buffers) < self.ring_size:
+                    buf = ChunkBuffer(self.chunk_size, rows)
+                    self._buffers.append(buf)
+                    break
+                buf = self._free.get()
+
+            if buf.fits(rows):
+                break
+            # Replace a ring slot whose shape no longer matches
+            self._buffers.remove(buf)
+            buf = ChunkBuffer(self.chunk_size, rows)
+            self._buffers.append(buf)
+            break
+
+        buf.count = 0
+        buf.start_frame = self.frame_count
+        return buf
+
+    def _submit_current(self):
+        """
+        Queue the current chunk for the background writer.
+        """
+        self._pending.put(self._current)
+        self._current = None
+
+    def _write_loop(self):
+        """
+        Background thread: append queued chunks to disk and return their buffers to the ring.
+        """
+        while True:
+            buf = self._pending.get()
+            if buf is None:
+                return
+            self._writer.append(buf.start_frame, buf.count, buf.arrays,
+                                constants={'keyframe': buf.keyframe}, segment=buf.segment)
+            self._free.put(buf)
+
+
+def map_chunks(directory):
+    """
+    Memory-map every chunk of a chunked recording without reading any frame data.
+
+    :param directory: Recording directory.
+    :return: Tuple (index, chunks) where each chunk is a dictionary of per-frame
+             array views backed by the recording's data file.
+    """
+    with open(os.path.join(directory, 'index.json')) as f:
+        index = json.load(f)
+
+    # A recording that was not closed keeps its chunk entries in the journal
+    journal_path = os.path.join(directory, 'chunks.jsonl')
+    if os.path.exists(journal_path):
+        with open(journal_path) as f:
+            for line in f:
+                # Entries already consolidated into the index (close stopped before removing the journal) are skipped
+                if line.endswith('\n'):
+                    entry = json.loads(line)
+                    if entry['start'] >= index['frames']:
+                        index['chunks'].append(entry)
+                        index['frames'] = entry['start'] + entry['frames']
+
+    chunks = []
+    data_path = os.path.join(directory, 'data.bin')
+    if index['frames'] == 0 or os.path.getsize(data_path) == 0:
+        return index, chunks
+
+    raw = np.memmap(data_path, dtype=np.uint8, mode='r')
+    for entry in index['chunks']:
+        arrays = {}
+        for name, spec in entry['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            nbytes = int(np.prod(spec['shape'])) * dtype.itemsize
+            arrays[name] = raw[spec['offset']:spec['offset'] + nbytes].view(dtype).reshape(spec['shape'])
+        chunks.append(arrays)
+    return index, chunks
+
 
 class SimulationPlayback:
     def __init__(self):
         """
         Initialize the playback system.
         """
-        self.positions = None
-        self.directions = None
-        self.num_agents = None
-        self.boundaries = None
-        self.obstacle_min = None
-        self.obstacle_max = None
-        self.obstacle_toggle = None
+        self.chunks = []
+        self.chunk_starts = []
+        self.reset_flags = None
         self.total_frames = 0
         self.current_frame = 0
+        self.speed = 1
         self.loaded = False
         self.playing = False
-        self.reset_flags = None
+        self.position_scale = None
+        self._last_frame = None
+        self._cursor = None
 
     def load(self, filepath):
         """
-        Load recorded simulation data from an .npz file.
+        Load a recording. Chunked recordings (their directory or index.json) are
+        memory-mapped, so playback starts immediately and resident memory stays
+        flat; legacy .npz files are decompressed into memory.
 
-        :param filepath: Path to the saved recording file.
+        :param filepath: Path to the saved recording.
         :return: None
         """
         try:
-            data = np.load(filepath)
-            self.positions = data['positions']
-            self.directions = data['directions']
-            self.num_agents = data['num_agents']
-            self.boundaries = data['boundaries']
-            self.obstacle_min = data['obstacle_min']
-            self.obstacle_max = data['obstacle_max']
-            self.obstacle_toggle = data['obstacle_toggle']
-            self.reset_flags = data['reset_flags']
-
-            self.total_frames = self.positions.shape[0]
+            if os.path.isdir(filepath) or os.path.basename(filepath) == 'index.json':
+                directory = filepath if os.path.isdir(filepath) else os.path.dirname(filepath)
+                index, self.chunks = map_chunks(directory)
+                self.position_scale = index.get('position_scale')
+                self.chunk_starts = [entry['start'] for entry in index['chunks']]
+                self.total_frames = index['frames']
+            else:
+                data = np.load(filepath)
+                self.chunks = [{
+                    'positions': data['positions'],
+                    'directions': data['directions'],
+                    'num_agents': data['num_agents'],
+                    'boundary_size': data['boundaries'],
+                    'obstacle_corner_min': data['obstacle_min'],
+                    'obstacle_corner_max': data['obstacle_max'],
+                    'obstacle_toggle': data['obstacle_toggle'],
+                    'reset': data['reset_flags'],
+                }]
+                self.chunk_starts = [0]
+                self.total_frames = self.chunks[0]['positions'].shape[0]
+
+            # Small per-frame flags kept in memory for reset detection while seeking
+            self.reset_flags = np.concatenate([chunk['reset'] for chunk in self.chunks]) if self.chunks else np.zeros(0, dtype=bool)
             self.current_frame = 0
-            self.loaded = True
+            self._last_frame = None
+            self._cursor = None
+            self.loaded = self.total_frames > 0
             print(f"[Playback] Loaded {self.total_frames} frames from {filepath}")
         except Exception as e:
             print(f"[Playback] Failed to load recording: {e}")
@@ -158,6 +431,8 @@ class SimulationPlayback:
         if self.loaded:
             self.playing = True
             self.current_frame = 0
+            self.speed = 1
+            self._last_frame = None
             print("[Playback] Playback started.")
         else:
             print("[Playback] No recording loaded.")
@@ -171,35 +446,119 @@ class SimulationPlayback:
         self.playing = False
         print("[Playback] Playback stopped.")
 
+    def seek(self, frame_index):
+        """
+        Jump to any frame; it is returned by the next update().
+
+        :param frame_index: Frame number, clamped to the recording.
+        """
+        if self.loaded:
+            self.current_frame = int(np.clip(frame_index, 0, self.total_frames - 1))
+
+    def set_speed(self, speed):
+        """
+        Set the number of frames advanced per update.
+        Negative values play in reverse and 0 pauses on the current frame.
+
+        :param speed: Integer frame step.
+        """
+        self.speed = int(speed)
+
+    def reverse(self):
+        """
+        Flip the playback direction.
+        """
+        self.speed = -self.speed if self.speed != 0 else -1
+
+    def progress(self):
+        """
+        Fraction of the recording played so far, for scrub bars.
+        """
+        return self.current_frame / max(1, self.total_frames - 1)
+
+    def frame_at(self, frame_index):
+        """
+        Random access to any frame of the recording.
+
+        :param frame_index: Frame number.
+        :return: A dictionary of simulation state for the frame.
+        """
+        chunk_index = bisect.bisect_right(self.chunk_starts, frame_index) - 1
+        chunk = self.chunks[chunk_index]
+        i = frame_index - self.chunk_starts[chunk_index]
+        frame = {name: chunk[name][i] for name in FRAME_FIELDS if name in chunk}
+
+        if 'position_deltas' in chunk:
+            offsets = self._decode_offsets(chunk_index, i)
+            frame['positions'] = chunk['keyframe'] + offsets * self.position_scale
+            frame['directions'] = chunk['directions'][i] / QUANT_MAX
+        return frame
+
+    def _decode_offsets(self, chunk_index, i):
+        """
+        Quantized offsets of frame `i` of a chunk from its keyframe.
+
+        The last decoded frame is kept as a cursor, so stepping forwards or
+        backwards only sums the deltas in between rather than the whole chunk.
+        """
+        deltas = self.chunks[chunk_index]['position_deltas']
+        if self._cursor is not None and self._cursor[0] == chunk_index:
+            _, j, offsets = self._cursor
+            if i >= j:
+                offsets = offsets + deltas[j + 1:i + 1].sum(axis=0, dtype=np.int64)
+            else:
+                offsets = offsets - deltas[i + 1:j + 1].sum(axis=0, dtype=np.int64)
+        else:
+            offsets = deltas[:i + 1].sum(axis=0, dtype=np.int64)
+
+        self._cursor = (chunk_index, i, offsets)
+        return offsets
+
     def update(self):
         """
-        Advance playback and return the current frame's simulation data.
+        Return the current frame's simulation data and advance by the playback speed.
+
+        The frame's 'reset' flag is set whenever the scene must be rebuilt: on
+        the first frame, when stepping across a recorded reset in either
+        direction, and when a seek or loop lands on a recorded reset. Other
+        seeks and loops set the 'seek' flag instead, asking only for the
+        frame's world and swarm to be restored.
 
         :return: A dictionary of simulation state for the current frame.
         """
         if not self.playing or not self.loaded:
             return None
 
-        # Retrieve data from current frame
-        frame_data = {
-            'positions': self.positions[self.current_frame],
-            'directions': self.directions[self.current_frame],
-            'num_agents': self.num_agents[self.current_frame],
-            'boundary_size': self.boundaries[self.current_frame],
-            'obstacle_corner_min': self.obstacle_min[self.current_frame],
-            'obstacle_corner_max': self.obstacle_max[self.current_frame],
-            'obstacle_toggle': self.obstacle_toggle[self.current_frame],
-            'reset': self.reset_flags[self.current_frame]
-        }
+        frame_data = self.frame_at(self.current_frame)
+        frame_data['reset'], frame_data['seek'] = self._transition(self._last_frame, self.current_frame)
 
-        # Advance frame (loop back if at end)
-        self.current_frame = (self.current_frame + 1) % self.total_frames
+        # Advance frame (loop around at either end)
+        self._last_frame = self.current_frame
+        self.current_frame = (self.current_frame + self.speed) % self.total_frames
         return frame_data
 
+    def _transition(self, previous, current):
+        """
+        Classify the move from `previous` to `current`.
+
+        :return: Tuple (reset, seek): whether the move starts playback or
+                 crosses a reset boundary, and whether it jumps rather than steps.
+        """
+        if previous is None:
+            return True, False
+        if current == previous:
+            return False, False
+        if current > previous and current - previous <= abs(self.speed) and self.speed > 0:
+            return bool(np.any(self.reset_flags[previous + 1:current + 1])), False
+        if current < previous and previous - current <= abs(self.speed) and self.speed < 0:
+            return bool(np.any(self.reset_flags[current + 1:previous + 1])), False
+        # Seeks and loops only rebuild the scene when they land on a recorded reset
+        return bool(self.reset_flags[current]), True
+
     def is_playing(self):
         """
         Check if playback is currently active.
 
         :return: True if playing, False otherwise.
         """
-        return self.playing
\ No newline at end of file
+        return self.playing
@@ -6,7 +6,7 @@ Description: Defines the interactive UI system, including sliders and toggles fo
 """
 
 from ursina import *
-from config import update_config, simulation_config, default_simulation_config
+from config import update_config, simulation_config, default_simulation_config, config_changes
 from simulation import refresh_obstacle, reset_boundaries, redraw_agents, reset_simulation
 
 
@@ -35,6 +35,7 @@ simulation_sliders = [
     {"min": 0, "max": 15, "default": simulation_config["x_max"], "text": "X Boundary", "key": "x_max"},
     {"min": 0, "max": 15, "default": simulation_config["y_max"], "text": "Y Boundary", "key": "y_max"},
     {"min": 0, "max": 15, "default": simulation_config["z_max"], "text": "Z Boundary", "key": "z_max"},
+    {"min": 0, "max": 4, "default": simulation_config["simulation_speed"], "text": "Simulation Speed", "key": "simulation_speed"},
 ]
 
 physics_sliders = [
@@ -59,17 +60,6 @@ obstacle_sliders = [
     {"min": -15, "max": 15, "step": 0.1, "default": simulation_config["obstacle_corner_max"][2], "text": "Obstacle Max Z", "key": "obstacle_corner_max[2]"},
 ]
 
-_redraw_callback = None
-
-def register_redraw_callback(cb):
-    """
-    Register a callback function to be triggered after redraw-worthy changes.
-
-    :param cb: A function that triggers a visual update.
-    """
-    global _redraw_callback
-    _redraw_callback = cb
-
 # --- BUTTON PANEL SETUP ---
 def build_button_panel(settings_containers, background_dimmer, ui_refs):
     """
@@ -145,6 +135,38 @@ def build_control_buttons(reset_fn, reset_default_fn, toggle_recording_fn, toggl
     return record_toggle, playback_toggle
 
 
+# --- PLAYBACK CONTROLS ---
+def build_playback_controls(reverse_fn):
+    """
+    Build the playback scrub bar and reverse button, hidden until playback starts.
+
+    :param reverse_fn: Function that flips the playback direction.
+    :return: Tuple (scrubber slider, reverse button).
+    """
+    scrubber = Slider(
+        min=0,
+        max=1,
+        default=0,
+        parent=camera.ui,
+        position=(-0.25, -0.45),
+        scale=(1, 1),
+        text='Playback',
+        enabled=False
+    )
+
+    reverse_button = Button(
+        text='Reverse',
+        parent=camera.ui,
+        position=(-0.7, -0.40, -0.5),
+        scale=(0.2, 0.05),
+        color=color.violet,
+        on_click=reverse_fn,
+        enabled=False
+    )
+
+    return scrubber, reverse_button
+
+
 # --- CAMERA TOGGLE ---
 def build_orbit_toggle(camera_panel, toggle_fn):
     """
@@ -169,14 +191,13 @@ def build_orbit_toggle(camera_panel, toggle_fn):
 # --- CONFIG UPDATE HANDLERS ---
 def update_agent_color(color_name):
     """
-    Change the agent color mode in config and trigger redraw.
+    Change the agent color mode in config; agents are recoloured by the next
+    simulation.apply_config_changes().
 
     :param color_name: The selected color name (e.g., 'red', 'multi').
     """
-    simulation_config['agent_colour_mode'] = color_name
+    config_changes.set('agent_colour_mode', color_name)
     print(f"Agent colour set to: {color_name}")
-    if _redraw_callback:
-        _redraw_callback()
 
 def update_obstacle_color(color):
     """
@@ -184,26 +205,43 @@ def update_obstacle_color(color):
 
     :param color: Ursina color object.
     """
-    simulation_config['obstacle_colour'] = color
-    refresh_obstacle()
+    config_changes.set('obstacle_colour', color)
     print(f"Obstacle colour set to: {color}")
 
 def toggle_obstacle():
     """
     Toggle the visibility and presence of the obstacle in the scene.
     """
-    simulation_config['obstacle_enabled'] = not simulation_config['obstacle_enabled']
-    refresh_obstacle()
-    print(f"Obstacle enabled: {simulation_config['obstacle_enabled']}")
+    config_changes.set('obstacle_enabled', not config_changes.get('obstacle_enabled'))
+    print(f"Obstacle enabled: {config_changes.get('obstacle_enabled')}")
 
 def toggle_fish_texture():
     """
     Toggle whether agents use their texture or plain color.
     """
-    simulation_config['fish_texture_enabled'] = not simulation_config.get('fish_texture_enabled', True)
-    print(f"Fish texture enabled: {simulation_config['fish_texture_enabled']}")
-    if _redraw_callback:
-        _redraw_callback()
+    config_changes.set('fish_texture_enabled', not config_changes.get('fish_texture_enabled'))
+    print(f"Fish texture enabled: {config_changes.get('fish_texture_enabled')}")
+
+def toggle_instanced_rendering():
+    """
+    Toggle between one instanced model for the whole swarm and one entity per agent.
+    """
+    config_changes.set('instanced_rendering', not config_changes.get('instanced_rendering'))
+    print(f"Instanced rendering enabled: {config_changes.get('instanced_rendering')}")
+
+def toggle_threaded_simulation():
+    """
+    Toggle whether physics runs on a background thread, overlapping with rendering.
+    """
+    simulation_config['threaded_simulation'] = not simulation_config['threaded_simulation']
+    print(f"Threaded simulation enabled: {simulation_config['threaded_simulation']}")
+
+def toggle_profiler_overlay():
+    """
+    Toggle the on-screen per-phase frame time overlay.
+    """
+    simulation_config['profiler_overlay'] = not simulation_config['profiler_overlay']
+    print(f"Profiler overlay enabled: {simulation_config['profiler_overlay']}")
 
 # --- SLIDER GENERATION ---
 def create_sliders(container, slider_data):
@@ -213,8 +251,6 @@ def create_sliders(container, slider_data):
     :param container: UI entity to parent sliders to.
     :param slider_data: List of dictionaries defining slider params.
     """
-    boundary_keys = ['x_max', 'y_max', 'z_max']
-
     for i, data in enumerate(slider_data):
         # Create the slider
         slider = Slider(
@@ -245,16 +281,12 @@ def create_sliders(container, slider_data):
         if key == "num_agents":
             def snap_to_int(sl=slider, k=key):
                 sl.value = round(sl.value)
-                update_config(k, sl)
+                config_changes.update(k, sl)
             slider.on_value_changed = snap_to_int
         else:
-            # General config update binding
-            def on_value_changed(s=slider, k=key):
-                update_config(k, s)
-                refresh_obstacle()
-                if k in boundary_keys:
-                    reset_boundaries()
-            slider.on_value_changed = on_value_changed
+            # General config update binding; affected subsystems are refreshed
+            # once per frame by simulation.apply_config_changes()
+            slider.on_value_changed = lambda s=slider, k=key: config_changes.update(k, s)
 
 # --- UI ELEMENTS ---
 def build_color_buttons(parent):
@@ -290,6 +322,67 @@ def build_texture_toggle(parent):
         on_click=toggle_fish_texture
     )
 
+def build_instancing_toggle(parent):
+    """
+    Add a toggle button to switch instanced agent rendering on/off.
+
+    :param parent: UI container.
+    """
+    return Button(
+        text="Toggle Instancing",
+        color=color.blue,
+        parent=parent,
+        position=(-0.2, -0.3),
+        scale=(0.4, 0.05),
+        on_click=toggle_instanced_rendering
+    )
+
+def build_threading_toggle(parent):
+    """
+    Add a toggle button to run physics on a background thread.
+
+    :param parent: UI container.
+    """
+    return Button(
+        text="Toggle Threaded Physics",
+        color=color.blue,
+        parent=parent,
+        position=(-0.2, -0.3),
+        scale=(0.4, 0.05),
+        on_click=toggle_threaded_simulation
+    )
+
+def build_profiler_toggle(parent):
+    """
+    Add a toggle button to show the per-phase frame time overlay.
+
+    :param parent: UI container.
+    """
+    return Button(
+        text="Toggle Profiler Overlay",
+        color=color.blue,
+        parent=parent,
+        position=(-0.2, -0.38),
+        scale=(0.4, 0.05),
+        on_click=toggle_profiler_overlay
+    )
+
+def build_profiler_overlay():
+    """
+    Text panel in the top-right corner for the profiler's percentile table.
+
+    :return: Text entity, hidden until the overlay is toggled on.
+    """
+    return Text(
+        text='',
+        parent=camera.ui,
+        position=(0.42, 0.48),
+        scale=0.7,
+        font='VeraMono.ttf',
+        background=True,
+        enabled=False
+    )
+
 def build_obstacle_controls(parent):
     """
     Add color buttons and toggle control for obstacle UI.
@@ -348,9 +441,12 @@ def create_settings_ui(on_reset_click=None, on_record_click=None, on_playback_cl
     # Populate each panel with its associated sliders and controls
     create_sliders(physics_ui, physics_sliders)
     create_sliders(simulation_ui, simulation_sliders)
+    build_threading_toggle(simulation_ui)
+    build_profiler_toggle(simulation_ui)
     create_sliders(agents_ui, agent_sliders)
     build_color_buttons(agents_ui)
     build_texture_toggle(agents_ui)
+    build_instancing_toggle(agents_ui)
     create_sliders(movement_ui, movement_sliders)
     create_sliders(camera_ui, camera_sliders)
     create_sliders(obstacle_ui, obstacle_sliders)
@@ -393,6 +489,8 @@ def reset_simulation_to_default(settings_containers):
     Reset all config values and sliders to their default state.
     Then resets the simulation using core logic.
     """
+    # Edits queued earlier in the frame must not overwrite the defaults when flushed
+    config_changes.discard()
     for key, value in default_simulation_config.items():
         simulation_config[key] = value
 
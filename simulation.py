@@ -6,15 +6,14 @@ Description: Coordinates the overall simulation, including agent spawning, envir
 UI binding, and real-time updates. Acts as the primary runtime logic hub for the system.
 """
 
-import csv
-import random
-import time
-import datetime
 import psutil
 
 from ursina import *
-from agent import Agent
-from config import simulation_config
+from agent import Agent, spawn_agents, resize_swarm
+from agent_renderer import InstancedAgents, apply_entity_transforms
+from asset_pool import AssetCache, acquire_entity, release_entities
+from config import simulation_config, config_changes, get_rng, seed_rng
+from profiler import profiler
 
 # === SIMULATION PARAMETERS ===
 
@@ -22,8 +21,11 @@ frame_duration = simulation_config["frame_duration"]
 
 # Entity containers
 obstacle_entity = None
+obstacle_entities = []  # Pooled entities for the extra obstacles
 boundary = None
 agent_entities = []
+agent_entity_pool = []  # Disabled agent entities kept for reuse
+agent_renderer = None  # InstancedAgents while instanced rendering is enabled
 rock_entities = []
 lotus_entities = []
 pillar_entities = []
@@ -63,18 +65,20 @@ def set_camera():
 
 # === COLOR UTILITY FUNCTION ===
 
-def generate_agent_color(base_color_mode: str, multi_mode: bool = False) -> color:
+def generate_agent_color(base_color_mode: str, multi_mode: bool = False, rng=None) -> color:
     """
     Generate a randomized color variation based on a base color name.
 
     :param base_color_mode: The base color name as a string.
     :param multi_mode: If True, applies a broader hue variation.
+    :param rng: Optional numpy Generator; defaults to the shared decoration stream.
     :return: A randomized Ursina color.
     """
+    rng = get_rng("decoration") if rng is None else rng
     base = getattr(color, base_color_mode, color.cyan if multi_mode else color.white)
-    v = clamp(base.v * random.uniform(0.7, 1.8), 0, 1)
-    s = clamp(base.s * random.uniform(0.6, 1.3), 0, 1)
-    h = base.h + random.uniform(-180, 180) if multi_mode else base.h + random.uniform(-20, 20)
+    v = clamp(base.v * rng.uniform(0.7, 1.8), 0, 1)
+    s = clamp(base.s * rng.uniform(0.6, 1.3), 0, 1)
+    h = base.h + rng.uniform(-180, 180) if multi_mode else base.h + rng.uniform(-20, 20)
     return color.color(h, s, v)
 
 
@@ -82,7 +86,8 @@ def generate_agent_color(base_color_mode: str, multi_mode: bool = False) -> colo
 
 def create_boundary():
     """
-    Create the simulation boundary and decorative elements (rocks, lotus, pillars).
+    Place the simulation boundary and decorative elements (rocks, lotus, pillars)
+    for the current boundaries, using pooled entities.
 
     :return: A list of wall Entity objects.
     """
@@ -101,9 +106,10 @@ def create_boundary():
             pos = Vec3((x_min + x_max) / 2, y_min, (z_min + z_max) / 2)
             scale = Vec3(x_max - x_min, z_max - z_min, 1)
             rotation = (90, 0, 0)
-            wall = Entity(
-                model='quad',
-                texture='textures/rock_08_diff_1k.jpg',
+            wall = acquire_entity(
+                'quad',
+                texture=AssetCache.texture('textures/rock_08_diff_1k.jpg'),
+                color=color.white,
                 position=pos,
                 scale=scale,
                 rotation=rotation,
@@ -132,8 +138,9 @@ def create_boundary():
                 scale = Vec3(z_max - z_min, y_max - y_min, 1)
                 rotation = (0, -90, 0)
 
-            wall = Entity(
-                model='quad',
+            wall = acquire_entity(
+                'quad',
+                texture=None,
                 color=wall_boundary_color,
                 position=pos,
                 scale=scale,
@@ -144,13 +151,10 @@ def create_boundary():
 
         walls.append(wall)
 
-    # Clear any previously created decorations
-    for e in rock_entities + lotus_entities + pillar_entities:
-        destroy(e)
-
-    rock_entities.clear()
-    lotus_entities.clear()
-    pillar_entities.clear()
+    # Return previously placed decorations to their pools
+    release_entities(rock_entities)
+    release_entities(lotus_entities)
+    release_entities(pillar_entities)
 
     # Add decorative elements
     create_corners(x_min, x_max, y_min, y_max, z_min, z_max)
@@ -159,11 +163,70 @@ def create_boundary():
 
     return walls
 
+
+def generate_decoration_layouts(rng=None):
+    """
+    Randomize the rock and lotus layouts. Layouts are stored in normalized
+    pond coordinates (0-1 across the floor), so boundary changes only move
+    decorations instead of rerolling them.
+
+    :param rng: Optional numpy Generator; defaults to the shared decoration stream.
+    :return: None
+    """
+    global rock_layout, lotus_layout
+    rng = get_rng("decoration") if rng is None else rng
+    rock_layout = generate_rock_layout(rng=rng)
+    lotus_layout = generate_lotus_layout(rng=rng)
+
+
 # === ROCK DECORATION ===
 
+# Rock and lotus layouts in normalized pond coordinates, see generate_decoration_layouts()
+rock_layout = None
+lotus_layout = None
+
+# Pond floor area the layout spacing is designed for (the default 20 x 20 pond)
+reference_pond_area = 400
+
+
+def generate_rock_layout(max_rocks=80, rng=None):
+    """
+    Randomize rock placement and appearance for up to `max_rocks` rocks.
+    The layout is shuffled, so any leading slice keeps the ratio of clustered
+    to standalone rocks.
+
+    :param max_rocks: Largest number of rocks any pond size can show.
+    :param rng: Optional numpy Generator; defaults to the shared decoration stream.
+    :return: Dictionary with the base rock count and a list of (u, v, attributes) rocks.
+    """
+    rng = get_rng("decoration") if rng is None else rng
+    num_clusters = rng.integers(3, 6)
+    spread = 1.5 / math.sqrt(reference_pond_area)  # Cluster spread of 1.5 units in the default pond
+
+    # Generate central points for rock clusters
+    cluster_centers = rng.random((num_clusters, 2))
+
+    rocks_in_clusters = int(max_rocks * 0.8)
+    rocks = []
+
+    # Clustered rocks
+    for _ in range(rocks_in_clusters):
+        cu, cv = cluster_centers[rng.integers(num_clusters)]
+        u = clamp(rng.normal(cu, spread), 0, 1)
+        v = clamp(rng.normal(cv, spread), 0, 1)
+        rocks.append((u, v, rock_attributes(rng)))
+
+    # Random standalone rocks
+    for _ in range(max_rocks - rocks_in_clusters):
+        rocks.append((rng.random(), rng.random(), rock_attributes(rng)))
+
+    rng.shuffle(rocks)
+    return {'base': rng.integers(30, 51), 'rocks': rocks}
+
+
 def create_rocks(x_min, x_max, y_min, z_min, z_max):
     """
-    Create randomized rock decorations distributed throughout the pond area.
+    Place rock decorations from the current layout throughout the pond area.
 
     :param x_min: Minimum X boundary.
     :param x_max: Maximum X boundary.
@@ -172,52 +235,23 @@ def create_rocks(x_min, x_max, y_min, z_min, z_max):
     :param z_max: Maximum Z boundary.
     :return: None
     """
-    global rock_entities
-    rock_entities.clear()
-
     width = x_max - x_min
     depth = z_max - z_min
     pond_area = width * depth
 
-    base_rocks = random.randint(30, 50)
     rock_multiplier = pond_area / 100
-    num_rocks = int(base_rocks * rock_multiplier)
+    num_rocks = int(rock_layout['base'] * rock_multiplier)
     num_rocks = clamp(num_rocks, 30, 80)
 
     buffer = 1  # Ensure rocks don't spawn right at the edges
-    num_clusters = random.randint(3, 5)
 
-    # Generate central points for rock clusters
-    cluster_centers = [
-        Vec3(
-            random.uniform(x_min + buffer, x_max - buffer),
-            y_min + 0.1,
-            random.uniform(z_min + buffer, z_max - buffer)
-        )
-        for _ in range(num_clusters)
-    ]
-
-    rocks_in_clusters = int(num_rocks * 0.8)
-    straggler_rocks = num_rocks - rocks_in_clusters
-
-    # Clustered rocks
-    for _ in range(rocks_in_clusters):
-        cluster = random.choice(cluster_centers)
-        pos = Vec3(
-            clamp(random.gauss(cluster.x, 1.5), x_min + buffer, x_max - buffer),
-            cluster.y,
-            clamp(random.gauss(cluster.z, 1.5), z_min + buffer, z_max - buffer)
-        )
-        spawn_rock(pos)
-
-    # Random standalone rocks
-    for _ in range(straggler_rocks):
+    for u, v, attributes in rock_layout['rocks'][:num_rocks]:
         pos = Vec3(
-            random.uniform(x_min + buffer, x_max - buffer),
+            lerp(x_min + buffer, x_max - buffer, u),
             y_min + 0.1,
-            random.uniform(z_min + buffer, z_max - buffer)
+            lerp(z_min + buffer, z_max - buffer, v)
         )
-        spawn_rock(pos)
+        spawn_rock(pos, attributes)
 
 
 rock_models = [
@@ -227,56 +261,95 @@ rock_models = [
 ]
 
 
-def spawn_rock(pos):
+def rock_attributes(rng=None):
     """
-    Spawn a rock entity at a specific position with randomized scale, color, and rotation.
+    Randomize a rock's model, scale, color, and rotation.
 
-    :param pos: A Vec3 position for the rock.
-    :return: None
+    :param rng: Optional numpy Generator; defaults to the shared decoration stream.
+    :return: Dictionary of rock attributes.
     """
-    size_factor = random.random()
+    rng = get_rng("decoration") if rng is None else rng
+    size_factor = rng.random()
     if size_factor < 0.75:
-        scale = random.uniform(0.005, 0.01)
+        scale = rng.uniform(0.005, 0.01)
     elif size_factor < 0.95:
-        scale = random.uniform(0.012, 0.02)
+        scale = rng.uniform(0.012, 0.02)
     else:
-        scale = random.uniform(0.025, 0.04)
+        scale = rng.uniform(0.025, 0.04)
 
     base = Color(50 / 255, 50 / 255, 50 / 255, 1)
-    v = clamp(base.v * random.uniform(0.9, 1.1), 0, 1)
-    s = clamp(base.s * random.uniform(0.4, 0.9), 0, 1)
-    h = base.h + random.uniform(-5, 5)
+    v = clamp(base.v * rng.uniform(0.9, 1.1), 0, 1)
+    s = clamp(base.s * rng.uniform(0.4, 0.9), 0, 1)
+    h = base.h + rng.uniform(-5, 5)
 
     # Darker appearance for larger rocks
     if scale > 0.02:
         v *= 0.8
         s *= 0.9
 
-    rock_color = color.color(h, s, v)
-
-    rock = Entity(
-        model=random.choice(rock_models),
-        color=rock_color,
-        position=pos,
-        scale=Vec3(
+    return {
+        'model': rock_models[rng.integers(len(rock_models))],
+        'color': color.color(h, s, v),
+        'scale': Vec3(
             scale,
-            scale * random.uniform(0.5, 1),
+            scale * rng.uniform(0.5, 1),
             scale
         ),
-        rotation=Vec3(
-            random.uniform(-5, 5),
-            random.uniform(0, 360),
-            random.uniform(-5, 5)
+        'rotation': Vec3(
+            rng.uniform(-5, 5),
+            rng.uniform(0, 360),
+            rng.uniform(-5, 5)
         )
+    }
+
+
+def spawn_rock(pos, attributes=None):
+    """
+    Place a pooled rock entity at a specific position.
+
+    :param pos: A Vec3 position for the rock.
+    :param attributes: Rock attributes from rock_attributes(); randomized if omitted.
+    :return: None
+    """
+    attributes = attributes or rock_attributes()
+    rock = acquire_entity(
+        attributes['model'],
+        color=attributes['color'],
+        position=pos,
+        scale=attributes['scale'],
+        rotation=attributes['rotation']
     )
     rock_entities.append(rock)
 
 
 # === LOTUS DECORATION ===
 
+def generate_lotus_layout(max_lotus=10, rng=None):
+    """
+    Randomize placement, size and bobbing for up to `max_lotus` lotus leaves.
+
+    :param max_lotus: Largest number of lotus leaves any pond size can show.
+    :param rng: Optional numpy Generator; defaults to the shared decoration stream.
+    :return: Dictionary with the base lotus count and a list of per-leaf attributes.
+    """
+    rng = get_rng("decoration") if rng is None else rng
+    leaves = [
+        {
+            'u': rng.random(),
+            'v': rng.random(),
+            'scale': rng.uniform(50, 80),
+            'rotation_y': rng.uniform(0, 360),
+            'bob_speed': rng.uniform(0.5, 1.5),
+            'bob_height': rng.uniform(0.01, 0.03),
+        }
+        for _ in range(max_lotus)
+    ]
+    return {'base': rng.integers(3, 7), 'leaves': leaves}
+
+
 def create_lotus(x_min, x_max, y_max, z_min, z_max):
     """
-    Create animated lotus leaf entities that float on the surface.
+    Place animated lotus leaf entities from the current layout on the surface.
 
     :param x_min: Minimum X boundary.
     :param x_max: Maximum X boundary.
@@ -285,35 +358,30 @@ def create_lotus(x_min, x_max, y_max, z_min, z_max):
     :param z_max: Maximum Z boundary.
     :return: None
     """
-    global lotus_entities
-    lotus_entities.clear()
-
     width = x_max - x_min
     depth = z_max - z_min
     pond_area = width * depth
 
-    base_lotus = random.randint(3, 6)
     lotus_multiplier = pond_area / 100
-    num_lotus = clamp(int(base_lotus * lotus_multiplier), 3, 10)
+    num_lotus = clamp(int(lotus_layout['base'] * lotus_multiplier), 3, 10)
 
-    for _ in range(num_lotus):
-        scale = random.uniform(50, 80)
-        lotus = Entity(
-            model='models/lilypad.obj',
+    for leaf in lotus_layout['leaves'][:num_lotus]:
+        lotus = acquire_entity(
+            'models/lilypad.obj',
             color=Color(60/255, 100/255, 50/255, 1),
             position=Vec3(
-                random.uniform(x_min+0.5, x_max-0.5),
+                lerp(x_min+0.5, x_max-0.5, leaf['u']),
                 y_max + 0.05,
-                random.uniform(z_min+0.5, z_max-0.5)
+                lerp(z_min+0.5, z_max-0.5, leaf['v'])
             ),
-            scale=scale,
-            rotation=Vec3(0, random.uniform(0, 360), 0)
+            scale=leaf['scale'],
+            rotation=Vec3(0, leaf['rotation_y'], 0)
         )
 
         # Bobbing animation using time-based sine wave
         lotus.original_y = lotus.y
-        lotus.bob_speed = random.uniform(0.5, 1.5)
-        lotus.bob_height = random.uniform(0.01, 0.03)
+        lotus.bob_speed = leaf['bob_speed']
+        lotus.bob_height = leaf['bob_height']
 
         def bob(self=lotus):
             self.y = self.original_y + math.sin(time.time() * self.bob_speed) * self.bob_height
@@ -326,7 +394,7 @@ def create_lotus(x_min, x_max, y_max, z_min, z_max):
 
 def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
     """
-    Create structural corner pillars and connecting beams for visual flair.
+    Place structural corner pillars and connecting beams for visual flair.
 
     :param x_min: Minimum X boundary.
     :param x_max: Maximum X boundary.
@@ -336,9 +404,6 @@ def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
     :param z_max: Maximum Z boundary.
     :return: None
     """
-    global pillar_entities
-    pillar_entities.clear()
-
     corners = [
         (x_min, z_min), (x_min, z_max),
         (x_max, z_min), (x_max, z_max)
@@ -349,8 +414,8 @@ def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
 
     # Vertical corner posts
     for (x, z) in corners:
-        pillar = Entity(
-            model='cube',
+        pillar = acquire_entity(
+            'cube',
             color=pillar_color,
             position=Vec3(x, y_min + height/2, z),
             scale=Vec3(0.2, height, 0.2)
@@ -359,8 +424,8 @@ def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
 
     # Top beams in Z direction
     for z in [z_min, z_max]:
-        beam = Entity(
-            model='cube',
+        beam = acquire_entity(
+            'cube',
             color=beam_color,
             position=Vec3((x_min + x_max)/2, y_max, z),
             scale=Vec3(x_max - x_min + 0.1, 0.05, 0.1)
@@ -369,8 +434,8 @@ def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
 
     # Top beams in X direction
     for x in [x_min, x_max]:
-        beam = Entity(
-            model='cube',
+        beam = acquire_entity(
+            'cube',
             color=beam_color,
             position=Vec3(x, y_max, (z_min + z_max)/2),
             scale=Vec3(0.1, 0.05, z_max - z_min + 0.1)
@@ -380,86 +445,148 @@ def create_corners(x_min, x_max, y_min, y_max, z_min, z_max):
 
 # === AGENT VISUALS ===
 
-def redraw_agents():
+def agent_texture():
     """
-    Destroys and recreates visual representations of all agents,
-    using colors based on the selected simulation mode.
+    Texture applied to agents under the current configuration.
 
-    :return: List of Entity objects representing agents.
+    :return: Cached texture, or None when fish textures are disabled or missing.
     """
-    global color_choices, agent_entities
+    if simulation_config.get("fish_texture_enabled", True):
+        return AssetCache.texture('textures/Tailor_low_DefaultMaterial_BaseColor.png')
+    return None
 
-    color_mode = simulation_config["agent_colour_mode"]
 
-    # Remove existing agent visuals
-    for ent in agent_entities:
-        destroy(ent)
+def assign_agent_colors(agents):
+    """
+    Give each agent a new randomized color for the selected color mode.
 
-    # Assign new randomized color to each agent
-    for agent in Agent.all_agents:
-        multi = color_mode == "multi"
+    :param agents: Agents to recolor.
+    """
+    color_mode = simulation_config["agent_colour_mode"]
+    multi = color_mode == "multi"
+    for agent in agents:
         agent.color = generate_agent_color(color_mode, multi_mode=multi)
 
-    # Spawn new agent visuals with correct color and position
-    agent_entities = [
-        Entity(
-            model='models/tailor2.obj',
-            texture='textures/Tailor_low_DefaultMaterial_BaseColor.png'
-                     if simulation_config.get("fish_texture_enabled", True) else None,
-            color=agent.color,
-            scale=simulation_config["agent_scale"],
-            position=agent.position,
-            rotation=Vec3(90, -90, 0)  # consistent facing direction
-        )
-        for agent in Agent.all_agents
-    ]
+
+def sync_agent_visuals(start=0):
+    """
+    Match agent visuals to the current swarm without rebuilding them.
+
+    Entities for agents past the end of the swarm are disabled and pooled,
+    and missing ones are taken from the pool before any new entity is
+    created. Color, texture and scale are applied in place to agents from
+    `start` onwards.
+
+    :param start: Index of the first agent whose appearance needs updating.
+    :return: List of Entity objects representing agents.
+    """
+    global agent_renderer
+
+    count = len(Agent.all_agents)
+    texture = agent_texture()
+    scale = simulation_config["agent_scale"]
+    positions, directions, _ = Agent.state.live()
+
+    if simulation_config["instanced_rendering"]:
+        # Per-agent entities are pooled while the instanced renderer draws the swarm
+        release_agent_entities(0)
+        if agent_renderer is None:
+            agent_renderer = InstancedAgents(AssetCache.model('models/tailor2.obj'), capacity=count)
+            start = 0
+        agent_renderer.entity.texture = texture
+        agent_renderer.set_scale(scale)
+        agent_renderer.set_colors([agent.color for agent in Agent.all_agents[start:]], start=start)
+        agent_renderer.update(positions, directions)
+        return agent_entities
+
+    if agent_renderer is not None:
+        agent_renderer.destroy()
+        agent_renderer = None
+        start = 0
+
+    # Shrink into the pool, then grow from it
+    release_agent_entities(count)
+    while len(agent_entities) < count:
+        entity = agent_entity_pool.pop() if agent_entity_pool else Entity(model=AssetCache.model('models/tailor2.obj'))
+        entity.enabled = True
+        agent_entities.append(entity)
+
+    for agent, entity in zip(Agent.all_agents[start:], agent_entities[start:]):
+        entity.texture = texture
+        entity.color = agent.color
+        entity.scale = scale
+    apply_entity_transforms(agent_entities[start:], positions[start:], directions[start:])
 
     return agent_entities
 
-# === AGENT INITIALIZATION ===
 
-def spawn_agents():
+def release_agent_entities(count):
     """
-    Spawn agent objects within the 3D world with randomized positions and directions.
+    Disable and pool every agent entity past the first `count`.
 
-    :return: A list of all Agent instances created.
+    :param count: Number of agent entities to keep in the scene.
     """
-    Agent.all_agents.clear()
+    while len(agent_entities) > count:
+        entity = agent_entities.pop()
+        entity.enabled = False
+        agent_entity_pool.append(entity)
 
-    for _ in range(simulation_config["num_agents"]):
-        agent = Agent(
-            position=[
-                random.uniform(simulation_config["x_min"], simulation_config["x_max"]),
-                random.uniform(simulation_config["y_min"], simulation_config["y_max"]),
-                random.uniform(simulation_config["z_min"], simulation_config["z_max"])
-            ],
-            direction=[
-                random.uniform(*simulation_config["init_direction_bounds"]),
-                random.uniform(*simulation_config["init_direction_bounds"]),
-                random.uniform(*simulation_config["init_direction_bounds"])
-            ]
-        )
 
-    return Agent.all_agents
+def redraw_agents():
+    """
+    Recolor every agent using the selected color mode and refresh their
+    visuals in place, reusing existing entities.
+
+    With instanced rendering enabled, every agent is drawn by one shared
+    instanced entity and no per-agent entities are kept.
+
+    :return: List of Entity objects representing agents.
+    """
+    assign_agent_colors(Agent.all_agents)
+    return sync_agent_visuals()
+
+
+def set_agent_count(count):
+    """
+    Grow or shrink the running swarm to `count` agents. Existing agents keep
+    their state and visuals; only the added or removed agents are touched.
 
+    :param count: New number of agents.
+    :return: List of Entity objects representing agents.
+    """
+    previous = len(Agent.all_agents)
+    resize_swarm(count)
+    assign_agent_colors(Agent.all_agents[previous:])
+    return sync_agent_visuals(start=min(previous, count))
 
 # === OBSTACLE SETUP ===
 
 def refresh_obstacle():
     """
-    Create or replace the obstacle in the simulation environment
-    based on the current configuration.
+    Create, move or hide the obstacles in the simulation environment
+    based on the current configuration. The slider-controlled obstacle
+    entity is created once and updated in place afterwards; the extra
+    obstacles are drawn with pooled entities.
 
     :return: None
     """
     global obstacle_entity
 
-    # Destroy existing obstacle if present
-    if obstacle_entity:
-        destroy(obstacle_entity)
-
-    # If obstacle use is disabled in the config, exit early
+    # Extra obstacles from the config list
+    release_entities(obstacle_entities)
+    for corner_min, corner_max in simulation_config['obstacles']:
+        low, high = Vec3(*corner_min), Vec3(*corner_max)
+        obstacle_entities.append(acquire_entity(
+            'cube',
+            color=simulation_config['obstacle_colour'],
+            position=(low + high) * 0.5,
+            scale=Vec3(*(abs(v) for v in high - low)),
+        ))
+
+    # If obstacle use is disabled in the config, hide it and exit early
     if not simulation_config['obstacle_enabled']:
+        if obstacle_entity:
+            obstacle_entity.enabled = False
         return
 
     # Define obstacle placement and size
@@ -468,23 +595,24 @@ def refresh_obstacle():
     center = (min_corner + max_corner) * 0.5
     size = max_corner - min_corner
 
-    # Create a new obstacle entity
-    obstacle_entity = Entity(
-        model='cube',
-        color=simulation_config['obstacle_colour'],
-        position=center,
-        scale=size,
-        collider='box'
-    )
+    if obstacle_entity is None:
+        obstacle_entity = Entity(model=AssetCache.model('cube'), collider='box')
+
+    obstacle_entity.enabled = True
+    obstacle_entity.color = simulation_config['obstacle_colour']
+    obstacle_entity.position = center
+    obstacle_entity.scale = size
 
 
 # === BOUNDARY RESET ===
 
-def reset_boundaries():
+def reset_boundaries(relayout=True):
     """
     Reset the boundary walls and decorations based on the current configuration.
     Invokes the reset callback if registered.
 
+    :param relayout: Randomize new decoration layouts. When False, the current
+                     decorations are only moved to fit the new boundaries.
     :return: None
     """
     global boundary
@@ -493,15 +621,54 @@ def reset_boundaries():
     if _reset_frame_callback:
         _reset_frame_callback()
 
-    # Destroy current boundary entities
+    if relayout or rock_layout is None:
+        generate_decoration_layouts()
+
+    # Return current boundary entities to the pool
     if boundary:
-        for wall in boundary:
-            destroy(wall)
+        release_entities(boundary)
 
-    # Recreate boundary structure
+    # Place boundary structure
     boundary = create_boundary()
 
 
+# === CONFIG CHANGES ===
+
+def refresh_physics_constants():
+    """
+    Copy the speed limits cached on the Agent class from the configuration.
+    Every other physics parameter is read from the configuration each step.
+    """
+    Agent.max_speed = simulation_config["max_speed"]
+    Agent.min_speed = simulation_config["min_speed"]
+
+
+def apply_config_changes():
+    """
+    Apply the configuration edits queued since the last call, refreshing
+    each affected subsystem once. Called once per frame.
+
+    :return: Dictionary mapping each refreshed subsystem to its changed keys.
+    """
+    changes = config_changes.flush()
+
+    if "physics" in changes:
+        refresh_physics_constants()
+    if "obstacle" in changes:
+        refresh_obstacle()
+    if "boundaries" in changes:
+        reset_boundaries(relayout=False)
+    if "agent_count" in changes:
+        set_agent_count(int(simulation_config["num_agents"]))
+    if "agent_visuals" in changes:
+        if "agent_colour_mode" in changes["agent_visuals"]:
+            redraw_agents()
+        else:
+            sync_agent_visuals()
+
+    return changes
+
+
 # === SIMULATION RESET ===
 
 def reset_simulation():
@@ -514,6 +681,7 @@ def reset_simulation():
 
     reset_boundaries()
     refresh_obstacle()
+    refresh_physics_constants()
     spawn_agents()
     agent_entities = redraw_agents()
     set_camera()
@@ -523,9 +691,10 @@ def reset_simulation():
 
 # === PERFORMANCE LOGGING AND AUTO-STAGING ===
 
-frame_data_log = []
-frame_counter = 0
-last_frame_time = None
+# Per-phase times of every staged frame are streamed here
+frame_log_path = "frame_log.csv"
+
+# Each stage is (num_agents, frames); benchmark.py compares neighbour backends headlessly
 agent_stages = [
     (10, 300), (20, 300), (30, 300), (40, 300),
     (50, 300), (60, 300), (70, 300), (80, 300)
@@ -536,50 +705,46 @@ current_agent_count = agent_stages[0][0]
 
 def log_performance():
     """
-    Logs frame performance and optionally switches stages after thresholds.
+    Close the profiler's frame, tagged with the benchmark stage, and switch
+    stages after their frame counts. Call once per frame in place of
+    profiler.end_frame() when running the staged benchmark.
 
     :return: True if a stage switch occurred, False otherwise.
     """
-    global frame_counter, last_frame_time, stage_index, stage_frame_counter, current_agent_count
-
-    now = time.perf_counter()
-    frame_time = 0.0
-    if last_frame_time is not None:
-        frame_time = (now - last_frame_time) * 1000
-    last_frame_time = now
+    global stage_index, stage_frame_counter, current_agent_count
 
-    cpu = psutil.cpu_percent(interval=None)
-    systime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-    num_agents = simulation_config["num_agents"]
+    if stage_index >= len(agent_stages):
+        profiler.end_frame()
+        return False
 
-    frame_data_log.append([
-        systime, frame_counter, stage_index, frame_time, cpu, num_agents
-    ])
+    if profiler.writer is None:
+        profiler.start_writing(frame_log_path, extra_columns=("stage", "cpu_percent", "num_agents", "neighbour_backend"))
 
-    frame_counter += 1
+    profiler.end_frame(
+        stage=stage_index,
+        cpu_percent=psutil.cpu_percent(interval=None),
+        num_agents=simulation_config["num_agents"],
+        neighbour_backend=simulation_config["neighbour_backend"]
+    )
     stage_frame_counter += 1
 
     # Handle auto stage switching
-    if stage_index >= len(agent_stages):
-        return False
-
     if stage_frame_counter >= agent_stages[stage_index][1]:
         stage_index += 1
         stage_frame_counter = 0
 
         if stage_index < len(agent_stages):
             next_count = agent_stages[stage_index][0]
+            current_agent_count = next_count
             simulation_config["num_agents"] = next_count
+            # Every stage starts from the same random state when a seed is configured
+            if simulation_config["random_seed"] is not None:
+                seed_rng(simulation_config["random_seed"])
             reset_simulation()
             print(f"\n>>> Switching to {next_count} agents (Stage {stage_index})\n")
             return True
         else:
             print(">>> All stages complete.")
-            with open("frame_log.csv", "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["timestamp", "frame", "stage", "frame_time_ms", "cpu_percent", "num_agents"])
-                writer.writerows(frame_data_log)
-
-            print("[Simulation] Frame log saved to frame_log.csv.")
+            profiler.stop_writing()
 
     return False
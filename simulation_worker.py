@@ -0,0 +1,181 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: simulation_worker.py
+Description: Runs batches of simulation ticks on a background thread so physics overlaps with
+rendering. The worker publishes each finished batch into one of two state buffers, and the render
+loop always reads the most recently completed one.
+"""
+
+import threading
+
+import numpy as np
+
+from profiler import profiler
+from timestep import StateInterpolator
+
+
+class StateBuffer:
+    """
+    Copy of the swarm state after a batch of ticks, together with the state
+    from before the batch's last tick for interpolated rendering and the
+    profiler phase times spent producing it.
+    """
+
+    def __init__(self):
+        self.positions = np.zeros((0, 3))
+        self.directions = np.zeros((0, 3))
+        self.history = StateInterpolator()
+        self.phase_times = None
+
+    @property
+    def count(self):
+        """
+        Number of agents held in the buffer.
+        """
+        return self.positions.shape[0]
+
+    def capture(self, state):
+        """
+        Copy the live rows of a swarm state into the buffer.
+
+        :param state: SwarmState to copy.
+        """
+        positions, directions, _ = state.live()
+        if self.positions.shape != positions.shape:
+            self.positions = np.empty_like(positions)
+            self.directions = np.empty_like(directions)
+        self.positions[:] = positions
+        self.directions[:] = directions
+
+    def blend(self, alpha):
+        """
+        Interpolate between the state before the last tick and the buffered state.
+
+        :param alpha: Blend factor, 0 for the previous tick and 1 for the buffered state.
+        :return: Tuple (positions, directions) to render.
+        """
+        return self.history.blend(self.positions, self.directions, alpha)
+
+
+class SimulationWorker:
+    """
+    Background thread advancing a swarm state by batches of ticks.
+
+    The main thread calls `wait` before touching the swarm state, then
+    `submit` to start the next batch, and reads `latest()` for rendering
+    while the batch runs. The worker writes only to the back buffer and
+    swaps it to the front once the batch is complete.
+    """
+
+    def __init__(self, state, step):
+        """
+        :param state: SwarmState advanced by the worker.
+        :param step: Callable advancing the state by one tick, e.g. a movement model's step.
+        """
+        self.state = state
+        self.step = step
+        self.buffers = [StateBuffer(), StateBuffer()]
+        self.front = 0
+        self.stale = True
+        self.error = None
+
+        self._job = None
+        self._job_ready = threading.Condition()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+
+    def latest(self):
+        """
+        Most recently completed state buffer.
+        """
+        return self.buffers[self.front]
+
+    def collect_phase_times(self):
+        """
+        Profiler phase times of the last completed batch, returned only once.
+        Only call while the worker is idle.
+
+        :return: Array for profiler.add(), or None if there is no new batch.
+        """
+        front = self.latest()
+        times, front.phase_times = front.phase_times, None
+        return times
+
+    def mark_stale(self):
+        """
+        Flag that the swarm state was changed outside the worker (reset,
+        playback, single-threaded ticks), so the buffers must be refreshed.
+        """
+        self.stale = True
+
+    def publish(self):
+        """
+        Copy the current swarm state into the front buffer without interpolation.
+        Only call while the worker is idle.
+        """
+        self.wait()
+        front = self.latest()
+        front.capture(self.state)
+        front.history.invalidate()
+        self.stale = False
+
+    def submit(self, ticks, before_tick=None):
+        """
+        Start advancing the swarm by a number of ticks in the background.
+
+        :param ticks: Number of ticks to run; 0 only refreshes stale buffers.
+        :param before_tick: Optional callable run on the worker before each tick, e.g. recording.
+        """
+        self.wait()
+        if self.stale or self.latest().count != self.state.count:
+            self.publish()
+        if ticks <= 0:
+            return
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="simulation-worker", daemon=True)
+            self._thread.start()
+
+        with self._job_ready:
+            self._idle.clear()
+            self._job = (ticks, before_tick)
+            self._job_ready.notify()
+
+    def wait(self):
+        """
+        Block until the current batch is complete. Errors raised on the worker are re-raised here.
+        """
+        self._idle.wait()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _run(self):
+        """
+        Worker loop: run each submitted batch and publish it to the back buffer.
+        """
+        while True:
+            with self._job_ready:
+                while self._job is None:
+                    self._job_ready.wait()
+                ticks, before_tick = self._job
+                self._job = None
+
+            try:
+                back = self.buffers[1 - self.front]
+                for tick in range(ticks):
+                    if before_tick is not None:
+                        before_tick()
+                    if tick == ticks - 1:
+                        positions, directions, _ = self.state.live()
+                        back.history.snapshot(positions, directions)
+                    self.step(self.state)
+                back.capture(self.state)
+                back.phase_times = profiler.collect()
+                self.front = 1 - self.front
+            except Exception as e:
+                self.error = e
+            finally:
+                self._idle.set()
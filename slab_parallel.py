@@ -0,0 +1,288 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: slab_parallel.py
+Description: Steps very large swarms across several processes. The world is split into slabs along
+its longest axis and each slab is advanced by a worker process, reading and writing swarm state held
+in shared memory. Every slab also reads a halo of agents within the interaction radius of its borders,
+so each agent sees exactly the neighbours it would in the single-process Boids step.
+
+Usage:
+    with SlabDecomposition(num_slabs=4) as model:
+        for _ in range(steps):
+            model.step(Agent.state, dt)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from agent import Agent, SwarmState
+from config import simulation_config
+from movement_model import Boids
+
+# Float64 values stored per agent: position (3), direction (3), speed (1)
+VALUES_PER_AGENT = 7
+
+
+def shared_state_views(buffer, capacity):
+    """
+    Lay out two copies of the swarm state in a shared memory buffer: the state
+    at the start of the step, read by every slab, and the next state, to which
+    each slab writes its own agents.
+
+    :param buffer: Shared memory buffer of at least 2 * capacity * VALUES_PER_AGENT float64s.
+    :param capacity: Number of agents each copy can hold.
+    :return: Tuple (current, following) of (positions, directions, speeds) arrays.
+    """
+    values = np.ndarray((2 * capacity * VALUES_PER_AGENT,), dtype=np.float64, buffer=buffer)
+    copies = []
+    for half in np.split(values, 2):
+        positions = half[:capacity * 3].reshape(capacity, 3)
+        directions = half[capacity * 3:capacity * 6].reshape(capacity, 3)
+        speeds = half[capacity * 6:]
+        copies.append((positions, directions, speeds))
+    return copies[0], copies[1]
+
+
+def slab_edges(config, num_slabs):
+    """
+    Split the world boundaries into equal-width slabs along their longest axis.
+
+    The outer edges are open, so agents outside the boundaries still belong
+    to the first or last slab.
+
+    :param config: Configuration holding the world boundaries.
+    :param num_slabs: Number of slabs.
+    :return: Tuple (axis, edges) with edges an array of num_slabs + 1 coordinates.
+    """
+    mins = np.array([config["x_min"], config["y_min"], config["z_min"]], dtype=float)
+    maxs = np.array([config["x_max"], config["y_max"], config["z_max"]], dtype=float)
+    axis = int(np.argmax(maxs - mins))
+    edges = np.linspace(mins[axis], maxs[axis], num_slabs + 1)
+    edges[0], edges[-1] = -np.inf, np.inf
+    return axis, edges
+
+
+def slab_owners(positions, axis, edges):
+    """
+    Index of the slab owning each agent.
+
+    :param positions: A numpy array (N, 3) of agent positions.
+    :param axis: Axis the slabs are stacked along.
+    :param edges: Slab edges from slab_edges().
+    :return: A numpy array (N,) of slab indices.
+    """
+    return np.searchsorted(edges[1:-1], positions[:, axis], side='right')
+
+
+# === WORKER PROCESS ===
+
+# Shared memory block attached by this worker: (name, SharedMemory, views)
+_attached = None
+
+
+def _init_worker():
+    """
+    Keep each worker to a single thread, as parallelism comes from the slabs.
+    """
+    try:
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _warm_up_worker():
+    """
+    Pay one-off costs (imports, loading compiled kernels) before the first step.
+    """
+    from jit_kernels import get_step_kernel, get_grid_query_kernel
+    if simulation_config.get("use_jit", False):
+        get_step_kernel()
+        get_grid_query_kernel()
+
+
+def _attach(name, capacity):
+    """
+    Attach to the coordinator's shared memory block, reusing the last attachment.
+    """
+    global _attached
+    if _attached is None or _attached[0] != name:
+        if _attached is not None:
+            old_block = _attached[1]
+            _attached = None  # Drop the array views before closing the block
+            old_block.close()
+        block = shared_memory.SharedMemory(name=name)
+        _attached = (name, block, shared_state_views(block.buf, capacity))
+    return _attached[2]
+
+
+def step_slab(name, capacity, count, slab, axis, edges, radius, config, dt):
+    """
+    Advance the agents owned by one slab by a single step.
+
+    The slab's agents and its halo (agents within `radius` of its borders)
+    are copied into a local swarm and stepped with Boids.step_all; only the
+    owned agents' results are written back to the shared next state.
+
+    :param name: Name of the shared memory block.
+    :param capacity: Agent capacity of the block.
+    :param count: Number of live agents.
+    :param slab: Index of the slab to advance.
+    :param axis: Axis the slabs are stacked along.
+    :param edges: Slab edges from slab_edges().
+    :param radius: Largest active interaction radius.
+    :param config: Simulation configuration for this step.
+    :param dt: Movement step.
+    :return: Tuple (owned, halo) agent counts.
+    """
+    simulation_config.clear()
+    simulation_config.update(config)
+    Agent.min_speed = config["min_speed"]
+
+    (positions, directions, speeds), (next_positions, next_directions, next_speeds) = _attach(name, capacity)
+    coordinates = positions[:count, axis]
+    low, high = edges[slab], edges[slab + 1]
+
+    owned = (coordinates >= low) & (coordinates < high)
+    rows = np.flatnonzero((coordinates >= low - radius) & (coordinates < high + radius))
+    keep = owned[rows]
+    if not keep.any():
+        return 0, 0
+
+    local = SwarmState(len(rows))
+    np.take(positions, rows, axis=0, out=local.positions)
+    np.take(directions, rows, axis=0, out=local.directions)
+    np.take(speeds, rows, out=local.speeds)
+    local.count = len(rows)
+
+    Boids.step_all(local, dt)
+
+    owned_rows = rows[keep]
+    next_positions[owned_rows] = local.positions[keep]
+    next_directions[owned_rows] = local.directions[keep]
+    next_speeds[owned_rows] = local.speeds[keep]
+    return len(owned_rows), len(rows) - len(owned_rows)
+
+
+# === COORDINATOR ===
+
+class SlabDecomposition:
+    """
+    Movement model stepping a swarm across a pool of worker processes, one
+    task per spatial slab.
+
+    Ownership is decided by position at the start of every step, so agents
+    that cross a slab border migrate to the neighbouring slab on the next step.
+    """
+
+    def __init__(self, num_slabs=None, workers=None):
+        """
+        :param num_slabs: Number of slabs (defaults to the number of cores).
+        :param workers: Number of worker processes (defaults to the number of slabs).
+        """
+        self.num_slabs = num_slabs or os.cpu_count()
+        self.workers = workers or self.num_slabs
+        self.pool = None
+        self.block = None
+        self.capacity = 0
+        self.views = None
+
+        # Per-step diagnostics
+        self.owned = np.zeros(self.num_slabs, dtype=int)
+        self.halo = np.zeros(self.num_slabs, dtype=int)
+        self.migrations = 0
+
+    def start(self):
+        """
+        Start the worker processes and wait until every worker is ready.
+        Called by the first step if not called beforehand.
+        """
+        if self.pool is not None:
+            return
+        # Spawned rather than forked: forking after Numba's thread pool has started is unsafe
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        for future in [self.pool.submit(_warm_up_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def reserve(self, capacity):
+        """
+        Make sure the shared memory block holds at least `capacity` agents.
+        """
+        if capacity <= self.capacity:
+            return
+        self._release_block()
+        self.capacity = max(capacity, 2 * self.capacity)
+        self.block = shared_memory.SharedMemory(create=True, size=2 * self.capacity * VALUES_PER_AGENT * 8)
+        self.views = shared_state_views(self.block.buf, self.capacity)
+
+    def step(self, swarm, dt=0.1):
+        """
+        Advance the whole swarm by one step across the worker processes.
+
+        :param swarm: SwarmState to advance in place.
+        :param dt: Movement step applied to the velocity.
+        """
+        n = swarm.count
+        if n == 0:
+            return
+        self.start()
+        self.reserve(n)
+
+        (positions, directions, speeds), (next_positions, next_directions, next_speeds) = self.views
+        live_positions, live_directions, live_speeds = swarm.live()
+        positions[:n] = live_positions
+        directions[:n] = live_directions
+        speeds[:n] = live_speeds
+
+        axis, edges = slab_edges(simulation_config, self.num_slabs)
+        radius = Boids.interaction_radius()
+        config = dict(simulation_config)
+
+        futures = [
+            self.pool.submit(step_slab, self.block.name, self.capacity, n, slab, axis, edges, radius, config, dt)
+            for slab in range(self.num_slabs)
+        ]
+        for slab, future in enumerate(futures):
+            self.owned[slab], self.halo[slab] = future.result()
+
+        live_positions[:] = next_positions[:n]
+        live_directions[:] = next_directions[:n]
+        live_speeds[:] = next_speeds[:n]
+        self.migrations = int(np.count_nonzero(
+            slab_owners(positions[:n], axis, edges) != slab_owners(live_positions, axis, edges)
+        ))
+
+    def _release_block(self):
+        """
+        Free the shared memory block.
+        """
+        if self.block is not None:
+            self.views = None
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self._release_block()
+        self.capacity = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
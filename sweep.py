@@ -0,0 +1,240 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: sweep.py
+Description: Runs parameter sweeps over simulation_config as independent headless runs in parallel.
+
+Usage:
+    python sweep.py --agents 300 --steps 500 --grid cohesion_weight=0.5,1,2 --grid separation_weight=1,2 --out sweep.csv
+    python sweep.py --agents 300 --steps 500 --random alignment_weight=0:4 --random cohesion_radius=1:6 --samples 1000
+"""
+
+import argparse
+import ast
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+
+import numpy as np
+
+from agent import Agent
+from config import simulation_config, default_simulation_config
+from headless import run_headless, apply_overrides
+
+METRIC_COLUMNS = ["polarization", "cohesion", "nearest_neighbour", "steps_per_sec"]
+
+
+# === SAMPLING ===
+
+def grid_points(space):
+    """
+    Build every combination of the listed values.
+
+    :param space: Dictionary mapping config keys to lists of values.
+    :return: List of override dictionaries.
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_points(space, samples, seed=None):
+    """
+    Draw random points from the given ranges.
+
+    :param space: Dictionary mapping config keys to (low, high) ranges or lists of choices.
+    :param samples: Number of points to draw.
+    :param seed: Optional seed for the sampler.
+    :return: List of override dictionaries.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for key, spec in space.items():
+        if isinstance(spec, tuple):
+            columns[key] = rng.uniform(spec[0], spec[1], samples).tolist()
+        else:
+            columns[key] = [spec[i] for i in rng.integers(0, len(spec), samples)]
+    return [{key: columns[key][i] for key in space} for i in range(samples)]
+
+
+# === METRICS ===
+
+def swarm_metrics(positions, directions, block_size=1024):
+    """
+    Summary metrics describing the state of a swarm.
+
+    :param positions: A numpy array (N, 3) of agent positions.
+    :param directions: A numpy array (N, 3) of agent directions.
+    :return: Dictionary with polarization (0-1 heading agreement), cohesion
+             (mean distance to the swarm centroid) and nearest_neighbour
+             (mean distance to each agent's closest neighbour).
+    """
+    n = positions.shape[0]
+    if n == 0:
+        return {"polarization": 0.0, "cohesion": 0.0, "nearest_neighbour": 0.0}
+
+    units = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    polarization = float(np.linalg.norm(units.mean(axis=0)))
+    cohesion = float(np.linalg.norm(positions - positions.mean(axis=0), axis=1).mean())
+
+    # Blocked search bounds memory for large swarms
+    nearest = np.full(n, np.inf)
+    for start in range(0, n, block_size):
+        block = positions[start:start + block_size]
+        distances = np.linalg.norm(positions[np.newaxis, :, :] - block[:, np.newaxis, :], axis=2)
+        distances[np.arange(block.shape[0]), np.arange(start, start + block.shape[0])] = np.inf
+        nearest[start:start + block.shape[0]] = distances.min(axis=1)
+    nearest_neighbour = float(nearest[np.isfinite(nearest)].mean()) if n > 1 else 0.0
+
+    return {"polarization": polarization, "cohesion": cohesion, "nearest_neighbour": nearest_neighbour}
+
+
+# === WORKERS ===
+
+def _warm_up_worker():
+    """
+    Run a tiny simulation so one-off costs (imports, JIT compilation) are paid
+    before any timed run in this worker.
+    """
+    run_headless(2, 1, progress=False)
+
+
+def run_point(base_config, overrides, num_agents, steps, seed):
+    """
+    Run one sweep point, normally in a worker process.
+
+    The simulation reads the module-level simulation_config, so the point
+    runs on it after replacing its contents with `base_config` and the
+    point's overrides. The caller's configuration and the speed limits
+    cached on the Agent class are restored afterwards, so no state leaks
+    between runs, even when called in-process.
+
+    :return: Dictionary of overrides plus metrics.
+    """
+    saved = deepcopy(simulation_config)
+    try:
+        simulation_config.clear()
+        simulation_config.update(deepcopy(base_config))
+
+        summary = run_headless(num_agents, steps, seed=seed, overrides=overrides, progress=False)
+        positions, directions, _ = Agent.state.live()
+
+        result = dict(overrides)
+        result.update(swarm_metrics(positions, directions))
+        result["steps_per_sec"] = summary["steps_per_sec"]
+        return result
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+        apply_overrides({})
+
+
+def run_sweep(points, num_agents, steps, workers=None, seed=0, base_config=None, out=None):
+    """
+    Run every sweep point as an independent headless simulation across a process pool.
+
+    :param points: List of override dictionaries.
+    :param num_agents: Agents per run.
+    :param steps: Steps per run.
+    :param workers: Number of worker processes (defaults to all cores).
+    :param seed: Base seed; point i uses seed + i.
+    :param base_config: Configuration each run starts from (defaults to the defaults).
+    :param out: Optional .csv or .npz path for the results.
+    :return: Dictionary of result columns (one numpy array per column).
+    """
+    base_config = deepcopy(base_config or default_simulation_config)
+    workers = workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up_worker) as pool:
+        futures = [
+            pool.submit(run_point, base_config, point, num_agents, steps, seed + i)
+            for i, point in enumerate(points)
+        ]
+        results = []
+        for i, future in enumerate(futures):
+            results.append(future.result())
+            print(f"[Sweep] Finished {i + 1}/{len(points)}")
+
+    keys = list(dict.fromkeys(key for point in points for key in point))
+    columns = {key: np.array([r.get(key) for r in results]) for key in keys + METRIC_COLUMNS}
+
+    if out:
+        save_results(columns, out)
+    return columns
+
+
+def save_results(columns, filepath):
+    """
+    Save sweep results as a columnar .npz (one array per column) or a .csv table.
+
+    :param columns: Dictionary of result columns.
+    :param filepath: Destination path; the extension picks the format.
+    """
+    if filepath.endswith(".csv"):
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            writer.writerows(zip(*columns.values()))
+    else:
+        np.savez(filepath, **columns)
+    print(f"[Sweep] Results saved to {filepath}")
+
+
+# === COMMAND LINE ===
+
+def _parse_space(specs, ranges):
+    """
+    Parse "key=a,b,c" grid specs or "key=low:high" random specs.
+    """
+    space = {}
+    for spec in specs or []:
+        key, _, values = spec.partition("=")
+        if key not in simulation_config:
+            raise ValueError(f"Unknown config key: {key}")
+        if ranges and ":" in values:
+            low, high = values.split(":")
+            space[key] = (float(low), float(high))
+        else:
+            space[key] = [parse_value(v) for v in values.split(",")]
+    return space
+
+
+def parse_value(value):
+    """
+    Read a value as a Python literal, keeping it as a string otherwise.
+    """
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def main(argv=None):
+    """
+    Command-line entry point for parameter sweeps.
+    """
+    parser = argparse.ArgumentParser(description="Run a parallel parameter sweep over simulation_config.")
+    parser.add_argument("--agents", type=int, default=simulation_config["num_agents"], help="Agents per run.")
+    parser.add_argument("--steps", type=int, default=500, help="Steps per run.")
+    parser.add_argument("--grid", action="append", metavar="KEY=V1,V2,...", help="Grid values for a key (repeatable).")
+    parser.add_argument("--random", action="append", metavar="KEY=LOW:HIGH", help="Random range for a key (repeatable).")
+    parser.add_argument("--samples", type=int, default=100, help="Number of random samples.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for sampling and runs.")
+    parser.add_argument("--out", default="sweep_results.csv", help="Results file (.csv or .npz).")
+    args = parser.parse_args(argv)
+
+    if args.grid:
+        points = grid_points(_parse_space(args.grid, ranges=False))
+    elif args.random:
+        points = random_points(_parse_space(args.random, ranges=True), args.samples, seed=args.seed)
+    else:
+        parser.error("Provide --grid or --random parameters to sweep.")
+
+    print(f"[Sweep] Running {len(points)} points with {args.workers or os.cpu_count()} workers")
+    run_sweep(points, args.agents, args.steps, workers=args.workers, seed=args.seed, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
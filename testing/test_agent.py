@@ -0,0 +1,71 @@
+import numpy as np
+
+from agent import Agent, spawn_agents, resize_swarm
+from config import simulation_config, seed_rng, get_rng
+
+
+def test_resize_swarm_grows_and_shrinks_in_place():
+    """
+    Resizing should keep existing agents untouched, append new agents to the
+    shared store and drop removed agents from the end.
+    """
+    # Arrange
+    seed_rng(0)
+    simulation_config["num_agents"] = 10
+    spawn_agents()
+    first = list(Agent.all_agents)
+    positions = Agent.state.positions[:10].copy()
+
+    # Act
+    resize_swarm(25)
+    grown = len(Agent.all_agents), Agent.state.count
+    kept = Agent.all_agents[:10] == first and np.array_equal(Agent.state.positions[:10], positions)
+    resize_swarm(4)
+
+    # Assert
+    assert grown == (25, 25)
+    assert kept, "Growing should not disturb existing agents"
+    assert len(Agent.all_agents) == Agent.state.count == 4
+    assert Agent.all_agents == first[:4]
+    assert [agent.index for agent in Agent.all_agents] == [0, 1, 2, 3]
+
+
+def test_spawn_agents_is_reproducible():
+    """
+    Spawning through resize_swarm should draw the same swarm for the same seed.
+    """
+    # Arrange
+    simulation_config["num_agents"] = 15
+
+    # Act
+    seed_rng(42)
+    spawn_agents()
+    first = Agent.state.positions[:15].copy(), Agent.state.speeds[:15].copy()
+    get_rng("decoration").random(100)  # Draws from other streams must not matter
+    seed_rng(42)
+    get_rng("physics").random(100)
+    spawn_agents()
+
+    # Assert
+    assert np.array_equal(Agent.state.positions[:15], first[0])
+    assert np.array_equal(Agent.state.speeds[:15], first[1])
+
+
+def test_spawned_state_is_within_bounds_and_normalized():
+    """
+    Vectorized spawning should place every agent inside the world with a unit
+    direction and a speed within the initial bounds.
+    """
+    # Arrange
+    simulation_config["num_agents"] = 500
+
+    # Act
+    spawn_agents(np.random.default_rng(5))
+    positions, directions, speeds = Agent.state.live()
+
+    # Assert
+    assert len(Agent.all_agents) == 500
+    assert np.all(np.abs(positions) <= 10)
+    assert np.allclose(np.linalg.norm(directions, axis=1), 1.0)
+    low, high = simulation_config["init_speed_bounds"]
+    assert np.all((speeds >= low) & (speeds <= high))
@@ -0,0 +1,72 @@
+import numpy as np
+from panda3d.core import Quat, Vec3
+
+from agent_renderer import pack_instances, orientation_bases, orientation_quaternions, TEXELS_PER_AGENT
+
+
+def test_pack_instances_writes_live_rows_and_keeps_colours():
+    """
+    Packing should copy positions and directions into the first two texels
+    of each live agent's row without touching colours or spare rows.
+    """
+    # Arrange
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-10, 10, (5, 3))
+    directions = rng.uniform(-1, 1, (5, 3))
+    instances = np.zeros((8, TEXELS_PER_AGENT, 4), dtype=np.float32)
+    instances[:, 2] = [0.2, 0.4, 0.6, 1.0]
+
+    # Act
+    packed = pack_instances(positions, directions, instances)
+
+    # Assert
+    assert packed.shape == (5, TEXELS_PER_AGENT, 4)
+    assert np.allclose(instances[:5, 0, :3], positions)
+    assert np.allclose(instances[:5, 1, :3], directions)
+    assert np.allclose(instances[:, 2], [0.2, 0.4, 0.6, 1.0]), "Colours should be left untouched"
+    assert not instances[5:, :2].any(), "Rows past the live agents should be left untouched"
+
+
+def test_orientation_bases_face_direction_and_stay_upright():
+    """
+    Each basis should be a proper rotation facing the agent's direction, with
+    the model's back (local +x) pointing up for a level heading.
+    """
+    # Arrange
+    rng = np.random.default_rng(1)
+    directions = rng.normal(size=(200, 3))
+    directions[0] = [2.0, 0.0, 0.0]
+    directions[1] = [0.0, -1.0, 0.0]
+
+    # Act
+    bases = orientation_bases(directions)
+
+    # Assert
+    units = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    assert np.allclose(np.einsum('nij,nkj->nik', bases, bases), np.eye(3))
+    assert np.allclose(np.linalg.det(bases), 1.0)
+    assert np.allclose(bases[:, 2], units), "Local +z should face the direction"
+    assert np.allclose(bases[0, 0], [0, 1, 0]), "A level heading should keep the back up"
+    assert np.allclose(bases[1, 0], [1, 0, 0]), "A vertical heading should fall back to a fixed back axis"
+
+
+def test_orientation_quaternions_match_bases():
+    """
+    Batched quaternions should rotate each local axis onto its basis row,
+    as Panda3D applies them to entities.
+    """
+    # Arrange
+    rng = np.random.default_rng(2)
+    directions = rng.normal(size=(100, 3))
+
+    # Act
+    quaternions = orientation_quaternions(directions)
+    bases = orientation_bases(directions)
+
+    # Assert
+    assert np.allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+    for quaternion, basis in zip(quaternions, bases):
+        q = Quat(*quaternion)
+        for axis in range(3):
+            local = Vec3(*np.eye(3)[axis])
+            assert np.allclose(q.xform(local), basis[axis], atol=1e-5)
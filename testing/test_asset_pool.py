@@ -0,0 +1,22 @@
+from asset_pool import acquire_entity, release_entities
+
+
+def test_released_entities_are_recycled():
+    """
+    Releasing entities should disable them and hand the same objects back,
+    re-enabled and repositioned, on the next acquire.
+    """
+    # Arrange
+    entities = [acquire_entity('cube', position=(1, 2, 3)) for _ in range(3)]
+    originals = list(entities)
+
+    # Act
+    release_entities(entities)
+    disabled = all(not entity.enabled for entity in originals)
+    recycled = [acquire_entity('cube', position=(0, 1, 0)) for _ in range(3)]
+
+    # Assert
+    assert entities == [], "Releasing should empty the caller's list"
+    assert disabled
+    assert sorted(map(id, recycled)) == sorted(map(id, originals))
+    assert all(entity.enabled and tuple(entity.position) == (0, 1, 0) for entity in recycled)
@@ -0,0 +1,69 @@
+from agent import Agent
+from benchmark import log_agent_counts, benchmark_cases, run_case, compare_to_baseline
+from config import simulation_config, default_simulation_config
+from headless import apply_overrides
+
+
+def test_cases_sweep_log_scale_and_respect_backend_limits():
+    """
+    Agent counts should be log-spaced and brute force should skip very large swarms.
+    """
+    # Arrange
+    counts = log_agent_counts(10, 100_000)
+
+    # Act
+    cases = benchmark_cases(counts, backends=("grid", "brute"), obstacles=(False, True))
+
+    # Assert
+    assert counts == [10, 100, 1000, 10_000, 100_000]
+    assert sum(c["neighbour_backend"] == "grid" for c in cases) == 10
+    assert max(c["num_agents"] for c in cases if c["neighbour_backend"] == "brute") == 10_000
+
+
+def test_run_case_reports_rates_and_baseline_flags_regressions():
+    """
+    A case should report consistent timing figures, and a case slower than
+    the baseline by more than the threshold should be flagged.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    case = {"num_agents": 50, "neighbour_backend": "grid", "obstacle_enabled": True, "world_scale": 2}
+
+    # Act
+    try:
+        result = run_case(default_simulation_config, case, min_steps=3, max_steps=3, min_seconds=0.0)
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+    faster = dict(result, steps_per_sec=result["steps_per_sec"] * 1.5)
+    slower = dict(result, steps_per_sec=result["steps_per_sec"] * 1.05)
+
+    # Assert
+    assert result["steps"] == 3
+    assert abs(result["ns_per_agent_step"] - 1e9 / (result["steps_per_sec"] * 50)) < 1e-6 * result["ns_per_agent_step"]
+    assert result["peak_rss_mb"] > 0
+    assert len(compare_to_baseline([result], [faster], threshold=0.10)) == 1
+    assert compare_to_baseline([result], [slower], threshold=0.10) == []
+
+
+def test_run_case_uses_base_config_speed_limits():
+    """
+    A case should run with the base configuration's speed limits rather
+    than those cached on the Agent class at import.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    base_config = dict(default_simulation_config, min_speed=1.5)
+    case = {"num_agents": 30, "neighbour_backend": "grid", "obstacle_enabled": False, "world_scale": 1}
+
+    # Act
+    try:
+        run_case(base_config, case, min_steps=3, max_steps=3, min_seconds=0.0)
+        speeds = Agent.state.live()[2].copy()
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+        apply_overrides({})
+
+    # Assert
+    assert speeds.min() >= 1.5
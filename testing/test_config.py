@@ -0,0 +1,78 @@
+from config import ConfigChangeSet
+
+
+class FakeSlider:
+    def __init__(self, value):
+        self.value = value
+
+
+def test_change_set_coalesces_and_diffs_edits():
+    """
+    Edits within a frame should be grouped by subsystem, and a key that ends
+    the frame at its original value should not count as changed.
+    """
+    # Arrange
+    config = {
+        "x_max": 10, "x_min": -10, "cohesion_weight": 1.0,
+        "obstacle_corner_min": [-10, 0, -10], "camera_orbit_speed": 1,
+    }
+    changes = ConfigChangeSet(config)
+
+    # Act
+    for value in (4, 6, 8):
+        changes.update("x_max", FakeSlider(value))
+    changes.update("cohesion_weight", FakeSlider(3.0))
+    changes.update("cohesion_weight", FakeSlider(1.0))
+    changes.update("obstacle_corner_min[1]", FakeSlider(2))
+    changes.set("camera_orbit_speed", 2)
+    first = changes.flush()
+    second = changes.flush()
+
+    # Assert
+    assert first == {"boundaries": ["x_max"], "obstacle": ["obstacle_corner_min"]}
+    assert config["x_min"] == -8
+    assert second == {}, "A flush should start a new change set"
+
+
+def test_change_set_defers_writes_until_flush():
+    """
+    Queued edits should leave the config untouched until the flush, while
+    get() already reports the value a key will have.
+    """
+    # Arrange
+    config = {"num_agents": 50, "obstacle_enabled": False}
+    changes = ConfigChangeSet(config)
+    slider = FakeSlider(80)
+
+    # Act
+    changes.update("num_agents", slider)
+    changes.set("obstacle_enabled", True)
+    slider.value = 90
+    before_flush = dict(config)
+    pending = changes.get("num_agents")
+    flushed = changes.flush()
+
+    # Assert
+    assert before_flush == {"num_agents": 50, "obstacle_enabled": False}
+    assert pending == 90
+    assert config == {"num_agents": 90, "obstacle_enabled": True}
+    assert flushed == {"agent_count": ["num_agents"], "obstacle": ["obstacle_enabled"]}
+
+
+def test_discard_drops_queued_edits():
+    """
+    Discarded edits should never reach the config or count as changes.
+    """
+    # Arrange
+    config = {"obstacle_enabled": False, "agent_colour_mode": "white"}
+    changes = ConfigChangeSet(config)
+    changes.set("obstacle_enabled", True)
+    changes.set("agent_colour_mode", "red")
+
+    # Act
+    changes.discard()
+    flushed = changes.flush()
+
+    # Assert
+    assert config == {"obstacle_enabled": False, "agent_colour_mode": "white"}
+    assert flushed == {}
@@ -0,0 +1,60 @@
+import numpy as np
+
+from agent import Agent
+from config import simulation_config
+from headless import run_headless, parse_overrides, apply_overrides
+from record_playback import SimulationPlayback
+
+
+def test_headless_run_streams_playable_recording(tmp_path):
+    """
+    A headless run should write a recording with one frame per sampled step.
+    """
+    # Arrange
+    out = tmp_path / "run"
+    saved = dict(simulation_config)
+
+    # Act
+    try:
+        summary = run_headless(25, 20, out=str(out), record_every=5, seed=3, progress=False)
+    finally:
+        simulation_config.update(saved)
+
+    # Assert
+    playback = SimulationPlayback()
+    playback.load(str(out))
+    playback.start()
+    frame = playback.update()
+    assert summary["steps"] == 20
+    assert playback.total_frames == 4
+    assert frame["positions"].shape == (25, 3)
+    assert frame["num_agents"] == 25
+
+
+def test_parse_overrides_reads_literals():
+    """
+    Overrides should be parsed as Python literals where possible.
+    """
+    overrides = parse_overrides(["cohesion_weight=2.5", "neighbour_backend=kdtree", "obstacle_enabled=True"])
+    assert overrides == {"cohesion_weight": 2.5, "neighbour_backend": "kdtree", "obstacle_enabled": True}
+
+
+def test_overrides_refresh_cached_speed_limits():
+    """
+    Speed limit overrides should reach the limits cached on the Agent class,
+    which the batched step clamps with.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+
+    # Act
+    try:
+        apply_overrides({"min_speed": 0.75, "max_speed": 3.0})
+        min_speed, max_speed = Agent.min_speed, Agent.max_speed
+    finally:
+        simulation_config.update(saved)
+        apply_overrides({})
+
+    # Assert
+    assert (min_speed, max_speed) == (0.75, 3.0)
+    assert Agent.min_speed == saved["min_speed"]
@@ -0,0 +1,43 @@
+from agent import Agent
+from config import simulation_config
+from microbench import benchmarks, run_benchmarks, synthetic_swarm, append_history, compare_runs
+
+
+def test_synthetic_swarm_matches_density_and_restores_config():
+    """
+    The synthetic swarm should fill a cube sized for its density, and the
+    configuration and swarm should be restored afterwards.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+
+    # Act
+    with synthetic_swarm(1000, 0.125, seed=1) as agents:
+        count = len(agents)
+        extent = Agent.state.live()[0].max(axis=0) - Agent.state.live()[0].min(axis=0)
+
+    # Assert
+    assert count == 1000
+    assert all(19.0 < e <= 20.0 for e in extent), "1000 agents at density 0.125 fill a cube of side 20"
+    assert simulation_config == saved
+    assert Agent.state.count == 0
+
+
+def test_every_benchmark_runs_and_history_compares(tmp_path):
+    """
+    Each benchmark should produce a timing, and a saved run should be comparable with the next.
+    """
+    # Arrange
+    history = tmp_path / "history.json"
+
+    # Act
+    first = run_benchmarks(densities=["dense"], num_agents=150, sample_size=4, rounds=1, min_round_time=0.0)
+    append_history(str(history), {"meta": {}, "results": first})
+    second = {name: {"dense": dict(t["dense"], median_ns=2 * t["dense"]["median_ns"])} for name, t in first.items()}
+    changes = compare_runs(first, second)
+
+    # Assert
+    assert set(first) == set(benchmarks)
+    assert all(t["dense"]["median_ns"] > 0 for t in first.values())
+    assert len(changes) == len(benchmarks)
+    assert all(abs(c - 1.0) < 1e-9 for c in changes.values())
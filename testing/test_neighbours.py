@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from movement_model import SpatialGrid, NeighbourList, get_neighbour_backend
+
+
+def brute_force_pairs(positions, radius):
+    """
+    Reference neighbour pairs from a full distance matrix.
+    """
+    deltas = positions[np.newaxis, :, :] - positions[:, np.newaxis, :]
+    distances = np.linalg.norm(deltas, axis=2)
+    rows, cols = np.nonzero((distances > 0) & (distances <= radius))
+    return set(zip(rows.tolist(), cols.tolist()))
+
+
+def test_grid_matches_brute_force():
+    """
+    The grid should return exactly the pairs found by brute force,
+    including agents that have drifted outside the world bounds.
+    """
+    # Arrange
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(-12, 12, (500, 3))
+    boundaries = np.array([-10, 10, -10, 10, -10, 10], dtype=float)
+    grid = SpatialGrid(3.0, boundaries)
+
+    # Act
+    grid.build(positions)
+    rows, cols, deltas, distances = grid.query_pairs(positions, 3.0)
+
+    # Assert
+    assert set(zip(rows.tolist(), cols.tolist())) == brute_force_pairs(positions, 3.0)
+    assert np.all(np.diff(rows) >= 0), "Pairs should be grouped by agent"
+    assert np.allclose(deltas, positions[cols] - positions[rows])
+    assert np.allclose(distances, np.linalg.norm(deltas, axis=1))
+
+
+def test_grid_excludes_self_and_coincident_agents():
+    """
+    Agents at zero distance are not neighbours, matching the Boids rules.
+    """
+    # Arrange
+    positions = np.array([[0, 0, 0], [0, 0, 0], [0.5, 0, 0]], dtype=float)
+    grid = SpatialGrid(1.0, np.array([-10, 10, -10, 10, -10, 10], dtype=float))
+
+    # Act
+    grid.build(positions)
+    rows, cols, _, _ = grid.query_pairs(positions, 1.0)
+
+    # Assert
+    assert set(zip(rows.tolist(), cols.tolist())) == {(0, 2), (1, 2), (2, 0), (2, 1)}
+
+
+@pytest.mark.parametrize("backend", ["brute", "grid", "kdtree"])
+def test_backends_return_same_neighbour_list(backend):
+    """
+    Every backend should produce the same CSR neighbour list.
+    """
+    # Arrange
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(-10, 10, (400, 3))
+
+    # Act
+    neighbours = get_neighbour_backend(backend).find(positions, 2.5)
+
+    # Assert
+    assert isinstance(neighbours, NeighbourList)
+    assert neighbours.indptr.size == 401
+    pairs = set(zip(neighbours.rows().tolist(), neighbours.indices.tolist()))
+    assert pairs == brute_force_pairs(positions, 2.5)
+    assert np.allclose(neighbours.deltas, positions[neighbours.indices] - positions[neighbours.rows()])
+
+
+def test_unknown_backend_raises():
+    """
+    Unknown backend names should be rejected.
+    """
+    with pytest.raises(ValueError):
+        get_neighbour_backend("octree")
+
+
+def test_grid_rebuild_clears_previous_cells():
+    """
+    Rebuilding a grid with new positions should leave no agents in the cells
+    occupied by the previous build.
+    """
+    # Arrange
+    rng = np.random.default_rng(3)
+    grid = SpatialGrid(2.0, np.array([-10, 10, -10, 10, -10, 10], dtype=float))
+    grid.build(rng.uniform(-10, 10, (300, 3)))
+    positions = rng.uniform(-10, 0, (200, 3))
+
+    # Act
+    grid.build(positions)
+    rows, cols, _, _ = grid.query_pairs(positions, 2.0)
+
+    # Assert
+    assert np.sum(grid.cell_end - grid.cell_start) == 200
+    assert set(zip(rows.tolist(), cols.tolist())) == brute_force_pairs(positions, 2.0)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from obstacle_bvh import ObstacleBVH
+
+
+def test_candidates_match_brute_force_search():
+    """
+    The tree should report exactly the (agent, box) pairs whose expanded box
+    holds the agent, as a test against every box would.
+    """
+    # Arrange
+    rng = np.random.default_rng(4)
+    mins = rng.uniform(-20, 20, (300, 3))
+    boxes = np.stack([mins, mins + rng.uniform(0.1, 3.0, (300, 3))], axis=1)
+    positions = rng.uniform(-22, 22, (500, 3))
+    margin = 1.5
+
+    # Act
+    agents, box_ids = ObstacleBVH(boxes, leaf_size=3).candidates(positions, margin)
+    inside = np.all((positions[:, None] >= boxes[None, :, 0] - margin) &
+                    (positions[:, None] <= boxes[None, :, 1] + margin), axis=2)
+
+    # Assert
+    assert set(zip(agents.tolist(), box_ids.tolist())) == set(zip(*map(np.ndarray.tolist, np.nonzero(inside))))
+    assert len(agents) == np.count_nonzero(inside), "Each pair should be reported once"
+
+
+def test_nearest_surface_prefers_closest_box_and_handles_no_boxes():
+    """
+    An agent between two boxes should get the nearer one, and an empty tree should find nothing.
+    """
+    # Arrange
+    boxes = np.array([[[0, 0, 0], [1, 1, 1]], [[3, 0, 0], [4, 1, 1]]], dtype=float)
+    positions = np.array([[2.2, 0.5, 0.5], [10.0, 10.0, 10.0]])
+
+    # Act
+    agents, box_ids, offsets, distances = ObstacleBVH(boxes).nearest_surface(positions, 2.0)
+    empty = ObstacleBVH(np.zeros((0, 2, 3))).nearest_surface(positions, 2.0)
+
+    # Assert
+    assert agents.tolist() == [0] and box_ids.tolist() == [1]
+    assert np.allclose(offsets[0], [-0.8, 0, 0]) and np.isclose(distances[0], 0.8)
+    assert all(len(a) == 0 for a in empty)
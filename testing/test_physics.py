@@ -0,0 +1,97 @@
+import numpy as np
+
+from config import simulation_config
+from physics import WallPhysics, ObstaclePhysics
+
+# Captured at import, before the deprecated test_boids module patches it at run time
+_calc_wall_repulsion = WallPhysics.__dict__["calc_wall_repulsion"].__func__
+
+
+def test_swarm_forces_match_per_agent_forces():
+    """
+    The whole-swarm wall and obstacle forces should match the per-agent
+    functions, including agents outside the walls and inside the obstacle.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    simulation_config.update({"obstacle_enabled": True, "obstacle_corner_min": [3, 2, 3], "obstacle_corner_max": [-3, -2, -3]})
+    threshold, max_force = simulation_config["boundary_threshold"], simulation_config["boundary_max_force"]
+    positions = np.random.default_rng(5).uniform(-14, 14, (500, 3))
+
+    class Row:
+        def __init__(self, position):
+            self.position = position
+
+    # Act
+    try:
+        walls = WallPhysics.calc_wall_repulsion_all(positions)
+        obstacle = ObstaclePhysics.calculate_obstacle_repulsion_all(positions, threshold, max_force)
+        wall_rows = np.array([_calc_wall_repulsion(Row(p)) for p in positions])
+        obstacle_rows = np.array([ObstaclePhysics.calculate_obstacle_repulsion(p, threshold, max_force) for p in positions])
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+
+    # Assert
+    assert np.allclose(walls, wall_rows)
+    assert np.allclose(obstacle, obstacle_rows)
+    assert np.any(obstacle != 0), "Some agents should be inside the obstacle's threshold zone"
+
+
+def test_obstacle_data_follows_in_place_config_edits():
+    """
+    Cached obstacle boxes should be reused while the settings are unchanged
+    and rebuilt after a slider-style in-place edit of a corner.
+    """
+    # Arrange
+    config = {
+        "obstacle_enabled": True,
+        "obstacle_corner_min": [1.0, 1.0, 1.0],
+        "obstacle_corner_max": [-1.0, -1.0, -1.0],
+        "obstacles": [[[4, 4, 4], [6, 6, 6]]],
+    }
+
+    # Act
+    first = ObstaclePhysics.obstacle_data(config)
+    again = ObstaclePhysics.obstacle_data(config)
+    config["obstacle_corner_min"][0] = 5.0
+    edited_boxes, edited_centers, edited_tree = ObstaclePhysics.obstacle_data(config)
+    config["obstacle_enabled"] = False
+    extra_only = ObstaclePhysics.obstacle_data(config)[0]
+
+    # Assert
+    assert again is first
+    assert first[0][0].tolist() == [[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]]
+    assert edited_boxes[0, 1].tolist() == [5.0, 1.0, 1.0]
+    assert edited_centers[0].tolist() == [2.0, 0.0, 0.0]
+    assert edited_tree.num_boxes == 2
+    assert extra_only.tolist() == [[[4, 4, 4], [6, 6, 6]]]
+
+
+def test_many_obstacles_use_nearest_surface():
+    """
+    With many obstacles, the BVH-based swarm forces should match the
+    per-agent reference that tests every obstacle.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    rng = np.random.default_rng(11)
+    corners = rng.uniform(-10, 10, (150, 3))
+    boxes = [[c.tolist(), (c + rng.uniform(0.2, 2.0, 3)).tolist()] for c in corners]
+    simulation_config.update({"obstacle_enabled": False, "obstacles": boxes})
+    threshold, max_force = simulation_config["boundary_threshold"], simulation_config["boundary_max_force"]
+    positions = rng.uniform(-11, 11, (400, 3))
+
+    # Act
+    try:
+        forces = ObstaclePhysics.calculate_obstacle_repulsion_all(positions, threshold, max_force)
+        reference = np.array([ObstaclePhysics.calculate_obstacle_repulsion(p, threshold, max_force) for p in positions])
+        tree = ObstaclePhysics.obstacle_data()[2]
+    finally:
+        simulation_config.clear()
+        simulation_config.update(saved)
+
+    # Assert
+    assert np.allclose(forces, reference)
+    assert np.count_nonzero(np.any(forces != 0, axis=1)) > 100
+    assert tree.depth <= 7, "150 boxes in leaves of 4 need about log2(150 / 4) levels"
@@ -0,0 +1,90 @@
+import csv
+import threading
+import time
+
+import numpy as np
+
+from profiler import FrameProfiler
+
+
+def test_ring_buffer_keeps_most_recent_frames_in_order():
+    """
+    Once full, the ring buffer should hold only the latest frames, oldest first,
+    with every span's time accumulated into its own phase column.
+    """
+    # Arrange
+    profiler = FrameProfiler(phases=("a", "b"), capacity=4)
+    profiler.end_frame()  # Opens the first frame
+
+    # Act
+    for frame in range(6):
+        profiler.current[0] = frame
+        with profiler.span("b"):
+            pass
+        profiler.end_frame()
+    recent = profiler.recent()
+
+    # Assert
+    assert profiler.frame_count == 6
+    assert recent[:, 0].tolist() == [2, 3, 4, 5]
+    assert np.all(recent[:, 1] > 0), "Span time should be recorded in its phase column"
+    assert np.all(recent[:, 2] >= recent[:, 1]), "Whole-frame time should cover the spans"
+
+
+def test_percentiles_and_csv_stream(tmp_path):
+    """
+    Percentiles should be reported per phase in milliseconds, and every
+    frame should be streamed to the CSV file with its extra columns.
+    """
+    # Arrange
+    profiler = FrameProfiler(phases=("a",), capacity=100)
+    path = tmp_path / "profile.csv"
+    profiler.start_writing(path, extra_columns=("num_agents",))
+    profiler.end_frame()
+
+    # Act
+    for frame in range(1, 101):
+        profiler.current[0] = frame * 1_000_000
+        profiler.end_frame(num_agents=frame)
+    percentiles = profiler.percentiles()
+    profiler.stop_writing()
+
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+
+    # Assert
+    assert np.allclose(percentiles["a"], np.percentile(np.arange(1, 101), [50, 95, 99]))
+    assert rows[0] == ["frame", "a_ms", "frame_ms", "num_agents"]
+    assert len(rows) == 101
+    assert rows[-1][1] == "100.0" and rows[-1][3] == "100"
+
+
+def test_worker_thread_spans_are_merged_when_collected():
+    """
+    Spans on another thread should not touch the current frame until their
+    times are collected on that thread and added on the profiler's thread.
+    """
+    # Arrange
+    profiler = FrameProfiler(phases=("a", "b"), capacity=4)
+    profiler.end_frame()
+    collected = []
+
+    def worker():
+        with profiler.span("b"):
+            time.sleep(0.002)
+        collected.append(profiler.collect())
+        collected.append(profiler.collect())
+
+    # Act
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    before_add = profiler.current.copy()
+    profiler.add(collected[0])
+    profiler.end_frame()
+
+    # Assert
+    assert before_add[1] == 0, "Worker spans should not write into the frame directly"
+    assert collected[0][1] >= 2_000_000
+    assert not np.any(collected[1]), "A collect should reset the thread's times"
+    assert profiler.recent()[-1, 1] == collected[0][1]
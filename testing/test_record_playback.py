@@ -0,0 +1,225 @@
+import numpy as np
+
+from record_playback import SimulationRecorder, SimulationPlayback, ChunkWriter, map_chunks
+
+# Default recorder position step is 1e-3, so replayed values sit within half of it
+QUANT_TOLERANCE = 5e-4 + 1e-9
+
+
+def make_recording(directory, rng):
+    """
+    Record two segments of 10 and 7 frames with a reset between them.
+    """
+    recorder = SimulationRecorder(chunk_size=4, ring_size=2)
+    recorder.start(filepath=str(directory))
+    frames = record_frames(recorder, rng, 10, 5)
+    recorder.mark_reset()
+    frames += record_frames(recorder, rng, 7, 8)
+    recorder.stop_and_save()
+    return frames
+
+
+def record_frames(recorder, rng, count, rows):
+    """
+    Record `count` random frames with `rows` agent rows and return them.
+    """
+    frames = []
+    for _ in range(count):
+        positions = rng.uniform(-10, 10, (rows, 3))
+        directions = rng.uniform(-1, 1, (rows, 3))
+        boundaries = np.array([-10, 10, -10, 10, -10, 10], dtype=np.float32)
+        recorder.record_frame(positions, directions, rows, boundaries, [0, 0, 0], [1, 1, 1], False)
+        frames.append((positions, directions))
+    return frames
+
+
+def test_recorder_streams_chunks_and_plays_back(tmp_path):
+    """
+    Frames recorded across several chunks, including a change in agent
+    count, should play back unchanged with reset flags preserved.
+    """
+    # Arrange
+    rng = np.random.default_rng(0)
+    recorder = SimulationRecorder(chunk_size=4, ring_size=2)
+    recorder.start(filepath=str(tmp_path / "rec"))
+
+    # Act
+    frames = record_frames(recorder, rng, 10, 5)
+    recorder.mark_reset()
+    frames += record_frames(recorder, rng, 7, 8)
+    recorder.stop_and_save()
+
+    playback = SimulationPlayback()
+    playback.load(str(tmp_path / "rec" / "index.json"))
+    playback.start()
+    played = [playback.update() for _ in range(len(frames))]
+
+    # Assert
+    assert len(recorder._buffers) <= 2, "Memory should stay bounded by the ring"
+    assert playback.total_frames == 17
+    for (positions, directions), frame in zip(frames, played):
+        assert np.allclose(frame['positions'], positions, atol=QUANT_TOLERANCE)
+        assert np.allclose(frame['directions'], directions, atol=QUANT_TOLERANCE)
+    assert [i for i, f in enumerate(played) if f['reset']] == [0, 10], "First frame and recorded reset rebuild the scene"
+    assert played[12]['num_agents'] == 8
+
+
+def test_playback_is_memory_mapped_and_seekable(tmp_path):
+    """
+    Chunked recordings should be memory-mapped and support seeking anywhere.
+    Seeks only rebuild the scene when they land on a recorded reset.
+    """
+    # Arrange
+    frames = make_recording(tmp_path / "rec", np.random.default_rng(1))
+    playback = SimulationPlayback()
+    playback.load(str(tmp_path / "rec"))
+    playback.start()
+
+    # Act
+    playback.seek(13)
+    first = playback.update()
+    following = playback.update()
+    playback.seek(3)
+    jump = playback.update()
+    playback.seek(10)
+    onto_reset = playback.update()
+
+    # Assert
+    assert isinstance(playback.chunks[0]['position_deltas'], np.memmap)
+    assert np.allclose(first['positions'], frames[13][0], atol=QUANT_TOLERANCE)
+    assert (first['reset'], first['seek']) == (True, False), "The first frame rebuilds the scene"
+    assert (following['reset'], following['seek']) == (False, False)
+    assert np.allclose(jump['positions'], frames[3][0], atol=QUANT_TOLERANCE)
+    assert (jump['reset'], jump['seek']) == (False, True), "A seek restores state without a rebuild"
+    assert (onto_reset['reset'], onto_reset['seek']) == (True, True)
+
+
+def test_reverse_playback_crosses_reset_boundary(tmp_path):
+    """
+    Playing backwards should return frames in reverse order and flag the
+    frame before a recorded reset.
+    """
+    # Arrange
+    frames = make_recording(tmp_path / "rec", np.random.default_rng(2))
+    playback = SimulationPlayback()
+    playback.load(str(tmp_path / "rec"))
+    playback.start()
+    playback.seek(12)
+    playback.set_speed(-1)
+
+    # Act
+    played = [playback.update() for _ in range(4)]
+
+    # Assert
+    for frame, expected in zip(played, [12, 11, 10, 9]):
+        assert np.allclose(frame['positions'], frames[expected][0], atol=QUANT_TOLERANCE)
+    assert [f['reset'] for f in played] == [True, False, False, True]
+
+
+def test_recorder_stores_only_live_agents_in_compact_chunks(tmp_path):
+    """
+    Rows past num_agents in a preallocated buffer should not be recorded, and
+    smooth motion should replay within the quantization step from a recording
+    much smaller than raw float64 frames.
+    """
+    # Arrange
+    rng = np.random.default_rng(3)
+    buffer = np.zeros((100, 3))
+    directions = np.tile([1.0, 0.0, 0.0], (100, 1))
+    buffer[:30] = rng.uniform(-10, 10, (30, 3))
+    velocities = rng.uniform(-0.2, 0.2, (30, 3))
+    recorder = SimulationRecorder(chunk_size=64)
+    recorder.start(filepath=str(tmp_path / "rec"))
+    boundaries = np.array([-10, 10, -10, 10, -10, 10], dtype=np.float32)
+
+    # Act
+    expected = []
+    for _ in range(200):
+        buffer[:30] += velocities
+        recorder.record_frame(buffer, directions, 30, boundaries, [0, 0, 0], [1, 1, 1], False)
+        expected.append(buffer[:30].copy())
+    recorder.stop_and_save()
+
+    playback = SimulationPlayback()
+    playback.load(str(tmp_path / "rec"))
+    playback.start()
+    played = [playback.update() for _ in range(200)]
+
+    # Assert
+    raw_size = 200 * 100 * 3 * 8 * 2
+    assert (tmp_path / "rec" / "data.bin").stat().st_size * 5 < raw_size
+    assert all(frame['positions'].shape == (30, 3) for frame in played)
+    for positions, frame in zip(expected, played):
+        assert np.abs(frame['positions'] - positions).max() <= QUANT_TOLERANCE
+
+
+def test_large_jump_starts_new_keyframe(tmp_path):
+    """
+    A position change too large for an int16 delta should start a new chunk
+    instead of corrupting the replay.
+    """
+    # Arrange
+    recorder = SimulationRecorder(chunk_size=16)
+    recorder.start(filepath=str(tmp_path / "rec"))
+    boundaries = np.zeros(6, dtype=np.float32)
+    frames = [np.zeros((2, 3)), np.full((2, 3), 50.0), np.full((2, 3), 50.1)]
+
+    # Act
+    for positions in frames:
+        recorder.record_frame(positions, np.ones((2, 3)) / np.sqrt(3), 2, boundaries, [0, 0, 0], [1, 1, 1], False)
+    recorder.stop_and_save()
+
+    playback = SimulationPlayback()
+    playback.load(str(tmp_path / "rec"))
+
+    # Assert
+    assert playback.chunk_starts == [0, 1]
+    for i, positions in enumerate(frames):
+        assert np.allclose(playback.frame_at(i)['positions'], positions, atol=QUANT_TOLERANCE)
+
+
+def test_unclosed_recording_is_readable_from_journal(tmp_path):
+    """
+    Chunks appended before close should be readable from the journal, and
+    close should fold them into the index.
+    """
+    # Arrange
+    writer = ChunkWriter(str(tmp_path / "rec"))
+    arrays = {'reset': np.zeros(4, dtype=bool), 'num_agents': np.arange(4)}
+
+    # Act
+    writer.append(0, 4, arrays)
+    writer.append(4, 3, arrays, segment=1)
+    index, chunks = map_chunks(str(tmp_path / "rec"))
+    writer.close()
+    closed_index, closed_chunks = map_chunks(str(tmp_path / "rec"))
+
+    # Assert
+    assert index['frames'] == 7
+    assert [c['num_agents'].tolist() for c in chunks] == [[0, 1, 2, 3], [0, 1, 2]]
+    assert closed_index == index
+    assert not (tmp_path / "rec" / "chunks.jsonl").exists()
+    assert len(closed_chunks) == 2
+
+
+def test_stale_journal_next_to_closed_index_loads_each_chunk_once(tmp_path):
+    """
+    A journal left behind by a close that stopped before removing it should
+    not duplicate the chunks the index already lists.
+    """
+    # Arrange
+    writer = ChunkWriter(str(tmp_path / "rec"))
+    arrays = {'reset': np.zeros(4, dtype=bool), 'num_agents': np.arange(4)}
+    writer.append(0, 4, arrays)
+    writer.append(4, 3, arrays, segment=1)
+    journal = (tmp_path / "rec" / "chunks.jsonl").read_text()
+    writer.close()
+    (tmp_path / "rec" / "chunks.jsonl").write_text(journal)
+
+    # Act
+    index, chunks = map_chunks(str(tmp_path / "rec"))
+
+    # Assert
+    assert index['frames'] == 7
+    assert [entry['start'] for entry in index['chunks']] == [0, 4]
+    assert len(chunks) == 2
@@ -0,0 +1,65 @@
+import numpy as np
+
+from agent import SwarmState
+from movement_model import Boids
+from simulation_worker import SimulationWorker
+
+
+def make_state(seed=3, count=50):
+    """
+    Build a random swarm state spread across the default world bounds.
+    """
+    rng = np.random.default_rng(seed)
+    state = SwarmState()
+    for _ in range(count):
+        state.add(rng.uniform(-10, 10, 3), rng.uniform(-1, 1, 3), 0.05)
+    return state
+
+
+def test_worker_matches_serial_stepping():
+    """
+    Batches run on the worker should produce the same state as stepping on
+    the calling thread, and publish it to the front buffer once complete.
+    """
+    # Arrange
+    serial, threaded = make_state(), make_state()
+    worker = SimulationWorker(threaded, Boids.step_all)
+    ticks_seen = []
+
+    # Act
+    for ticks in (3, 0, 2):
+        for _ in range(ticks):
+            Boids.step_all(serial)
+        worker.submit(ticks, before_tick=lambda: ticks_seen.append(1))
+    worker.wait()
+    front = worker.latest()
+    blended_start, _ = front.blend(0.0)
+
+    # Assert
+    assert len(ticks_seen) == 5
+    assert np.allclose(threaded.positions[:threaded.count], serial.positions[:serial.count])
+    assert np.array_equal(front.positions, threaded.positions[:threaded.count])
+    assert not np.allclose(blended_start, front.positions), "Alpha 0 should show the state before the last tick"
+
+
+def test_worker_republishes_after_external_changes():
+    """
+    Changes made to the state outside the worker should reach the front
+    buffer on the next submit, even when no ticks are due.
+    """
+    # Arrange
+    state = make_state(count=10)
+    worker = SimulationWorker(state, Boids.step_all)
+    worker.submit(0)
+
+    # Act
+    state.truncate(4)
+    worker.submit(0)
+    shrunk = worker.latest().count
+    state.positions[0] = (1.0, 2.0, 3.0)
+    worker.mark_stale()
+    worker.submit(0)
+
+    # Assert
+    assert shrunk == 4
+    assert np.array_equal(worker.latest().positions[0], (1.0, 2.0, 3.0))
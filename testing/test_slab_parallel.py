@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from agent import SwarmState
+from config import simulation_config
+from movement_model import Boids
+from slab_parallel import SlabDecomposition, slab_edges, slab_owners
+
+
+def make_state(seed=11, count=600):
+    """
+    Build a random swarm state spread across the default world bounds.
+    """
+    rng = np.random.default_rng(seed)
+    state = SwarmState()
+    for _ in range(count):
+        state.add(rng.uniform(-10, 10, 3), rng.uniform(-1, 1, 3), rng.uniform(0.01, 0.1))
+    return state
+
+
+@pytest.mark.parametrize("use_jit", [False, True])
+def test_slab_decomposition_matches_single_process(monkeypatch, use_jit):
+    """
+    Stepping across slabs with halo exchange should reproduce the
+    single-process batched step, including agents that migrate between slabs.
+    """
+    # Arrange
+    monkeypatch.setitem(simulation_config, "use_jit", use_jit)
+    reference, decomposed = make_state(), make_state()
+    migrations = 0
+
+    # Act
+    with SlabDecomposition(num_slabs=4, workers=2) as model:
+        for _ in range(5):
+            Boids.step_all(reference)
+            model.step(decomposed)
+            migrations += model.migrations
+        owned = model.owned.copy()
+
+    # Assert
+    assert np.allclose(decomposed.positions[:600], reference.positions[:600], atol=1e-9)
+    assert np.allclose(decomposed.directions[:600], reference.directions[:600], atol=1e-9)
+    assert np.allclose(decomposed.speeds[:600], reference.speeds[:600], atol=1e-9)
+    assert owned.sum() == 600, "Every agent should be owned by exactly one slab"
+    assert migrations > 0
+
+
+def test_slab_edges_cover_every_position():
+    """
+    Slabs should split the longest axis evenly and own agents outside the bounds.
+    """
+    # Arrange
+    config = {"x_min": -5, "x_max": 5, "y_min": -20, "y_max": 20, "z_min": -5, "z_max": 5}
+    positions = np.array([[0.0, -100.0, 0.0], [0.0, -5.0, 0.0], [0.0, 5.0, 0.0], [0.0, 100.0, 0.0]])
+
+    # Act
+    axis, edges = slab_edges(config, 4)
+    owners = slab_owners(positions, axis, edges)
+
+    # Assert
+    assert axis == 1
+    assert np.allclose(edges[1:-1], [-10.0, 0.0, 10.0])
+    assert owners.tolist() == [0, 1, 2, 3]
@@ -0,0 +1,194 @@
+import numpy as np
+import pytest
+
+from agent import Agent
+from config import simulation_config, get_active_movement_model, movement_model_registry
+from jit_kernels import pack_step_params, step_kernel
+from movement_model import Boids, get_neighbour_backend
+from physics import WallPhysics, ObstaclePhysics
+
+# Captured at import, before the deprecated test_boids module patches it at run time
+_calc_wall_repulsion = WallPhysics.__dict__["calc_wall_repulsion"]
+
+
+@pytest.fixture(autouse=True)
+def real_wall_physics(monkeypatch):
+    """
+    Make sure the per-agent reference uses the real wall repulsion.
+    """
+    monkeypatch.setattr(WallPhysics, "calc_wall_repulsion", _calc_wall_repulsion)
+
+
+@pytest.fixture
+def swarm():
+    """
+    Spawn a small random swarm spread across the world bounds.
+    """
+    rng = np.random.default_rng(7)
+    Agent.clear_all()
+    for _ in range(40):
+        Agent(position=rng.uniform(-10, 10, 3), direction=rng.uniform(-1, 1, 3))
+    yield Agent.state
+    Agent.clear_all()
+
+
+def reference_step(state):
+    """
+    Advance each agent with the per-agent path, every agent reading the
+    same starting snapshot, and return the resulting arrays.
+    """
+    snapshot = [a.copy() for a in state.live()]
+    results = [a.copy() for a in snapshot]
+    model = Boids()
+
+    for i, agent in enumerate(Agent.all_agents):
+        for live, saved in zip(state.live(), snapshot):
+            live[:] = saved
+        model.update_position(agent, Agent.all_agents)
+        for result, live in zip(results, state.live()):
+            result[i] = live[i]
+
+    for live, saved in zip(state.live(), snapshot):
+        live[:] = saved
+    return results
+
+
+@pytest.mark.parametrize("use_jit", [False, True])
+def test_step_all_matches_per_agent_update(swarm, use_jit):
+    """
+    The batched step, NumPy or compiled, should reproduce the per-agent semantics.
+    """
+    # Arrange
+    expected_pos, expected_dir, expected_speed = reference_step(swarm)
+    saved = simulation_config["use_jit"]
+    simulation_config["use_jit"] = use_jit
+
+    # Act
+    try:
+        Boids.step_all(swarm, dt=0.1)
+    finally:
+        simulation_config["use_jit"] = saved
+
+    # Assert
+    positions, directions, speeds = swarm.live()
+    assert np.allclose(directions, expected_dir, atol=1e-9)
+    assert np.allclose(speeds, expected_speed, atol=1e-9)
+    assert np.allclose(positions, expected_pos, atol=1e-9)
+
+
+@pytest.mark.parametrize("use_jit", [False, True])
+def test_step_all_matches_with_obstacle(swarm, use_jit):
+    """
+    Obstacle repulsion should also match the per-agent path.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    simulation_config["use_jit"] = use_jit
+    simulation_config["obstacle_enabled"] = True
+    simulation_config["obstacle_corner_min"] = [-5, -5, -5]
+    simulation_config["obstacle_corner_max"] = [5, 0, 5]
+    try:
+        expected_pos, expected_dir, expected_speed = reference_step(swarm)
+
+        # Act
+        Boids.step_all(swarm, dt=0.1)
+    finally:
+        simulation_config.update(saved)
+
+    # Assert
+    positions, directions, speeds = swarm.live()
+    assert np.allclose(directions, expected_dir, atol=1e-9)
+    assert np.allclose(positions, expected_pos, atol=1e-9)
+
+
+def test_agents_are_views_into_state(swarm):
+    """
+    Agent attributes should read and write rows of the shared store.
+    """
+    # Arrange
+    agent = Agent.all_agents[3]
+
+    # Act
+    agent.position = [1.0, 2.0, 3.0]
+    swarm.speeds[3] = 0.5
+
+    # Assert
+    assert np.array_equal(swarm.positions[3], [1.0, 2.0, 3.0])
+    assert agent.speed == 0.5
+
+
+def test_fused_reduction_matches_individual_rules(swarm):
+    """
+    The fused kernel should reproduce calc_cohesion, calc_alignment and
+    calc_separation for every agent, including non-nested radii.
+    """
+    # Arrange
+    saved = dict(simulation_config)
+    simulation_config.update(cohesion_radius=4.0, alignment_radius=6.0, separation_radius=2.5)
+    try:
+        positions, directions, _ = swarm.live()
+        neighbours = get_neighbour_backend("grid").find(positions, Boids.interaction_radius())
+
+        # Act
+        cohesion, alignment, separation = Boids.reduce_rules(neighbours, directions)
+
+        # Assert
+        for i, agent in enumerate(Agent.all_agents):
+            pos, dirs, deltas, dist = Boids.precompute_agent_data(agent, Agent.all_agents)
+            assert np.allclose(cohesion[i], Boids.calc_cohesion(agent, pos, dist))
+            assert np.allclose(alignment[i], Boids.calc_alignment(agent, dirs, dist))
+            assert np.allclose(separation[i], Boids.calc_separation(deltas, dist))
+    finally:
+        simulation_config.update(saved)
+
+
+def test_step_kernel_runs_without_numba(swarm):
+    """
+    The kernel source should give the same result when run as plain Python.
+    """
+    # Arrange
+    positions, directions, speeds = (a.copy() for a in swarm.live())
+    neighbours = get_neighbour_backend("brute").find(positions, Boids.interaction_radius())
+    params, bounds = pack_step_params(simulation_config, Agent.min_speed, 0.1)
+    obstacle = ObstaclePhysics.calculate_obstacle_repulsion_all(positions, simulation_config["boundary_threshold"], simulation_config["boundary_max_force"])
+    n = swarm.count
+    saved = simulation_config["use_jit"]
+    simulation_config["use_jit"] = False
+
+    # Act
+    step_kernel(positions, directions, speeds, neighbours.indptr, neighbours.indices,
+                params, bounds, obstacle, np.empty((n, 3)), np.empty(n))
+    try:
+        Boids.step_all(swarm, dt=0.1)
+    finally:
+        simulation_config["use_jit"] = saved
+
+    # Assert
+    assert np.allclose(positions, swarm.live()[0])
+    assert np.allclose(directions, swarm.live()[1])
+    assert np.allclose(speeds, swarm.live()[2])
+
+
+def test_active_movement_model_is_cached():
+    """
+    The active model should be reused until the configured name changes.
+    """
+    # Arrange
+    saved = simulation_config["movement_model"]
+    registry_saved = dict(movement_model_registry)
+    movement_model_registry["Other"] = Boids
+
+    try:
+        # Act
+        first = get_active_movement_model()
+        second = get_active_movement_model()
+        simulation_config["movement_model"] = "Other"
+        third = get_active_movement_model()
+    finally:
+        simulation_config["movement_model"] = saved
+        movement_model_registry.clear()
+        movement_model_registry.update(registry_saved)
+
+    # Assert
+    assert first is second
+    assert third is not first
@@ -0,0 +1,65 @@
+from copy import deepcopy
+
+import numpy as np
+
+from agent import Agent
+from config import simulation_config, default_simulation_config
+from sweep import grid_points, random_points, swarm_metrics, run_point
+
+
+def test_grid_points_cover_every_combination():
+    """
+    Grid sampling should produce the full cartesian product.
+    """
+    points = grid_points({"cohesion_weight": [0.5, 1.0], "separation_weight": [1, 2, 3]})
+    assert len(points) == 6
+    assert {"cohesion_weight": 1.0, "separation_weight": 3} in points
+
+
+def test_random_points_respect_ranges():
+    """
+    Random sampling should stay inside ranges and be reproducible from the seed.
+    """
+    space = {"alignment_weight": (0.0, 4.0), "neighbour_backend": ["grid", "kdtree"]}
+    points = random_points(space, 50, seed=1)
+    assert points == random_points(space, 50, seed=1)
+    assert all(0.0 <= p["alignment_weight"] <= 4.0 for p in points)
+    assert {p["neighbour_backend"] for p in points} <= {"grid", "kdtree"}
+
+
+def test_swarm_metrics_for_aligned_line():
+    """
+    A line of agents heading the same way is fully polarized.
+    """
+    # Arrange
+    positions = np.array([[0, 0, 0], [1, 0, 0], [3, 0, 0]], dtype=float)
+    directions = np.tile([0.0, 2.0, 0.0], (3, 1))
+
+    # Act
+    metrics = swarm_metrics(positions, directions, block_size=2)
+
+    # Assert
+    assert np.isclose(metrics["polarization"], 1.0)
+    assert np.isclose(metrics["nearest_neighbour"], (1 + 1 + 2) / 3)
+    assert np.isclose(metrics["cohesion"], np.mean(np.abs([0, 1, 3] - np.mean([0, 1, 3]))))
+
+
+def test_run_point_applies_min_speed():
+    """
+    A min_speed sweep point should clamp the swarm's speeds to that point's
+    value, not the value cached when the Agent class was imported, and the
+    caller's configuration should be restored afterwards.
+    """
+    # Arrange
+    saved = deepcopy(simulation_config)
+    saved_min_speed = Agent.min_speed
+
+    # Act
+    result = run_point(default_simulation_config, {"min_speed": 1.5}, num_agents=30, steps=5, seed=0)
+    speeds = Agent.state.live()[2]
+
+    # Assert
+    assert result["min_speed"] == 1.5
+    assert speeds.min() >= 1.5
+    assert simulation_config == saved
+    assert Agent.min_speed == saved_min_speed
@@ -0,0 +1,64 @@
+import numpy as np
+
+from timestep import FixedTimestep, StateInterpolator
+
+
+def test_fixed_timestep_runs_whole_ticks_and_carries_remainder():
+    """
+    Elapsed time should be converted into whole ticks with the remainder
+    carried over, independently of how it is split across frames.
+    """
+    # Arrange
+    timestep = FixedTimestep(0.01, max_ticks=100)
+
+    # Act
+    ticks = [timestep.advance(dt) for dt in (0.004, 0.004, 0.004, 0.025)]
+    fast = timestep.advance(0.01, time_scale=3.0)
+
+    # Assert
+    assert ticks == [0, 0, 1, 2]
+    assert np.isclose(timestep.alpha, 0.7)
+    assert fast == 3, "A time scale of 3 should run three ticks per tick of real time"
+
+
+def test_fixed_timestep_drops_backlog_after_slow_frame():
+    """
+    A very slow frame should run at most max_ticks and discard the rest.
+    """
+    # Arrange
+    timestep = FixedTimestep(0.01, max_ticks=4)
+
+    # Act
+    ticks = timestep.advance(1.0)
+
+    # Assert
+    assert ticks == 4
+    assert timestep.advance(0.0) == 0
+    assert 0.0 <= timestep.alpha < 1.0
+
+
+def test_interpolator_blends_between_ticks():
+    """
+    Rendered state should move linearly between the last two ticks, with unit
+    directions, and fall back to the current state without a matching snapshot.
+    """
+    # Arrange
+    interpolator = StateInterpolator()
+    positions = np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+    directions = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    interpolator.snapshot(positions, directions)
+    new_positions = positions + [[2.0, 0.0, 0.0], [0.0, 0.0, -4.0]]
+    new_directions = np.array([[0.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+
+    # Act
+    blended_positions, blended_directions = interpolator.blend(new_positions, new_directions, 0.5)
+    resized, _ = interpolator.blend(new_positions[:1], new_directions[:1], 0.5)
+    interpolator.invalidate()
+    invalidated, _ = interpolator.blend(new_positions, new_directions, 0.5)
+
+    # Assert
+    assert np.allclose(blended_positions, [[1.0, 0.0, 0.0], [1.0, 1.0, -1.0]])
+    assert np.allclose(blended_directions[0], [np.sqrt(0.5), np.sqrt(0.5), 0.0])
+    assert np.allclose(np.linalg.norm(blended_directions, axis=1), 1.0)
+    assert np.array_equal(resized, new_positions[:1])
+    assert invalidated is new_positions
@@ -0,0 +1,128 @@
+"""
+Author: Adam Zelenak
+Part of the 3D Swarm Simulation Project
+File: timestep.py
+Description: Fixed-timestep scheduling for the real-time simulation. Render frames accumulate
+elapsed time and run however many whole simulation ticks fit, and agents are drawn interpolated
+between the last two ticks, so simulation speed no longer depends on the frame rate.
+"""
+
+import numpy as np
+
+
+class FixedTimestep:
+    """
+    Accumulator turning variable render-frame times into a whole number of
+    fixed-length simulation ticks.
+    """
+
+    def __init__(self, tick_duration, max_ticks=8):
+        """
+        :param tick_duration: Wall-clock seconds simulated by one tick.
+        :param max_ticks: Most ticks run in one frame; any further backlog is
+                          dropped so a slow frame cannot snowball into slower ones.
+        """
+        self.tick_duration = tick_duration
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+    def advance(self, elapsed, time_scale=1.0):
+        """
+        Add a frame's elapsed time and return the number of ticks to run.
+
+        :param elapsed: Seconds since the previous frame.
+        :param time_scale: Simulated seconds per real second; values above 1
+                           run the simulation faster than real time.
+        :return: Number of simulation ticks due this frame.
+        """
+        self.accumulator += max(elapsed, 0.0) * max(time_scale, 0.0)
+        ticks = int(self.accumulator // self.tick_duration)
+
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator %= self.tick_duration
+        else:
+            self.accumulator -= ticks * self.tick_duration
+        return ticks
+
+    @property
+    def alpha(self):
+        """
+        Fraction of the next tick already elapsed, used to interpolate rendering.
+        """
+        return min(self.accumulator / self.tick_duration, 1.0)
+
+    def reset(self):
+        """
+        Drop any accumulated time.
+        """
+        self.accumulator = 0.0
+
+
+class StateInterpolator:
+    """
+    Keeps the swarm state from before the latest tick and blends it with the
+    current state for rendering.
+    """
+
+    def __init__(self):
+        self.positions = None
+        self.directions = None
+        self.valid = False
+        self._out_positions = None
+        self._out_directions = None
+
+    def snapshot(self, positions, directions):
+        """
+        Copy the state about to be advanced by a tick.
+
+        :param positions: A numpy array (N, 3) of agent positions.
+        :param directions: A numpy array (N, 3) of agent directions.
+        """
+        if self.positions is None or self.positions.shape != positions.shape:
+            self.positions = np.empty_like(positions)
+            self.directions = np.empty_like(directions)
+        self.positions[:] = positions
+        self.directions[:] = directions
+        self.valid = True
+
+    def invalidate(self):
+        """
+        Forget the snapshot, e.g. after agents are respawned or teleported,
+        so the next frames are drawn without interpolation.
+        """
+        self.valid = False
+
+    def blend(self, positions, directions, alpha):
+        """
+        Interpolate between the snapshot and the current state.
+
+        Directions are linearly blended and renormalized. The current state is
+        returned unchanged when there is no matching snapshot.
+
+        :param positions: A numpy array (N, 3) of current agent positions.
+        :param directions: A numpy array (N, 3) of current agent directions.
+        :param alpha: Blend factor, 0 for the snapshot and 1 for the current state.
+        :return: Tuple (positions, directions) to render.
+        """
+        if not self.valid or self.positions.shape != positions.shape:
+            return positions, directions
+
+        if self._out_positions is None or self._out_positions.shape != positions.shape:
+            self._out_positions = np.empty_like(positions)
+            self._out_directions = np.empty_like(directions)
+
+        out_positions, out_directions = self._out_positions, self._out_directions
+        np.subtract(positions, self.positions, out=out_positions)
+        out_positions *= alpha
+        out_positions += self.positions
+
+        np.subtract(directions, self.directions, out=out_directions)
+        out_directions *= alpha
+        out_directions += self.directions
+        norm = np.linalg.norm(out_directions, axis=1, keepdims=True)
+        # Opposite headings can cancel out; fall back to the current heading
+        degenerate = norm[:, 0] < 1e-9
+        out_directions /= np.maximum(norm, 1e-12)
+        out_directions[degenerate] = directions[degenerate]
+        return out_positions, out_directions